@@ -0,0 +1,365 @@
+# src/python/benchmark.py
+"""
+PDF 추출 서버 벤치마크.
+
+합성 PDF 코퍼스(텍스트/표/이미지 위주, 1~1000 페이지)를 만들어 /api/pdf, /api/pdf/analyze,
+/api/pdf/extract-table 을 지정한 동시성으로 호출하고 p50/p95/p99 지연 시간, 초당 페이지 수,
+최대 RSS 를 JSON 으로 기록합니다. --compare 로 이전 기준 결과와 비교해 회귀를 잡을 수 있습니다.
+
+사용 예:
+    python benchmark.py --kinds text,table --pages 1,10,100 --concurrency 1,8 --output baseline.json
+    python benchmark.py --url http://localhost:8000 --server-pid 1234 --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import fitz
+import httpx
+
+KINDS = ("text", "table", "image")
+ENDPOINTS = ("extract", "analyze", "extract-table", "extract-all")
+
+# 표 위주 문서에서 각 페이지 표가 그려지는 위치 (extract-table 요청에 사용)
+TABLE_RECT = fitz.Rect(50, 120, 550, 420)
+TABLE_ROWS, TABLE_COLS = 10, 5
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua ut enim ad minim veniam quis nostrud"
+).split()
+KOREAN_LINE = "교과서 본문 추출 성능 측정을 위한 합성 문장입니다."
+
+
+def build_text_page(page: fitz.Page, rng: random.Random) -> None:
+    y = 60
+    page.insert_text((50, y), KOREAN_LINE, fontname="korea", fontsize=12)
+    y += 24
+    while y < page.rect.height - 60:
+        line = " ".join(rng.choice(WORDS) for _ in range(12))
+        page.insert_text((50, y), line, fontname="helv", fontsize=rng.choice((9, 10, 11)))
+        y += 14
+
+
+def build_table_page(page: fitz.Page, rng: random.Random) -> None:
+    page.insert_text((50, 90), "Table benchmark page", fontname="helv", fontsize=14)
+    cell_w = TABLE_RECT.width / TABLE_COLS
+    cell_h = TABLE_RECT.height / TABLE_ROWS
+    for r in range(TABLE_ROWS + 1):
+        y = TABLE_RECT.y0 + r * cell_h
+        page.draw_line((TABLE_RECT.x0, y), (TABLE_RECT.x1, y))
+    for c in range(TABLE_COLS + 1):
+        x = TABLE_RECT.x0 + c * cell_w
+        page.draw_line((x, TABLE_RECT.y0), (x, TABLE_RECT.y1))
+    for r in range(TABLE_ROWS):
+        for c in range(TABLE_COLS):
+            text = f"H{c}" if r == 0 else str(rng.randint(0, 9999))
+            page.insert_text(
+                (TABLE_RECT.x0 + c * cell_w + 4, TABLE_RECT.y0 + r * cell_h + cell_h * 0.65),
+                text, fontname="helv", fontsize=9
+            )
+
+
+def make_pixmap(rng: random.Random, width: int = 320, height: int = 240) -> fitz.Pixmap:
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, width, height), False)
+    pix.clear_with(255)
+    # 무작위 색 사각형 (한 변은 이미지 크기의 절반 이하, 로고처럼 작은 이미지도 지원)
+    size = min(40, width // 2, height // 2)
+    for _ in range(12):
+        x, y = rng.randrange(width - size + 1), rng.randrange(height - size + 1)
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        pix.set_rect(fitz.IRect(x, y, x + size, y + size), color)
+    return pix
+
+
+def build_image_page(page: fitz.Page, rng: random.Random, logo: fitz.Pixmap) -> None:
+    # 모든 페이지에 반복되는 로고 + 페이지마다 다른 이미지 2개
+    page.insert_image(fitz.Rect(50, 30, 130, 70), pixmap=logo)
+    page.insert_image(fitz.Rect(50, 100, 370, 340), pixmap=make_pixmap(rng))
+    page.insert_image(fitz.Rect(50, 380, 370, 620), pixmap=make_pixmap(rng))
+    page.insert_text((50, 660), "Image benchmark page", fontname="helv", fontsize=11)
+
+
+def generate_pdf(kind: str, pages: int, seed: int = 0) -> bytes:
+    """종류(text/table/image)와 페이지 수로 결정되는 재현 가능한 합성 PDF"""
+    rng = random.Random(f"{kind}:{pages}:{seed}")
+    doc = fitz.open()
+    logo = make_pixmap(random.Random("logo"), 80, 40)
+    for _ in range(pages):
+        page = doc.new_page(width=595, height=842)
+        if kind == "text":
+            build_text_page(page, rng)
+        elif kind == "table":
+            build_table_page(page, rng)
+        elif kind == "image":
+            build_image_page(page, rng, logo)
+        else:
+            raise ValueError(f"Unknown corpus kind: {kind}")
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
+
+
+def load_corpus(corpus_dir: Path, kinds: List[str], page_counts: List[int]) -> Dict[tuple, bytes]:
+    """코퍼스 디렉토리에 없으면 생성해서 저장 (같은 인자면 항상 같은 파일)"""
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    corpus = {}
+    for kind in kinds:
+        for pages in page_counts:
+            path = corpus_dir / f"{kind}-{pages}.pdf"
+            if not path.exists():
+                print(f"Generating {path.name}...", file=sys.stderr)
+                path.write_bytes(generate_pdf(kind, pages))
+            corpus[(kind, pages)] = path.read_bytes()
+    return corpus
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _status_kb(pid, field: str) -> int:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _children(pid) -> List[str]:
+    children = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            children += (task / "children").read_text().split()
+        except OSError:
+            continue
+    return children
+
+
+class PeakRss:
+    """
+    시나리오 하나 동안 서버와 워커 프로세스의 최대 RSS 합계 (MB).
+
+    시작할 때 /proc/<pid>/clear_refs 에 5 를 써서 VmHWM(프로세스 수명 동안의 최대값)을 현재 RSS 로
+    되돌리고, 실행 중에는 VmRSS 를 주기적으로 합산합니다. 되돌리기가 안 되는 환경(권한, 커널)에서도
+    이전 시나리오의 최대값이 섞이지 않도록 샘플링한 값만으로 보고합니다.
+    인프로세스 실행이면 자기 자신이 서버이며, /proc 가 없으면 ru_maxrss(프로세스 전체 최대값)로 대신합니다.
+    """
+
+    def __init__(self, server_pid: Optional[int], interval: float = 0.05):
+        self.pid = server_pid or "self"
+        self.interval = interval
+        self.reset_ok = False
+        self.sampled_kb = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _pids(self) -> List[str]:
+        return [str(self.pid)] + _children(self.pid)
+
+    def _rss_kb(self) -> int:
+        return sum(_status_kb(pid, "VmRSS") for pid in self._pids())
+
+    def start(self) -> None:
+        if not Path(f"/proc/{self.pid}/status").exists():
+            return
+        self.reset_ok = True
+        for pid in self._pids():
+            try:
+                Path(f"/proc/{pid}/clear_refs").write_text("5")
+            except OSError:
+                self.reset_ok = False
+        self.sampled_kb = self._rss_kb()
+        self._task = asyncio.create_task(self._sample())
+
+    async def _sample(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.sampled_kb = max(self.sampled_kb, self._rss_kb())
+
+    async def stop(self) -> float:
+        if self._task is None:
+            return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        peak = self.sampled_kb
+        if self.reset_ok:
+            # 샘플 사이의 짧은 최대값까지 포함 (도중에 새로 시작된 워커는 처음부터의 최대값)
+            peak = max(peak, sum(_status_kb(pid, "VmHWM") for pid in self._pids()))
+        return round(peak / 1024, 1)
+
+
+def build_request(endpoint: str, data: bytes, page_number: int) -> tuple:
+    files = {"file": ("bench.pdf", data, "application/pdf")}
+    if endpoint == "extract":
+        return "/api/pdf", files, {"extract_type": "text", "page_number": str(page_number)}
+    if endpoint == "extract-all":
+        return "/api/pdf", files, {"extract_type": "text", "pages": "all"}
+    if endpoint == "analyze":
+        return "/api/pdf/analyze", files, {"page_number": str(page_number)}
+    if endpoint == "extract-table":
+        bbox = json.dumps([TABLE_RECT.x0, TABLE_RECT.y0, TABLE_RECT.x1, TABLE_RECT.y1])
+        return "/api/pdf/extract-table", files, {"page_number": str(page_number), "bbox": bbox}
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+async def run_scenario(client: httpx.AsyncClient, endpoint: str, data: bytes, pages: int,
+                       requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        path, files, form = build_request(endpoint, data, i % pages + 1)
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, files=files, data=form)
+                ok = response.status_code == 200 and response.json().get("success", False)
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+        if not ok:
+            errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - start
+
+    pages_done = (requests - errors) * (pages if endpoint == "extract-all" else 1)
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "mean_ms": round(sum(ms) / len(ms), 2) if ms else 0.0,
+        "pages_per_sec": round(pages_done / wall, 2) if wall else 0.0,
+        "wall_sec": round(wall, 3),
+    }
+
+
+@asynccontextmanager
+async def open_client(url: Optional[str], timeout: float):
+    """--url 이 없으면 서버 앱을 같은 프로세스에서 ASGI 로 직접 호출"""
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+            yield client
+        return
+
+    import server
+    async with server.lifespan(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+            yield client
+
+
+async def run_benchmarks(args) -> List[dict]:
+    kinds = args.kinds.split(",")
+    page_counts = [int(p) for p in args.pages.split(",")]
+    endpoints = args.endpoints.split(",")
+    concurrencies = [int(c) for c in args.concurrency.split(",")]
+    corpus = load_corpus(Path(args.corpus_dir), kinds, page_counts)
+
+    results = []
+    async with open_client(args.url, args.timeout) as client:
+        for (kind, pages), data in corpus.items():
+            for endpoint in endpoints:
+                if endpoint == "extract-table" and kind != "table":
+                    continue
+                for concurrency in concurrencies:
+                    # 캐시가 채워지는 첫 요청은 측정에서 제외
+                    await run_scenario(client, endpoint, data, pages, args.warmup, 1)
+                    peak_rss = PeakRss(args.server_pid)
+                    peak_rss.start()
+                    stats = await run_scenario(client, endpoint, data, pages, args.requests, concurrency)
+                    result = {
+                        "scenario": f"{kind}-{pages}/{endpoint}/c{concurrency}",
+                        "kind": kind,
+                        "pages": pages,
+                        "endpoint": endpoint,
+                        "concurrency": concurrency,
+                        **stats,
+                        "peak_rss_mb": await peak_rss.stop(),
+                    }
+                    print(json.dumps(result), file=sys.stderr)
+                    results.append(result)
+    return results
+
+
+def compare(results: List[dict], baseline_path: Path, tolerance: float) -> List[str]:
+    """기준 결과 대비 p95 지연 또는 초당 페이지 수가 tolerance 이상 나빠진 시나리오 목록"""
+    baseline = {r["scenario"]: r for r in json.loads(baseline_path.read_text())["results"]}
+    regressions = []
+    for result in results:
+        base = baseline.get(result["scenario"])
+        if base is None:
+            continue
+        if base["p95_ms"] and result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{result['scenario']}: p95 {base['p95_ms']}ms -> {result['p95_ms']}ms")
+        if base["pages_per_sec"] and result["pages_per_sec"] < base["pages_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{result['scenario']}: pages/sec {base['pages_per_sec']} -> {result['pages_per_sec']}"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="PDF 추출 서버 벤치마크")
+    parser.add_argument("--url", help="HTTP 로 호출할 서버 주소 (없으면 인프로세스 실행)")
+    parser.add_argument("--server-pid", type=int, help="HTTP 모드에서 최대 RSS 를 읽을 서버 PID")
+    parser.add_argument("--kinds", default="text,table,image", help="코퍼스 종류 (text,table,image)")
+    parser.add_argument("--pages", default="1,10,100", help="문서 페이지 수 목록 (최대 1000)")
+    parser.add_argument("--endpoints", default="extract,analyze,extract-table",
+                        help=f"측정할 엔드포인트 ({','.join(ENDPOINTS)})")
+    parser.add_argument("--concurrency", default="1,4,16", help="동시 요청 수 목록")
+    parser.add_argument("--requests", type=int, default=50, help="시나리오별 요청 수")
+    parser.add_argument("--warmup", type=int, default=2, help="시나리오별 워밍업 요청 수")
+    parser.add_argument("--timeout", type=float, default=600, help="요청 타임아웃 (초)")
+    parser.add_argument("--corpus-dir", default="temp/bench_corpus", help="합성 PDF 저장 디렉토리")
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (기준 결과로 사용)")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="회귀로 판단할 비율 (기본 20%%)")
+    args = parser.parse_args()
+
+    if any(int(p) > 1000 for p in args.pages.split(",")):
+        parser.error("--pages values must be 1000 or less")
+
+    results = asyncio.run(run_benchmarks(args))
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "mode": "http" if args.url else "in-process",
+        "python": sys.version.split()[0],
+        "pymupdf": fitz.VersionBind,
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Saved {len(results)} results to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        regressions = compare(results, Path(args.compare), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# src/python/doc_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import fitz
+
+from worker_pool import PDF_WORKERS
+
+# 캐시 설정 (환경 변수로 조정 가능). 한도는 서버 전체 기준이며, 워커 프로세스마다
+# 캐시가 따로 있으므로 워커 수로 나눈 값을 프로세스별 한도로 사용
+_CACHE_SHARDS = max(PDF_WORKERS, 1)
+DOC_CACHE_MAX_ENTRIES = -(-int(os.getenv("PDF_DOC_CACHE_MAX_ENTRIES", "16")) // _CACHE_SHARDS)
+DOC_CACHE_MAX_BYTES = int(os.getenv("PDF_DOC_CACHE_MAX_BYTES", str(512 * 1024 * 1024))) // _CACHE_SHARDS
+
+
+def hash_bytes(data: bytes) -> str:
+    """업로드된 PDF 바이트의 SHA-256 해시 (문서 식별자)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class DocumentCache:
+    """
+    업로드 바이트의 SHA-256 해시를 키로 열린 fitz.Document 핸들을 보관하는 LRU 캐시.
+
+    문서 개수(max_entries)와 원본 바이트 합계(max_bytes)를 기준으로 가장 오래 사용되지 않은
+    문서부터 닫아서 제거합니다. max_bytes 보다 큰 문서는 캐시하지 않습니다.
+    """
+
+    def __init__(self, max_entries: int = DOC_CACHE_MAX_ENTRIES, max_bytes: int = DOC_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[fitz.Document, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, doc_hash: str) -> Optional[fitz.Document]:
+        with self._lock:
+            entry = self._entries.get(doc_hash)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(doc_hash)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, doc_hash: str, doc: fitz.Document, size: int) -> None:
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            old = self._entries.pop(doc_hash, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+                if old[0] is not doc:
+                    old[0].close()
+            self._entries[doc_hash] = (doc, size)
+            self._total_bytes += size
+            self._evict()
+
+    def open(self, data: bytes, doc_hash: Optional[str] = None) -> Tuple[str, fitz.Document]:
+        """캐시된 문서를 반환하거나, 없으면 메모리에서 바로 열어 캐시에 추가"""
+        doc_hash = doc_hash or hash_bytes(data)
+        doc = self.get(doc_hash)
+        if doc is None:
+            doc = fitz.open(stream=data, filetype="pdf")
+            self.put(doc_hash, doc, len(data))
+        return doc_hash, doc
+
+    def open_file(self, doc_hash: str, path: Path) -> fitz.Document:
+        """디스크에 저장된 문서를 해시 기준으로 조회하거나, 없으면 경로로 열어 캐시에 추가"""
+        doc = self.get(doc_hash)
+        if doc is None:
+            doc = fitz.open(str(path))
+            self.put(doc_hash, doc, path.stat().st_size)
+        return doc
+
+    def clear(self) -> None:
+        with self._lock:
+            for doc, _ in self._entries.values():
+                doc.close()
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _evict(self) -> None:
+        # 개수/용량 한도를 넘으면 가장 오래 사용되지 않은 문서부터 닫기
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            _, (doc, size) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            doc.close()
+
+
+# 프로세스 단위로 공유되는 문서 캐시 (워커마다 하나)
+document_cache = DocumentCache()
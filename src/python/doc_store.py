@@ -0,0 +1,190 @@
+# src/python/doc_store.py
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+
+from doc_cache import hash_bytes
+
+# 저장소 설정 (환경 변수로 조정 가능)
+DOC_STORE_TTL_SECONDS = int(os.getenv("PDF_DOC_STORE_TTL_SECONDS", "3600"))
+DOC_STORE_MAX_BYTES = int(os.getenv("PDF_DOC_STORE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+# 만료 문서 정리 주기 (초). 용량 한도를 넘으면 주기와 관계없이 정리
+_CLEANUP_INTERVAL = 60
+
+_DOC_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class DocumentStore:
+    """
+    한 번 업로드한 PDF 를 문서 ID(SHA-256)로 디스크에 보관하는 저장소.
+
+    마지막 접근 후 ttl_seconds 가 지나면 만료되고, 전체 크기가 max_bytes 를 넘으면
+    가장 오래 접근하지 않은 문서부터 삭제합니다. 접근 시각은 파일 mtime 으로 기록합니다.
+    전체 크기는 저장/삭제할 때마다 갱신해 두고, 디렉토리 전체를 읽는 정리는 한도를 넘었거나
+    정리 주기가 지났을 때만 수행합니다.
+    """
+
+    def __init__(self, root: Path, ttl_seconds: int = DOC_STORE_TTL_SECONDS, max_bytes: int = DOC_STORE_MAX_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._next_cleanup = 0.0
+        self.cleanup()
+
+    def path(self, doc_id: str) -> Path:
+        if not _DOC_ID_RE.match(doc_id):
+            raise ValueError(f"Invalid document id: {doc_id}")
+        return self.root / f"{doc_id}.pdf"
+
+    def put(self, data: bytes, doc_id: Optional[str] = None) -> str:
+        """문서를 저장하고 문서 ID 를 반환 (같은 내용이면 기존 파일 재사용)"""
+        doc_id = doc_id or hash_bytes(data)
+        if self._touch(doc_id):
+            return doc_id
+        tmp = self._write_tmp([data])[0]
+        self._commit(tmp, doc_id)
+        return doc_id
+
+    def put_stream(self, fileobj: BinaryIO, chunk_size: int = 1024 * 1024) -> Tuple[str, int]:
+        """
+        파일 객체를 청크 단위로 해시하면서 저장 (전체 내용을 메모리에 올리지 않음).
+        (문서 ID, 크기) 를 반환합니다.
+        """
+        digest = hashlib.sha256()
+
+        def chunks():
+            while True:
+                chunk = fileobj.read(chunk_size)
+                if not chunk:
+                    return
+                digest.update(chunk)
+                yield chunk
+
+        tmp, size = self._write_tmp(chunks())
+        doc_id = digest.hexdigest()
+        self._commit(tmp, doc_id)
+        return doc_id, size
+
+    def _touch(self, doc_id: str) -> bool:
+        path = self.path(doc_id)
+        with self._lock:
+            if not path.exists():
+                return False
+            os.utime(path)
+            return True
+
+    def _write_tmp(self, chunks) -> Tuple[Path, int]:
+        # 요청마다 고유한 임시 파일에 기록 (같은 파일명 동시 업로드 충돌 방지)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return Path(tmp), size
+
+    def _commit(self, tmp: Path, doc_id: str) -> None:
+        path = self.path(doc_id)
+        with self._lock:
+            if path.exists():
+                tmp.unlink()
+                os.utime(path)
+            else:
+                self._bytes += tmp.stat().st_size
+                os.replace(tmp, path)
+            if self._bytes > self.max_bytes or time.time() >= self._next_cleanup:
+                self._cleanup(keep=doc_id)
+
+    def get(self, doc_id: str) -> Optional[Path]:
+        """저장된 문서 경로를 반환하고 접근 시각 갱신 (없거나 만료되면 None)"""
+        try:
+            path = self.path(doc_id)
+        except ValueError:
+            return None
+        with self._lock:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                return None
+            if time.time() - st.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                self._bytes -= st.st_size
+                return None
+            os.utime(path)
+        return path
+
+    def delete(self, doc_id: str) -> bool:
+        try:
+            path = self.path(doc_id)
+        except ValueError:
+            return False
+        with self._lock:
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                return False
+            path.unlink()
+            self._bytes -= size
+        return True
+
+    def cleanup(self) -> None:
+        with self._lock:
+            self._cleanup()
+
+    def stats(self) -> dict:
+        with self._lock:
+            files = list(self.root.glob("*.pdf"))
+            return {
+                "documents": len(files),
+                "bytes": sum(f.stat().st_size for f in files),
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def _cleanup(self, keep: Optional[str] = None) -> None:
+        # 만료된 문서 삭제 후, 용량 초과 시 오래된 문서부터 삭제하고 전체 크기를 실제 값으로 맞춤
+        now = time.time()
+        self._next_cleanup = now + _CLEANUP_INTERVAL
+        for f in self.root.glob("*.tmp"):
+            # 중단된 업로드가 남긴 임시 파일 정리
+            try:
+                if now - f.stat().st_mtime > self.ttl_seconds:
+                    f.unlink(missing_ok=True)
+            except FileNotFoundError:
+                continue
+
+        entries = []
+        for f in self.root.glob("*.pdf"):
+            try:
+                st = f.stat()
+            except FileNotFoundError:
+                continue
+            if now - st.st_mtime > self.ttl_seconds and f.stem != keep:
+                f.unlink(missing_ok=True)
+                continue
+            entries.append((st.st_mtime, st.st_size, f))
+
+        total = sum(size for _, size, _ in entries)
+        # 용량 초과 시 한도의 90% 까지 비워 다음 몇 번의 저장은 정리 없이 처리
+        target = self.max_bytes * 9 // 10 if total > self.max_bytes else total
+        for _, size, f in sorted(entries):
+            if total <= target:
+                break
+            if f.stem == keep:
+                continue
+            f.unlink(missing_ok=True)
+            total -= size
+        self._bytes = total
@@ -0,0 +1,83 @@
+# src/python/image_store.py
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+# 이미지 저장소 설정 (환경 변수로 조정 가능)
+IMAGE_STORE_MAX_BYTES = int(os.getenv("PDF_IMAGE_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+class ImageStore:
+    """
+    PDF 에서 추출한 이미지를 내용 해시(SHA-256)로 보관하는 저장소.
+
+    여러 페이지나 문서에 반복되는 이미지(로고, 머리글 등)는 파일 하나만 저장되며,
+    전체 크기가 max_bytes 를 넘으면 가장 오래 접근하지 않은 파일부터 삭제합니다.
+    전체 크기는 저장할 때마다 더해 두고, 한도를 넘었을 때만 디렉토리를 다시 읽어 정리합니다.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = IMAGE_STORE_MAX_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.dedup_hits = 0
+        self._bytes = 0
+        with self._lock:
+            self._evict()
+
+    def put(self, data: bytes, ext: str) -> Path:
+        """이미지를 저장하고 경로 반환 (같은 내용이 이미 있으면 그 파일 재사용)"""
+        path = self.root / f"{hashlib.sha256(data).hexdigest()}.{ext}"
+        with self._lock:
+            if path.exists():
+                self.dedup_hits += 1
+                os.utime(path)
+                return path
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._bytes += len(data)
+            if self._bytes > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def touch(self, path: Path) -> bool:
+        """저장된 파일의 접근 시각 갱신 (삭제되었으면 False)"""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def stats(self) -> dict:
+        with self._lock:
+            files = [f for f in self.root.iterdir() if f.suffix != ".tmp"]
+            return {
+                "images": len(files),
+                "bytes": sum(f.stat().st_size for f in files),
+                "max_bytes": self.max_bytes,
+                "dedup_hits": self.dedup_hits,
+            }
+
+    def _evict(self, keep: Optional[Path] = None) -> None:
+        # 용량 초과 시 오래된 파일부터 삭제 (한도의 90% 까지 비워 매번 디렉토리를 읽지 않도록 함)
+        entries = []
+        for f in self.root.iterdir():
+            if f.suffix == ".tmp" or f == keep:
+                continue
+            try:
+                st = f.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, f))
+        total = sum(size for _, size, _ in entries) + (keep.stat().st_size if keep else 0)
+        target = self.max_bytes * 9 // 10 if total > self.max_bytes else total
+        for _, size, f in sorted(entries):
+            if total <= target:
+                break
+            f.unlink(missing_ok=True)
+            total -= size
+        self._bytes = total
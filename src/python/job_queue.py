@@ -0,0 +1,196 @@
+# src/python/job_queue.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    dedup_key TEXT NOT NULL,
+    doc_hash TEXT NOT NULL,
+    extract_type TEXT NOT NULL,
+    pages TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (dedup_key);
+CREATE TABLE IF NOT EXISTS job_pages (
+    job_id TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (job_id, page)
+);
+"""
+
+
+def dedup_key(doc_hash: str, extract_type: str, pages: List[int]) -> str:
+    raw = json.dumps([doc_hash, extract_type, pages])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class JobQueue:
+    """
+    대용량 PDF 변환 작업을 SQLite 에 보관하는 영속 대기열.
+
+    페이지 결과를 완료되는 즉시 기록(체크포인트)하므로, 서버가 재시작되어도
+    실행 중이던 작업은 남은 페이지만 다시 처리합니다. 같은 문서/옵션으로 제출된
+    작업은 실패/취소되지 않은 기존 작업을 그대로 반환합니다.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def submit(self, doc_hash: str, extract_type: str, pages: List[int]) -> dict:
+        """작업 등록 (동일한 작업이 있으면 그 작업을 반환, deduplicated=True)"""
+        key = dedup_key(doc_hash, extract_type, pages)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE dedup_key = ? AND status NOT IN (?, ?) ORDER BY created_at DESC LIMIT 1",
+                (key, FAILED, CANCELLED)
+            ).fetchone()
+            if row is not None:
+                return {**self._job(row), "deduplicated": True}
+
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (id, dedup_key, doc_hash, extract_type, pages, status, total, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, key, doc_hash, extract_type, json.dumps(pages), QUEUED, len(pages), now, now)
+            )
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return {**self._job(row), "deduplicated": False}
+
+    def claim_next(self) -> Optional[dict]:
+        """가장 오래된 대기 작업을 실행 중으로 바꾸고 반환"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (RUNNING, time.time(), row["id"])
+            )
+            return {**self._job(row), "status": RUNNING, "pages": json.loads(row["pages"])}
+
+    def requeue_running(self) -> int:
+        """서버 시작 시 중단된 실행 중 작업을 다시 대기열로 (체크포인트 이후부터 재개)"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?", (QUEUED, time.time(), RUNNING)
+            )
+            return cursor.rowcount
+
+    def requeue(self, job_id: str) -> None:
+        """워커 풀이 가득 차서 중단된 작업을 다시 대기열로"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (QUEUED, time.time(), job_id, RUNNING)
+            )
+
+    def completed_pages(self, job_id: str) -> set:
+        with self._lock:
+            rows = self._conn.execute("SELECT page FROM job_pages WHERE job_id = ?", (job_id,)).fetchall()
+        return {row["page"] for row in rows}
+
+    def checkpoint(self, job_id: str, page: int, result: dict) -> None:
+        """페이지 결과 기록 및 진행률 갱신"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_pages (job_id, page, result) VALUES (?, ?, ?)",
+                (job_id, page, json.dumps(result, ensure_ascii=False, default=str))
+            )
+            self._conn.execute(
+                "UPDATE jobs SET completed = (SELECT COUNT(*) FROM job_pages WHERE job_id = ?), updated_at = ? WHERE id = ?",
+                (job_id, time.time(), job_id)
+            )
+
+    def finish(self, job_id: str, status: str = DONE, error: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status != ?",
+                (status, error, time.time(), job_id, CANCELLED)
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                (CANCELLED, time.time(), job_id, QUEUED, RUNNING)
+            )
+            return cursor.rowcount > 0
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row is not None else None
+
+    def results(self, job_id: str) -> List[dict]:
+        """체크포인트된 페이지 결과를 작업에 지정된 페이지 순서대로 반환"""
+        with self._lock:
+            job = self._conn.execute("SELECT pages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            rows = self._conn.execute("SELECT page, result FROM job_pages WHERE job_id = ?", (job_id,)).fetchall()
+        if job is None:
+            return []
+        order = {page: i for i, page in enumerate(json.loads(job["pages"]))}
+        results = [json.loads(row["result"]) for row in rows]
+        return sorted(results, key=lambda result: order.get(result["page"], len(order)))
+
+    def purge(self, older_than: float) -> int:
+        """완료/실패/취소 후 older_than 초가 지난 작업과 결과 삭제"""
+        cutoff = time.time() - older_than
+        with self._lock, self._conn:
+            ids = [
+                row["id"] for row in self._conn.execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?",
+                    (DONE, FAILED, CANCELLED, cutoff)
+                )
+            ]
+            for job_id in ids:
+                self._conn.execute("DELETE FROM job_pages WHERE job_id = ?", (job_id,))
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return len(ids)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> dict:
+        return {
+            "job_id": row["id"],
+            "document_id": row["doc_hash"],
+            "extract_type": row["extract_type"],
+            "status": row["status"],
+            "total": row["total"],
+            "completed": row["completed"],
+            "progress": row["completed"] / row["total"] if row["total"] else 1.0,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
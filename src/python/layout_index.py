@@ -0,0 +1,81 @@
+# src/python/layout_index.py
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# 격자 셀 크기 (PDF 포인트 단위)
+LAYOUT_GRID_CELL = float(os.getenv("PDF_LAYOUT_GRID_CELL", "48"))
+
+
+def intersects(a: Sequence[float], b: Sequence[float]) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class PageGrid:
+    """한 페이지의 요소 bbox 를 균일 격자에 등록해 사각형 교차 질의를 빠르게 처리"""
+
+    def __init__(self, width: float, height: float, elements: List[dict], cell: float = LAYOUT_GRID_CELL):
+        self.width = width
+        self.height = height
+        self.elements = elements
+        self.cell = cell
+        self.cols = max(1, math.ceil(width / cell))
+        self.rows = max(1, math.ceil(height / cell))
+        self._cells: Dict[int, List[int]] = {}
+        for i, element in enumerate(elements):
+            for key in self._cell_keys(element["bbox"]):
+                self._cells.setdefault(key, []).append(i)
+
+    def _cell_keys(self, bbox: Sequence[float]) -> Iterable[int]:
+        # 페이지 밖으로 나간 bbox 는 가장자리 셀로 고정
+        c0 = min(max(int(bbox[0] // self.cell), 0), self.cols - 1)
+        c1 = min(max(int(bbox[2] // self.cell), 0), self.cols - 1)
+        r0 = min(max(int(bbox[1] // self.cell), 0), self.rows - 1)
+        r1 = min(max(int(bbox[3] // self.cell), 0), self.rows - 1)
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                yield r * self.cols + c
+
+    def query(self, rect: Optional[Sequence[float]] = None, types: Optional[set] = None) -> List[dict]:
+        """rect 와 겹치는 요소를 원래 순서대로 반환 (rect 가 없으면 전체)"""
+        if rect is None:
+            candidates = range(len(self.elements))
+        else:
+            found = set()
+            for key in self._cell_keys(rect):
+                found.update(self._cells.get(key, ()))
+            candidates = sorted(found)
+
+        results = []
+        for i in candidates:
+            element = self.elements[i]
+            if types and element["type"] not in types:
+                continue
+            if rect is not None and not intersects(element["bbox"], rect):
+                continue
+            results.append(element)
+        return results
+
+
+class LayoutIndex:
+    """문서 전체의 페이지별 격자 인덱스 (문서마다 한 번 생성)"""
+
+    def __init__(self, pages: Dict[int, dict]):
+        self.pages = {
+            page_number: PageGrid(layout["width"], layout["height"], layout["elements"])
+            for page_number, layout in pages.items()
+        }
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def query(self, page_number: int, rect: Optional[Sequence[float]] = None, types: Optional[set] = None) -> dict:
+        grid = self.pages.get(page_number)
+        if grid is None:
+            raise ValueError(f"Page {page_number} is out of range (1-{self.page_count})")
+        return {
+            "page": page_number,
+            "page_dims": {"width": grid.width, "height": grid.height},
+            "elements": grid.query(rect, types)
+        }
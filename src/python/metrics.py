@@ -0,0 +1,120 @@
+# src/python/metrics.py
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Tuple
+
+# 단계별 소요 시간 히스토그램 버킷 (초)
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 현재 요청에서 측정한 단계별 시간 (요청 밖의 백그라운드 작업이면 None)
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+class Histogram:
+    """레이블 조합별 누적 버킷/합계/개수를 보관하는 Prometheus 히스토그램"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets: Iterable[float] = STAGE_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # [버킷별 개수..., 합계, 전체 개수]
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                labels = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, label_values))
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-1]}')
+                lines.append(f"{self.name}_sum{{{labels}}} {series[-2]}")
+                lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return "\n".join(lines)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                labels = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, label_values))
+                lines.append(f"{self.name}{{{labels}}} {value}")
+        return "\n".join(lines)
+
+
+stage_seconds = Histogram(
+    "pdf_stage_seconds", "Time spent in each processing stage of a PDF request", ("endpoint", "stage")
+)
+request_seconds = Histogram(
+    "pdf_request_seconds", "Total PDF request handling time", ("endpoint",)
+)
+requests_total = Counter(
+    "pdf_requests_total", "PDF requests by endpoint and HTTP status", ("endpoint", "status")
+)
+
+
+def record(stage: str, seconds: float) -> None:
+    """단계 시간 기록 (요청 중이면 요청별로 합산, 백그라운드 작업이면 바로 히스토그램에 반영)"""
+    timings = request_timings.get()
+    if timings is None:
+        stage_seconds.observe(seconds, "background", stage)
+    else:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def record_all(timings: Dict[str, float]) -> None:
+    for stage, seconds in timings.items():
+        record(stage, seconds)
+
+
+@contextmanager
+def timed(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def finish_request(endpoint: str, status: int, total: float, timings: Dict[str, float]) -> str:
+    """요청 종료 시 히스토그램 반영 후 Server-Timing 헤더 값 반환"""
+    requests_total.inc(endpoint, str(status))
+    request_seconds.observe(total, endpoint)
+    for stage, seconds in timings.items():
+        stage_seconds.observe(seconds, endpoint, stage)
+    parts = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def render_all(extra: Iterable[str] = ()) -> str:
+    """Prometheus 텍스트 형식 출력"""
+    sections = [stage_seconds.render(), request_seconds.render(), requests_total.render(), *extra]
+    return "\n".join(sections) + "\n"
@@ -0,0 +1,584 @@
+# src/python/pdf_ops.py
+import base64
+import hashlib
+import io
+import logging
+import os
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import fitz
+import pymupdf4llm
+
+from doc_cache import document_cache
+
+logger = logging.getLogger(__name__)
+
+# 현재 작업에서 측정한 단계별 소요 시간 (초, run() 이 결과와 함께 반환)
+_timings: Dict[str, float] = {}
+
+
+@contextmanager
+def timed(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings[stage] = _timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+class DocumentNotCachedError(Exception):
+    """바이트 없이 해시로만 보낸 문서가 이 워커의 문서 캐시에 없을 때 발생 (호출 측이 바이트와 함께 다시 요청)"""
+
+
+class DocumentSource(NamedTuple):
+    """워커 프로세스로 전달되는 문서 참조 (업로드 바이트 또는 저장소 경로)"""
+    doc_hash: str
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+
+
+def open_source(source: DocumentSource) -> fitz.Document:
+    """현재 프로세스의 문서 캐시에서 문서를 찾고, 없으면 바이트/경로로 열기"""
+    if source.path is not None:
+        return document_cache.open_file(source.doc_hash, Path(source.path))
+    doc = document_cache.get(source.doc_hash)
+    if doc is None:
+        if source.data is None:
+            raise DocumentNotCachedError(f"Document {source.doc_hash[:12]} is not cached and no data was sent")
+        _, doc = document_cache.open(source.data, source.doc_hash)
+    return doc
+
+
+def run(source: DocumentSource, op: str, *args):
+    """워커 풀 진입점: 문서를 열고 op 이름에 해당하는 작업 실행 후 (결과, 단계별 소요 시간) 반환"""
+    _timings.clear()
+    with timed("open"):
+        doc = open_source(source)
+    result = OPS[op](doc, *args)
+    return result, dict(_timings)
+
+
+def cache_stats() -> dict:
+    return {"pid": os.getpid(), **document_cache.stats()}
+
+
+def page_count(doc: fitz.Document) -> int:
+    return doc.page_count
+
+
+# 저장소 경로(내용 해시 이름)로 연 문서별 xref 해시 메모 (여러 페이지/요청이 공유하는 글꼴, 이미지를 한 번만 해시)
+_xref_digests: "OrderedDict[str, Dict[int, bytes]]" = OrderedDict()
+XREF_DIGEST_DOCS = 16
+
+
+def xref_digests(doc: fitz.Document) -> Dict[int, bytes]:
+    if not doc.name:
+        return {}  # 메모리에서 연 문서는 식별할 이름이 없으므로 호출마다 새로 계산
+    digests = _xref_digests.pop(doc.name, None)
+    if digests is None:
+        digests = {}
+    _xref_digests[doc.name] = digests
+    while len(_xref_digests) > XREF_DIGEST_DOCS:
+        _xref_digests.popitem(last=False)
+    return digests
+
+
+def xref_digest(doc: fitz.Document, xref: int, digests: Dict[int, bytes], font: bool = False) -> bytes:
+    """xref 객체 정의(행렬, 크기, 글꼴 폭 등)와 스트림(글꼴은 글꼴 파일) 내용의 해시"""
+    if xref not in digests:
+        h = hashlib.sha256(doc.xref_object(xref, compressed=True).encode())
+        if font:
+            h.update(doc.extract_font(xref)[-1] or b"")
+        elif doc.xref_is_stream(xref):
+            h.update(doc.xref_stream_raw(xref) or b"")
+        digests[xref] = h.digest()
+    return digests[xref]
+
+
+def page_fingerprint(page: fitz.Page, digests: Dict[int, bytes]) -> str:
+    """
+    페이지 내용 지문: 크기/회전, 콘텐츠 스트림, 참조하는 이미지/Form XObject/글꼴(중첩된 XObject 가
+    참조하는 것 포함)의 정의와 내용, 주석과 링크의 SHA-256. 이미지 xref 번호는 추출/분석 결과에 그대로
+    들어가므로 함께 넣습니다. 개정판 문서에서 지문이 같은 페이지는 변환/분석 결과가 같으므로 재사용할 수 있습니다.
+    digests 는 여러 페이지가 공유하는 xref 의 해시를 한 번만 계산하기 위한 메모입니다.
+    """
+    doc = page.parent
+    h = hashlib.sha256()
+    h.update(repr((tuple(page.rect), page.rotation)).encode())
+    h.update(page.read_contents())
+    for image in page.get_images(full=True):
+        h.update(f"image {image[0]}".encode())
+        h.update(xref_digest(doc, image[0], digests))
+    for xobject in page.get_xobjects():
+        h.update(xref_digest(doc, xobject[0], digests))
+    for font in page.get_fonts(full=True):
+        h.update(xref_digest(doc, font[0], digests, font=True))
+    for annot in page.annots() or []:
+        h.update(repr((annot.type[1], tuple(annot.rect), annot.info.get("content", ""))).encode())
+    for link in page.get_links():
+        h.update(repr(sorted((k, str(v)) for k, v in link.items() if k not in ("xref", "id"))).encode())
+    return h.hexdigest()
+
+
+def fingerprint_pages(doc: fitz.Document, page_numbers: List[int]) -> Dict[int, str]:
+    """요청한 페이지의 지문 (범위를 벗어난 페이지는 빠짐)"""
+    digests = xref_digests(doc)
+    with timed("fingerprint"):
+        return {
+            page_number: page_fingerprint(doc[page_number - 1], digests)
+            for page_number in page_numbers if 1 <= page_number <= doc.page_count
+        }
+
+
+def doc_info(doc: fitz.Document) -> dict:
+    """pymupdf4llm 이 페이지 결과에 넣는 문서 메타데이터와 목차 (다른 판에서 재사용한 결과 갱신용)"""
+    return {"metadata": doc.metadata or {}, "toc": doc.get_toc()}
+
+
+# extract_page 가 지원하는 변환 형식
+EXTRACT_TYPES = ("text", "tables", "images")
+
+
+def extract_page(doc: fitz.Document, extract_type: str, page_number: int, document_url: str):
+    """
+    pymupdf4llm 으로 한 페이지를 markdown 으로 변환.
+    images 모드는 이미지 파일을 쓰지 않고, document_url 아래의 이미지/그림 링크만 붙입니다.
+    삽입된 이미지는 해당 URL 을 처음 요청할 때 추출되고, 벡터로 그린 그림은 그 영역만 렌더링합니다.
+    """
+    if extract_type == 'text':
+        with timed("to_markdown"):
+            return pymupdf4llm.to_markdown(
+                doc,
+                pages=[page_number - 1]
+            )
+    elif extract_type == 'tables':
+        with timed("to_markdown"):
+            return page_chunks(doc, page_number)
+    elif extract_type == 'images':
+        with timed("to_markdown"):
+            chunks = page_chunks(doc, page_number)
+        page = doc[page_number - 1]
+        images = image_elements(page)
+        for image in images:
+            image["url"] = f"{document_url}/images/{image['xref']}"
+        # 표 영역과 이미지 영역은 그림으로 다시 잡지 않음
+        exclude = [fitz.Rect(table["bbox"]) for chunk in chunks for table in chunk.get("tables") or []]
+        figures = vector_figures(page, exclude + [fitz.Rect(image["bbox"]) for image in images])
+        for figure in figures:
+            clip = ",".join(f"{value:.2f}" for value in figure["bbox"])
+            figure["url"] = f"{document_url}/pages/{page_number}/render?dpi={FIGURE_DPI}&clip={clip}"
+        # 읽는 순서(위→아래, 왼쪽→오른쪽)대로 이미지 링크 추가
+        images = sorted(images + figures, key=lambda image: (image["bbox"][1], image["bbox"][0]))
+        for chunk in chunks:
+            chunk["images"] = images
+            if images:
+                chunk["text"] += "\n\n" + "\n\n".join(f"![]({image['url']})" for image in images) + "\n"
+        return chunks
+    raise ValueError(f"Unknown extract_type: {extract_type}")
+
+
+def page_chunks(doc: fitz.Document, page_number: int) -> List[dict]:
+    """
+    pymupdf4llm 의 page_chunks 결과를 일반 dict 로 변환.
+    최근 버전은 람다를 기본값으로 쓰는 defaultdict 를 반환해 워커에서 pickle 로 돌려보낼 수 없습니다.
+    """
+    chunks = pymupdf4llm.to_markdown(doc=doc, pages=[page_number - 1], page_chunks=True)
+    return [dict(chunk) for chunk in chunks]
+
+
+def extract_pages(
+    doc: fitz.Document,
+    extract_type: str,
+    page_numbers: List[int],
+    document_url: str,
+    with_lines: bool = False
+) -> List[dict]:
+    """
+    여러 페이지를 차례로 변환 (페이지별로 오류를 분리해 결과 목록 반환).
+    with_lines 면 검색 인덱스를 요청한 경우로, 변환한 페이지의 텍스트 줄도 같은 작업에서 함께 수집합니다.
+    """
+    results = []
+    for page_number in page_numbers:
+        try:
+            content = extract_page(doc, extract_type, page_number, document_url)
+            result = {"page": page_number, "success": True, "content": content}
+            if with_lines:
+                result["lines"] = page_lines(doc[page_number - 1])
+            results.append(result)
+        except Exception as e:
+            logger.warning("Extraction error on page %d: %s", page_number, e)
+            results.append({"page": page_number, "success": False, "error": str(e)})
+    return results
+
+
+def extract_image(doc: fitz.Document, xref: int) -> dict:
+    """
+    이미지 xref 의 원본 데이터를 추출. 브라우저가 그대로 표시할 수 있는 PNG 와 회색/RGB JPEG 는
+    다시 인코딩하지 않고, 그 밖의 형식(JPX, JBIG2, CMYK JPEG 등)이나 투명도 마스크(SMask)가 있는
+    이미지는 PNG 로 변환합니다.
+    """
+    with timed("extract_image"):
+        image = doc.extract_image(xref)
+    if not image or not image.get("image"):
+        raise ValueError(f"No image found for xref {xref}")
+    web_safe = image["ext"] == "png" or (image["ext"] in ("jpeg", "jpg") and image.get("colorspace") in (1, 3))
+    if web_safe and not image.get("smask"):
+        return {"data": image["image"], "ext": image["ext"]}
+    with timed("encode_image"):
+        pix = fitz.Pixmap(doc, xref)
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)
+        if pix.colorspace is None or pix.colorspace.n not in (1, 3):
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        if image.get("smask"):
+            mask = fitz.Pixmap(doc, image["smask"])
+            if (mask.width, mask.height) == (pix.width, pix.height):
+                pix = fitz.Pixmap(pix, mask)
+        return {"data": pix.tobytes("png"), "ext": "png"}
+
+
+def parse_page_spec(spec: str, page_count: int) -> List[int]:
+    """'1-5,8,10-' 또는 'all' 형식의 페이지 지정을 1부터 시작하는 페이지 번호 목록으로 변환"""
+    spec = spec.strip().lower()
+    if spec in ("", "all", "*"):
+        return list(range(1, page_count + 1))
+
+    pages = []
+    seen = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, _, end = part.partition("-")
+            first = int(start) if start.strip() else 1
+            last = int(end) if end.strip() else page_count
+        else:
+            first = last = int(part)
+        if first < 1 or last > page_count or first > last:
+            raise ValueError(f"Invalid page range '{part}' for document with {page_count} pages")
+        for page_number in range(first, last + 1):
+            if page_number not in seen:
+                seen.add(page_number)
+                pages.append(page_number)
+    return pages
+
+
+def text_elements(page: fitz.Page, merge_lines: bool = False) -> List[dict]:
+    """텍스트 span 요소 수집 (merge_lines 이면 한 줄의 span 을 하나로 합침)"""
+    elements = []
+    with timed("get_text"):
+        text_blocks = page.get_text("dict")["blocks"]
+    for block in text_blocks:
+        if block.get("type") != 0:  # 텍스트 블록만
+            continue
+        for line in block.get("lines", []):
+            spans = line.get("spans", [])
+            if merge_lines and spans:
+                # 줄 단위로 합칠 때 글꼴/크기는 첫 span 기준
+                elements.append({
+                    "type": "text",
+                    "bbox": line["bbox"],
+                    "text": "".join(span["text"] for span in spans),
+                    "font": spans[0]["font"],
+                    "size": spans[0]["size"]
+                })
+                continue
+            for span in spans:
+                elements.append({
+                    "type": "text",
+                    "bbox": span["bbox"],
+                    "text": span["text"],
+                    "font": span["font"],
+                    "size": span["size"]
+                })
+    return elements
+
+
+def page_lines(page: fitz.Page) -> List[dict]:
+    """검색 인덱스용: 한 페이지의 텍스트 줄과 줄 안의 span 시작 위치/bbox"""
+    with timed("get_text"):
+        blocks = page.get_text("dict")["blocks"]
+    lines = []
+    for block in blocks:
+        if block.get("type") != 0:
+            continue
+        for line in block.get("lines", []):
+            text, spans = "", []
+            for span in line.get("spans", []):
+                spans.append([len(text)] + [round(v, 2) for v in span["bbox"]])
+                text += span["text"]
+            if text.strip():
+                lines.append({"text": text, "bbox": [round(v, 2) for v in line["bbox"]], "spans": spans})
+    return lines
+
+
+def text_lines(doc: fitz.Document, page_numbers: List[int]) -> Dict[int, List[dict]]:
+    """검색 인덱스용: 페이지 결과 캐시를 재사용해 추출 작업에서 줄을 받지 못한 페이지들의 줄 목록"""
+    return {page_number: page_lines(doc[page_number - 1]) for page_number in page_numbers}
+
+
+def image_elements(page: fitz.Page) -> List[dict]:
+    elements = []
+    images = page.get_images(full=True)  # full=True로 변경
+    for img_index, img in enumerate(images):
+        xref = img[0]
+        bbox = page.get_image_bbox(img)
+        if bbox:
+            # 이미지 메타데이터 추가
+            image_info = {
+                "type": "image",
+                "bbox": list(bbox),
+                "xref": xref,
+                "width": img[2],  # 이미지 너비
+                "height": img[3],  # 이미지 높이
+                "colorspace": img[4],  # 컬러스페이스
+            }
+            elements.append(image_info)
+    return elements
+
+
+def is_figure(paths: List[dict]) -> bool:
+    """곡선이나 사선이 있는지 (수평/수직 선과 사각형만 있는 표 테두리, 밑줄, 배경 상자는 그림이 아님)"""
+    for path in paths:
+        for item in path["items"]:
+            if item[0] == "c":
+                return True
+            if item[0] == "l" and abs(item[1].x - item[2].x) > 1 and abs(item[1].y - item[2].y) > 1:
+                return True
+            if item[0] == "qu" and not item[1].is_rectangular:
+                return True
+    return False
+
+
+def vector_figures(page: fitz.Page, exclude: List[fitz.Rect]) -> List[dict]:
+    """
+    벡터로 그린 그림(도형, 차트 등) 영역. 가까운 그리기 명령을 묶은 영역 중 FIGURE_MIN_SIZE 이상이고
+    곡선/사선을 포함하며, exclude 영역(표, 이미지)과 절반 이상 겹치지 않는 것만 반환합니다.
+    """
+    with timed("get_drawings"):
+        paths = page.get_drawings()
+        clusters = page.cluster_drawings(drawings=paths) if paths else []
+    figures = []
+    for rect in clusters:
+        if rect.width < FIGURE_MIN_SIZE or rect.height < FIGURE_MIN_SIZE:
+            continue
+        if any((rect & other).get_area() > rect.get_area() / 2 for other in exclude):
+            continue
+        bounds = rect + (-1, -1, 1, 1)
+        if is_figure([path for path in paths if bounds.contains(path["rect"])]):
+            figures.append({"type": "figure", "bbox": list(rect)})
+    return figures
+
+
+def detect_tables(doc: fitz.Document, page_number: int, clip: Optional[List[float]] = None) -> List[dict]:
+    """
+    표 감지 (find_tables) 결과를 캐시 가능한 형태로 반환.
+    감지 비용이 가장 크므로 셀 데이터까지 한 번에 추출해 둡니다.
+    """
+    page = doc[page_number - 1]
+    with timed("find_tables"):
+        if clip is not None:
+            tables = page.find_tables(clip=fitz.Rect(clip[0], clip[1], clip[2], clip[3]))
+        else:
+            tables = page.find_tables()
+        return [
+            {
+                "bbox": [float(v) for v in table.bbox],
+                "rows": table.row_count,
+                "cols": table.col_count,
+                "data": table.extract()
+            }
+            for table in tables
+        ]
+
+
+def detect_tables_pages(doc: fitz.Document, page_numbers: List[int]) -> Dict[int, List[dict]]:
+    """표 목록 생성용: 여러 페이지의 표 감지"""
+    return {page_number: detect_tables(doc, page_number) for page_number in page_numbers}
+
+
+def table_element(table: dict) -> dict:
+    return {
+        "type": "table",
+        "bbox": table["bbox"],
+        "rows": table["rows"],
+        "cols": table["cols"]
+    }
+
+
+def page_elements(page: fitz.Page, include_tables: bool = True) -> List[dict]:
+    """페이지의 객체들(텍스트 span, 이미지, 표)을 타입별로 수집"""
+    elements = text_elements(page) + image_elements(page)
+    if include_tables:
+        elements += [table_element(table) for table in detect_tables(page.parent, page.number + 1)]
+    return elements
+
+
+def pack_floats(values: List[float]) -> str:
+    """float 목록을 little-endian float32 바이트로 묶어 base64 문자열로 변환"""
+    packed = array("f", values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+def compact_text(elements: List[dict]) -> dict:
+    """텍스트 요소를 열 단위 배열로 변환 (글꼴은 사전 인덱스, bbox 는 float32 버퍼)"""
+    fonts: Dict[str, int] = {}
+    texts, font_ids, sizes, bboxes = [], [], [], []
+    for element in elements:
+        texts.append(element["text"])
+        font_ids.append(fonts.setdefault(element["font"], len(fonts)))
+        sizes.append(round(element["size"], 2))
+        bboxes.extend(element["bbox"])
+    return {
+        "fonts": list(fonts),
+        "text": {
+            "count": len(texts),
+            "text": texts,
+            "font": font_ids,
+            "size": sizes,
+            "bbox": pack_floats(bboxes)
+        }
+    }
+
+
+def analyze_page_compact(doc: fitz.Document, page_number: int, merge_lines: bool = True, include_tables: bool = True) -> dict:
+    """analyze_page 의 압축 형식: 텍스트는 열 단위 배열, 이미지/표는 기존 요소 형식"""
+    page = doc[page_number - 1]
+    tables = detect_tables(doc, page_number) if include_tables else []
+    return {
+        "success": True,
+        "format": "compact",
+        **compact_text(text_elements(page, merge_lines)),
+        "images": image_elements(page),
+        "tables": [table_element(table) for table in tables],
+        "page_dims": {
+            "width": page.rect.width,
+            "height": page.rect.height
+        }
+    }
+
+
+def analyze_page(doc: fitz.Document, page_number: int, include_tables: bool = True) -> dict:
+    """한 페이지의 요소 목록과 페이지 크기 반환 (include_tables=False 면 표 감지 생략)"""
+    page = doc[page_number - 1]
+    elements = page_elements(page, include_tables)
+
+    logger.debug("Analysis successful: found %d elements", len(elements))
+    return {
+        "success": True,
+        "elements": elements,
+        "page_dims": {
+            "width": page.rect.width,
+            "height": page.rect.height
+        }
+    }
+
+
+def layout_pages(doc: fitz.Document, page_numbers: List[int], include_tables: bool = True) -> Dict[int, dict]:
+    """레이아웃 인덱스 생성용: 여러 페이지의 요소와 크기 수집"""
+    layouts = {}
+    for page_number in page_numbers:
+        page = doc[page_number - 1]
+        elements = page_elements(page, include_tables)
+        for element in elements:
+            element["bbox"] = [float(v) for v in element["bbox"]]
+        layouts[page_number] = {
+            "width": page.rect.width,
+            "height": page.rect.height,
+            "elements": elements
+        }
+    return layouts
+
+
+# 렌더링 지원 형식과 MIME 타입 (webp 는 Pillow 가 설치된 경우에만 가능)
+# images 모드에서 벡터 그림으로 볼 최소 크기 (pt) 와 그림 렌더링 해상도
+FIGURE_MIN_SIZE = 20
+FIGURE_DPI = 300
+
+RENDER_FORMATS = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+}
+
+
+def render_page(
+    doc: fitz.Document,
+    page_number: int,
+    dpi: int,
+    max_size: Optional[int],
+    image_format: str,
+    clip: Optional[List[float]] = None
+) -> bytes:
+    """
+    페이지를 dpi 로 렌더링 (max_size 를 주면 긴 변이 그 픽셀 수를 넘지 않도록 축소).
+    clip([x0, y0, x1, y1], PDF 좌표)을 주면 그 영역만 렌더링합니다.
+    """
+    page = doc[page_number - 1]
+    area = page.rect if clip is None else fitz.Rect(clip) & page.rect
+    if area.is_empty:
+        raise ValueError(f"Clip {clip} is outside page {page_number}")
+    zoom = dpi / 72
+    if max_size:
+        zoom = min(zoom, max_size / max(area.width, area.height))
+    with timed("render"):
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=area, alpha=False)
+    with timed("encode_image"):
+        return encode_pixmap(pix, image_format)
+
+
+def encode_pixmap(pix: fitz.Pixmap, image_format: str) -> bytes:
+    if image_format == "png":
+        return pix.tobytes("png")
+    if image_format == "jpeg":
+        return pix.tobytes("jpg", jpg_quality=85)
+    if image_format == "webp":
+        try:
+            from PIL import Image
+        except ImportError:
+            raise ValueError("webp rendering requires Pillow (pip install pillow)")
+        buffer = io.BytesIO()
+        Image.frombytes("RGB", (pix.width, pix.height), pix.samples).save(buffer, "WEBP", quality=80)
+        return buffer.getvalue()
+    raise ValueError(f"Unknown image format: {image_format}")
+
+
+def table_to_markdown(extracted_data: List[list]) -> str:
+    """표 데이터를 Markdown 표로 변환"""
+    markdown = ""
+    # 헤더 행 추가 (첫 번째와 마지막 파이프 문자 보장)
+    first_row = [str(cell) if cell is not None else "" for cell in extracted_data[0]]
+    markdown += "|" + "|".join(first_row) + "|\n"
+    markdown += "|" + "|".join(["---"] * len(first_row)) + "|\n"
+
+    # 데이터 행 추가
+    for row in extracted_data[1:]:
+        formatted_row = [str(cell) if cell is not None else "" for cell in row]
+        markdown += "|" + "|".join(formatted_row) + "|\n"
+    return markdown
+
+
+OPS = {
+    "extract": extract_page,
+    "extract_pages": extract_pages,
+    "analyze": analyze_page,
+    "analyze_compact": analyze_page_compact,
+    "detect_tables": detect_tables,
+    "detect_tables_pages": detect_tables_pages,
+    "page_count": page_count,
+    "fingerprints": fingerprint_pages,
+    "doc_info": doc_info,
+    "layout_pages": layout_pages,
+    "text_lines": text_lines,
+    "render": render_page,
+    "extract_image": extract_image,
+}
@@ -0,0 +1,365 @@
+# src/python/ragas_api_py/batch_jobs.py
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# 끝난 배치 작업의 결과를 다시 받을 수 있도록 보관하는 시간 (초)
+RAGAS_JOB_TTL = float(os.getenv("RAGAS_JOB_TTL", "600"))
+# SSE 연결이 프록시에서 끊기지 않도록 이벤트가 없을 때 보내는 주석 간격 (초)
+RAGAS_SSE_HEARTBEAT = float(os.getenv("RAGAS_SSE_HEARTBEAT", "15"))
+# 워커 간에 작업 상태/이벤트를 공유하는 SQLite 파일과, 다른 워커의 작업을 확인하는 간격 (초)
+RAGAS_JOB_DB_PATH = os.getenv("RAGAS_JOB_DB_PATH", "ragas_jobs.sqlite3")
+RAGAS_JOB_POLL = float(os.getenv("RAGAS_JOB_POLL", "0.5"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    worker INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    samples INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+class JobStore:
+    """
+    여러 워커 프로세스가 공유하는 작업 상태와 이벤트 기록 (SQLite).
+
+    작업은 만든 워커에서만 실행되고, 다른 워커는 이 기록으로 상태/이벤트를 전달하거나
+    취소 요청을 남깁니다. 다른 워커가 쓰는 중이면 잠금을 최대 30초 기다리므로
+    이벤트 루프에서는 asyncio.to_thread 로 호출합니다.
+    """
+
+    def __init__(self, path: str = RAGAS_JOB_DB_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def save(self, status: dict, seq: Optional[int] = None, event: Optional[dict] = None) -> None:
+        """작업 상태 저장 (이벤트가 있으면 같은 트랜잭션에 기록)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if event is not None:
+                    self._conn.execute(
+                        "INSERT INTO job_events (job_id, seq, data) VALUES (?, ?, ?)",
+                        (status["job_id"], seq, json.dumps(event, ensure_ascii=False))
+                    )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO jobs (id, worker, state, samples, completed, failed, created_at, "
+                    "finished_at, cancel_requested) VALUES (?, ?, ?, ?, ?, ?, ?, ?, "
+                    "COALESCE((SELECT cancel_requested FROM jobs WHERE id = ?), 0))",
+                    (status["job_id"], status["worker"], status["state"], status["samples"], status["completed"],
+                     status["failed"], status["created_at"], status["finished_at"], status["job_id"])
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def status(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, worker, state, samples, completed, failed, created_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("job_id", "worker", "state", "samples", "completed", "failed", "created_at", "finished_at")
+        return dict(zip(keys, row))
+
+    def events(self, job_id: str, start: int) -> List[Tuple[int, dict]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, data FROM job_events WHERE job_id = ? AND seq >= ? ORDER BY seq", (job_id, start)
+            ).fetchall()
+        return [(seq, json.loads(data)) for seq, data in rows]
+
+    def request_cancel(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def mark_lost(self, job_id: str) -> None:
+        """실행하던 워커가 종료된 작업을 오류로 끝냄"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                seq = self._conn.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, 0) FROM job_events WHERE job_id = ?", (job_id,)
+                ).fetchone()[0]
+                event = {"type": "error", "detail": "Worker running the job exited"}
+                self._conn.execute(
+                    "INSERT INTO job_events (job_id, seq, data) VALUES (?, ?, ?)", (job_id, seq, json.dumps(event))
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET state = 'error', finished_at = ? WHERE id = ? AND state = 'running'",
+                    (time.time(), job_id)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def prune(self, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                expired = "SELECT id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?"
+                cutoff = time.time() - ttl
+                self._conn.execute(f"DELETE FROM job_events WHERE job_id IN ({expired})", (cutoff,))
+                self._conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[JobStore] = None
+
+
+def get_store() -> JobStore:
+    global _store
+    if _store is None:
+        _store = JobStore()
+    return _store
+
+
+class BatchJob:
+    """
+    연결과 독립적으로 실행되는 배치 평가 작업.
+
+    이벤트(start, result, done/cancelled/error)를 순서대로 보관하므로 구독자는 언제 연결하거나
+    다시 연결해도 놓친 이벤트부터 이어서 받고, 작업은 명시적으로 취소할 때만 멈춥니다.
+    상태와 이벤트는 JobStore 에도 기록되어 다른 워커에서도 조회/구독/취소할 수 있습니다.
+    """
+
+    def __init__(self, total: int):
+        self.id = uuid.uuid4().hex
+        self.total = total
+        self.events: List[dict] = []
+        self.state = "running"
+        self.completed = 0
+        self.failed = 0
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._changed = asyncio.Event()
+
+    async def start(self, events: AsyncIterator[dict]) -> None:
+        """작업을 공유 기록에 남긴 뒤 실행 (응답을 받은 클라이언트가 다른 워커로 바로 조회할 수 있도록)"""
+        await self._save()
+        self.task = asyncio.ensure_future(self._run(events))
+        self._watcher = asyncio.ensure_future(self._watch_cancel())
+
+    async def _run(self, events: AsyncIterator[dict]) -> None:
+        try:
+            async for event in events:
+                await self._append(event)
+            self.state = "done"
+        except asyncio.CancelledError:
+            # 작업 태스크 자신이 취소된 것이므로 취소 이벤트를 남기고 정상 종료
+            self.state = "cancelled"
+            await self._append({"type": "cancelled", "samples": self.total, "completed": self.completed})
+        except Exception as e:
+            self.state = "error"
+            await self._append({"type": "error", "detail": str(e)})
+        finally:
+            self.finished_at = time.time()
+            self._watcher.cancel()
+            self._notify()
+            await self._save()
+
+    async def _watch_cancel(self) -> None:
+        # 다른 워커로 들어온 취소 요청 확인
+        while True:
+            await asyncio.sleep(RAGAS_JOB_POLL)
+            if await asyncio.to_thread(get_store().cancel_requested, self.id):
+                self.cancel()
+                return
+
+    async def _append(self, event: dict) -> None:
+        if event.get("type") == "result":
+            self.completed += 1
+            self.failed += bool(event.get("details"))
+        self.events.append(event)
+        self._notify()
+        await self._save(len(self.events) - 1, event)
+
+    async def _save(self, seq: Optional[int] = None, event: Optional[dict] = None) -> None:
+        # 기록은 스레드에서 (잠금 대기가 이벤트 루프를 막지 않도록) 하고, 취소되어도 기록이 끝난 뒤에
+        # 취소를 전달해 다음 기록(취소 이벤트, 최종 상태)이 앞선 기록보다 먼저 저장되지 않도록 함
+        save = asyncio.ensure_future(asyncio.to_thread(get_store().save, self.status(), seq, event))
+        try:
+            await asyncio.shield(save)
+        except asyncio.CancelledError:
+            await save
+            raise
+
+    def _notify(self) -> None:
+        # 기다리던 구독자를 모두 깨우고 다음 이벤트를 위한 새 Event 로 교체
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def cancel(self) -> None:
+        if not self.finished:
+            self.task.cancel()
+
+    async def follow(self, start: int = 0, heartbeat: float = RAGAS_SSE_HEARTBEAT) -> AsyncIterator[Optional[Tuple[int, dict]]]:
+        """start 번째 이벤트부터 (순번, 이벤트) 를 전달하고, heartbeat 초 동안 새 이벤트가 없으면 None"""
+        index = start
+        while True:
+            changed = self._changed
+            while index < len(self.events):
+                yield index, self.events[index]
+                index += 1
+            if self.finished:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+
+    def status(self) -> dict:
+        return {
+            "job_id": self.id,
+            "worker": os.getpid(),
+            "state": self.state,
+            "samples": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+# 이 워커에서 실행 중이거나 끝난 작업 ID → 배치 작업 (끝난 작업은 RAGAS_JOB_TTL 이 지나면 정리)
+jobs: Dict[str, BatchJob] = {}
+
+
+async def prune_jobs() -> None:
+    now = time.time()
+    for job_id in [j.id for j in jobs.values() if j.finished and now - j.finished_at > RAGAS_JOB_TTL]:
+        del jobs[job_id]
+    await asyncio.to_thread(get_store().prune, RAGAS_JOB_TTL)
+
+
+async def start_job(total: int, events: AsyncIterator[dict]) -> BatchJob:
+    await prune_jobs()
+    job = BatchJob(total)
+    await job.start(events)
+    jobs[job.id] = job
+    return job
+
+
+def _worker_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _stored_status(job_id: str) -> Optional[dict]:
+    status = get_store().status(job_id)
+    if status is not None and status["state"] == "running" and not _worker_alive(status["worker"]):
+        get_store().mark_lost(job_id)
+        status = get_store().status(job_id)
+    return status
+
+
+async def job_status(job_id: str) -> Optional[dict]:
+    """작업 상태 (다른 워커의 작업은 공유 기록에서 조회, 실행하던 워커가 종료됐으면 오류로 처리)"""
+    job = jobs.get(job_id)
+    if job is not None:
+        return job.status()
+    return await asyncio.to_thread(_stored_status, job_id)
+
+
+async def follow_job(job_id: str, start: int = 0,
+                     heartbeat: float = RAGAS_SSE_HEARTBEAT) -> AsyncIterator[Optional[Tuple[int, dict]]]:
+    """작업 이벤트 구독 (이 워커의 작업은 바로, 다른 워커의 작업은 공유 기록을 주기적으로 확인)"""
+    job = jobs.get(job_id)
+    if job is not None:
+        async for item in job.follow(start, heartbeat):
+            yield item
+        return
+
+    index = start
+    idle = 0.0
+    while True:
+        for seq, event in await asyncio.to_thread(get_store().events, job_id, index):
+            yield seq, event
+            index = seq + 1
+            idle = 0.0
+        status = await job_status(job_id)
+        if status is None:
+            return
+        if status["state"] != "running":
+            # 상태를 확인하는 사이에 기록된 마지막 이벤트까지 전달
+            for seq, event in await asyncio.to_thread(get_store().events, job_id, index):
+                yield seq, event
+            return
+        await asyncio.sleep(RAGAS_JOB_POLL)
+        idle += RAGAS_JOB_POLL
+        if idle >= heartbeat:
+            idle = 0.0
+            yield None
+
+
+async def cancel_job(job_id: str, timeout: float = 10) -> Optional[dict]:
+    """작업을 취소하고 취소가 기록된 뒤의 상태 반환 (다른 워커의 작업은 취소 요청을 남기고 대기)"""
+    job = jobs.get(job_id)
+    if job is not None:
+        job.cancel()
+        await asyncio.wait([job.task])
+        return job.status()
+
+    status = await job_status(job_id)
+    if status is None or status["state"] != "running":
+        return status
+    await asyncio.to_thread(get_store().request_cancel, job_id)
+    deadline = time.monotonic() + timeout
+    while status is not None and status["state"] == "running" and time.monotonic() < deadline:
+        await asyncio.sleep(RAGAS_JOB_POLL)
+        status = await job_status(job_id)
+    return status
+
+
+def sse_message(index: int, event: dict) -> str:
+    """SSE 형식: 순번을 id 로 보내 재연결 시 Last-Event-ID 로 이어 받을 수 있게 함"""
+    data = json.dumps(event, ensure_ascii=False)
+    return f"id: {index}\nevent: {event['type']}\ndata: {data}\n\n"
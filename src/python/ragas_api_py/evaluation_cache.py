@@ -0,0 +1,78 @@
+# src/python/ragas_api_py/evaluation_cache.py
+import asyncio
+import hashlib
+import json
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+def _canonical_text(text: str) -> str:
+    # 유니코드 정규화(NFC)와 앞뒤 공백 제거로 같은 내용의 입력이 같은 키를 갖도록 함
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def result_key(
+    metric_name: str,
+    user_input: str,
+    response: str,
+    retrieved_contexts: Optional[List[str]],
+    model: str
+) -> str:
+    """평가 결과 캐시 키: (메트릭, 샘플, 평가 모델)의 정규화된 JSON 해시 (컨텍스트 순서는 유지)"""
+    canonical = json.dumps(
+        {
+            "metric": metric_name,
+            "model": model,
+            "user_input": _canonical_text(user_input),
+            "response": _canonical_text(response),
+            "retrieved_contexts": [_canonical_text(c) for c in retrieved_contexts or []],
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class SingleFlight:
+    """
+    같은 키의 평가가 동시에 요청되면 한 번만 실행하고 결과를 함께 기다리게 합니다.
+
+    계산은 별도 태스크에서 실행되므로 처음 요청한 쪽이 취소되어도 다른 요청은 결과를 받고,
+    기다리는 요청이 모두 취소되면 계산도 취소합니다.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, list] = {}
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(compute())
+            # [태스크, 기다리는 요청 수]
+            flight = self._flights[key] = [task, 0]
+            task.add_done_callback(lambda done: self._on_done(key, done))
+        else:
+            self.coalesced += 1
+
+        task = flight[0]
+        flight[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            flight[1] -= 1
+            if flight[1] == 0 and not task.done():
+                task.cancel()
+
+    def _on_done(self, key: Hashable, task: asyncio.Future) -> None:
+        self._flights.pop(key, None)
+        if not task.cancelled():
+            # 기다리던 요청이 모두 취소된 뒤 실패한 경우 "never retrieved" 경고가 남지 않도록 소비
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._flights),
+            "coalesced": self.coalesced,
+        }
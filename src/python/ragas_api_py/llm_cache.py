@@ -0,0 +1,239 @@
+# src/python/ragas_api_py/llm_cache.py
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.embeddings import Embeddings
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+logger = logging.getLogger(__name__)
+
+# 캐시 설정 (환경 변수로 조정 가능)
+RAGAS_CACHE_PATH = os.getenv("RAGAS_CACHE_PATH", "ragas_cache.sqlite3")
+RAGAS_CACHE_MAX_BYTES = int(os.getenv("RAGAS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# 새로 채점하도록 요청된 평가에서는 캐시를 조회하지 않고 결과만 갱신
+bypass_cache: ContextVar[bool] = ContextVar("bypass_cache", default=False)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+-- 전체 크기는 트리거로 갱신해 여러 워커 프로세스가 같은 파일을 써도 일치하도록 함
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    bytes INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE totals SET bytes = bytes + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE totals SET bytes = bytes - OLD.size;
+END;
+INSERT OR IGNORE INTO totals (id, bytes) SELECT 1, COALESCE(SUM(size), 0) FROM entries;
+"""
+
+
+def cache_key(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    LLM 응답, 임베딩, 평가 결과를 SQLite 에 보관하는 영속 캐시.
+
+    전체 크기가 max_bytes 를 넘으면 가장 오래 조회되지 않은 항목부터 삭제하고,
+    namespace(llm, embedding, result)별로 적중/실패 횟수를 집계합니다.
+    여러 워커 프로세스가 같은 파일을 열어 캐시를 공유할 수 있습니다 (적중 횟수는 워커별 집계).
+    """
+
+    def __init__(self, path: str = RAGAS_CACHE_PATH, max_bytes: int = RAGAS_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        # 다른 워커가 쓰는 중이면 잠금이 풀릴 때까지 대기, 트랜잭션은 직접 관리 (문장 단위 자동 커밋)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            # INSERT OR REPLACE 가 기존 행을 지울 때도 삭제 트리거가 실행되도록 함
+            self._conn.execute("PRAGMA recursive_triggers=ON")
+            self._conn.executescript(f"BEGIN IMMEDIATE;{_SCHEMA}COMMIT;")
+
+    def _total(self) -> int:
+        return self._conn.execute("SELECT bytes FROM totals WHERE id = 1").fetchone()[0]
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            counters = self._counters.setdefault(namespace, {"hits": 0, "misses": 0})
+            if row is None:
+                counters["misses"] += 1
+                return None
+            counters["hits"] += 1
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, namespace: str, key: str, value: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, namespace, value, size, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, value, len(value), time.time())
+            )
+            if self._total() > self.max_bytes:
+                self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY namespace"
+            ).fetchall()
+            counters = {namespace: dict(values) for namespace, values in self._counters.items()}
+            total = self._total()
+        namespaces = {}
+        for namespace in set(counters) | {row[0] for row in rows}:
+            hits = counters.get(namespace, {}).get("hits", 0)
+            misses = counters.get(namespace, {}).get("misses", 0)
+            entries, size = next(((row[1], row[2]) for row in rows if row[0] == namespace), (0, 0))
+            namespaces[namespace] = {
+                "entries": entries,
+                "bytes": size,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            }
+        return {
+            "path": self.path,
+            "worker": os.getpid(),
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "namespaces": namespaces,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        # 용량의 90% 까지 줄여 항목을 추가할 때마다 삭제가 반복되지 않도록 함
+        target = int(self.max_bytes * 0.9)
+        removed = []
+        # 여러 워커가 동시에 용량을 넘겨도 한 번만 줄이도록 쓰기 잠금을 잡은 뒤 크기를 다시 확인
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            total = self._total()
+            if total > self.max_bytes:
+                rows = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall()
+                for key, size in rows:
+                    if total <= target:
+                        break
+                    removed.append((key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM entries WHERE key = ?", removed)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        if removed:
+            logger.info(f"Evicted {len(removed)} cache entries ({total} bytes remaining)")
+
+
+class SQLiteLLMCache(BaseCache):
+    """LangChain 채팅 모델의 cache 로 사용: (모델 + 파라미터 + 프롬프트) 해시로 생성 결과 보관"""
+
+    def __init__(self, store: ResponseCache):
+        self.store = store
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        if bypass_cache.get():
+            return None
+        value = self.store.get("llm", cache_key(llm_string, prompt))
+        if value is None:
+            return None
+        return [loads(generation) for generation in json.loads(value)]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        value = json.dumps([dumps(generation) for generation in return_val])
+        self.store.put("llm", cache_key(llm_string, prompt), value.encode())
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 모델을 감싸 (모델 이름 + 텍스트) 해시로 벡터를 보관 (캐시에 없는 텍스트만 요청).
+    비동기 호출에서는 SQLite 조회/저장을 스레드에서 실행합니다 (LangChain 의 LLM 캐시 alookup 과 같은 방식).
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str, store: ResponseCache):
+        self.embeddings = embeddings
+        self.model = model
+        self.store = store
+
+    def _lookup(self, texts: List[str]) -> List[Optional[List[float]]]:
+        if bypass_cache.get():
+            return [None] * len(texts)
+        vectors = []
+        for text in texts:
+            value = self.store.get("embedding", cache_key(self.model, text))
+            vectors.append(array("d", value).tolist() if value is not None else None)
+        return vectors
+
+    def _update(self, texts: List[str], vectors: List[List[float]]) -> None:
+        for text, vector in zip(texts, vectors):
+            self.store.put("embedding", cache_key(self.model, text), array("d", vector).tobytes())
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._lookup(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            self._update([texts[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self._lookup([text])[0]
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self._update([text], [vector])
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = await asyncio.to_thread(self._lookup, texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = await self.embeddings.aembed_documents([texts[i] for i in missing])
+            await asyncio.to_thread(self._update, [texts[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+        return vectors
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = (await asyncio.to_thread(self._lookup, [text]))[0]
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            await asyncio.to_thread(self._update, [text], [vector])
+        return vector
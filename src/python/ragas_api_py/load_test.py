@@ -0,0 +1,180 @@
+# src/python/ragas_api_py/load_test.py
+"""
+RAGAS 평가 서버 부하 테스트.
+
+/evaluate 를 동시성 단계별로 호출해 초당 평가 수와 p50/p95/p99 지연 시간, 오류 수,
+스케줄러 재시도/429 횟수를 JSON 으로 기록합니다. --url 이 없으면 서버 앱을 같은 프로세스에서
+로컬 대역(RAGAS_BACKEND=local)으로 실행하므로 OpenAI 없이 측정할 수 있습니다.
+
+사용 예:
+    python load_test.py --concurrency 1,4,16,64 --requests 200 --output local.json
+    RAGAS_LOCAL_429_RATE=0.05 RAGAS_LOCAL_LLM_LATENCY=uniform:200,1500 python load_test.py
+    python load_test.py --url http://localhost:8001 --metrics answer_relevancy --requests 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import httpx
+
+QUESTIONS = (
+    "강의료 기준을 알려줘",
+    "출장비 정산 절차는 어떻게 되나요?",
+    "What is the retention period for student records?",
+    "학업성적관리위원회는 무엇을 심의하나요?",
+)
+ANSWERS = (
+    "일반 강사는 기본 160, 초과 90의 수당을 받고 특별 강사는 기본 300, 초과 200의 수당을 받습니다.",
+    "출장 후 5일 이내에 영수증을 첨부해 여비 정산서를 제출합니다.",
+    "Student records are kept for five years after graduation.",
+    "평가 계획, 평가 방법, 학업성적 관리의 공정성 제고 방안 등을 심의합니다.",
+)
+CONTEXT = "교육기관의 장이 특히 인정하는 경우 시간당 50만원 이내에서 지급할 수 있습니다."
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def build_payload(i: int, metrics: List[str], contexts: int, use_cache: bool) -> dict:
+    # 요청마다 입력을 달리해 결과 캐시/동시 요청 합치기에 걸리지 않도록 함
+    return {
+        "user_input": f"{QUESTIONS[i % len(QUESTIONS)]} ({i})",
+        "response": ANSWERS[i % len(ANSWERS)],
+        "retrieved_contexts": [f"{CONTEXT} [{i}-{c}]" for c in range(contexts)] or None,
+        "metrics": metrics,
+        "no_cache": not use_cache,
+    }
+
+
+async def scheduler_totals(client: httpx.AsyncClient) -> dict:
+    try:
+        models = (await client.get("/scheduler/stats")).json().get("models", [])
+    except (httpx.HTTPError, ValueError):
+        return {}
+    return {key: sum(m.get(key, 0) for m in models) for key in ("calls", "retries", "rate_limited", "timed_out", "failed")}
+
+
+async def run_level(client: httpx.AsyncClient, args, metrics: List[str], concurrency: int, offset: int) -> dict:
+    latencies = []
+    http_errors = 0
+    failed_scores = 0
+    scored = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal http_errors, failed_scores, scored
+        payload = build_payload(offset + i, metrics, args.contexts, args.use_cache)
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post("/evaluate", json=payload)
+                scores = response.json().get("scores", {}) if response.status_code == 200 else None
+            except (httpx.HTTPError, ValueError):
+                scores = None
+            latencies.append(time.perf_counter() - start)
+        if scores is None:
+            http_errors += 1
+            return
+        failed_scores += sum(1 for score in scores.values() if score == -1)
+        scored += sum(1 for score in scores.values() if score != -1)
+
+    before = await scheduler_totals(client)
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    wall = time.perf_counter() - start
+    after = await scheduler_totals(client)
+
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "concurrency": concurrency,
+        "requests": args.requests,
+        "http_errors": http_errors,
+        "failed_scores": failed_scores,
+        "evaluations_per_sec": round((args.requests - http_errors) / wall, 2) if wall else 0.0,
+        "metric_scores_per_sec": round(scored / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(max(ms), 2) if ms else 0.0,
+        "wall_sec": round(wall, 3),
+        "scheduler": {key: after[key] - before.get(key, 0) for key in after},
+    }
+
+
+@asynccontextmanager
+async def open_client(url: Optional[str], timeout: float):
+    """--url 이 없으면 서버 앱을 같은 프로세스에서 로컬 대역으로 직접 호출"""
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+            yield client
+        return
+
+    # 서버 모듈이 설정을 읽기 전에 지정 (실제 평가 캐시와 섞이지 않도록 임시 캐시 사용)
+    os.environ.setdefault("RAGAS_BACKEND", "local")
+    os.environ.setdefault("RAGAS_CACHE_PATH", str(Path(tempfile.gettempdir()) / "ragas_load_test.sqlite3"))
+    import server
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=timeout) as client:
+            yield client
+
+
+async def run_load_test(args) -> Tuple[Optional[str], List[dict]]:
+    metrics = args.metrics.split(",")
+    concurrencies = [int(c) for c in args.concurrency.split(",")]
+
+    results = []
+    async with open_client(args.url, args.timeout) as client:
+        # 모델/메트릭 초기화가 첫 단계 측정에 섞이지 않도록 한 번 호출
+        await client.post("/evaluate", json=build_payload(-1, metrics, args.contexts, args.use_cache))
+        for level, concurrency in enumerate(concurrencies):
+            result = await run_level(client, args, metrics, concurrency, level * args.requests)
+            print(json.dumps(result), file=sys.stderr)
+            results.append(result)
+        backend = (await client.get("/scheduler/stats")).json().get("backend")
+    return backend, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="RAGAS 평가 서버 부하 테스트")
+    parser.add_argument("--url", help="HTTP 로 호출할 서버 주소 (없으면 로컬 대역으로 인프로세스 실행)")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="동시 요청 수 목록")
+    parser.add_argument("--requests", type=int, default=100, help="동시성 단계별 요청 수")
+    parser.add_argument("--metrics", default="answer_relevancy,faithfulness", help="평가할 메트릭 목록")
+    parser.add_argument("--contexts", type=int, default=2, help="샘플당 검색 컨텍스트 수")
+    parser.add_argument("--use-cache", action="store_true", help="캐시된 결과 사용 (기본은 no_cache 로 매번 채점)")
+    parser.add_argument("--timeout", type=float, default=600, help="요청 타임아웃 (초)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    backend, results = asyncio.run(run_load_test(args))
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "mode": "http" if args.url else "in-process",
+        "backend": backend,
+        "metrics": args.metrics.split(","),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Saved {len(results)} results to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+# src/python/ragas_api_py/local_backend.py
+"""
+OpenAI 없이 평가 서버를 부하 테스트하기 위한 로컬 LLM/임베딩 대역 (RAGAS_BACKEND=local).
+
+응답은 프롬프트에서 결정되므로 같은 입력에는 항상 같은 점수가 나오고,
+지연 시간 분포와 429/시간 초과 오류 비율은 환경 변수로 조정합니다.
+"""
+import ast
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import openai
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import ConfigDict
+
+from scheduler import ScheduledChatMixin
+
+LOCAL_LLM_MODEL = "local-llm"
+
+# 지연 시간 분포 (ms): fixed:<ms>, uniform:<min>,<max>, lognormal:<중앙값>,<sigma>
+RAGAS_LOCAL_LLM_LATENCY = os.getenv("RAGAS_LOCAL_LLM_LATENCY", "lognormal:800,0.4")
+RAGAS_LOCAL_EMBEDDING_LATENCY = os.getenv("RAGAS_LOCAL_EMBEDDING_LATENCY", "lognormal:80,0.3")
+# 호출마다 429 / 시간 초과를 일으킬 확률 (0~1)
+RAGAS_LOCAL_429_RATE = float(os.getenv("RAGAS_LOCAL_429_RATE", "0"))
+RAGAS_LOCAL_TIMEOUT_RATE = float(os.getenv("RAGAS_LOCAL_TIMEOUT_RATE", "0"))
+# 시간 초과 오류를 내기 전까지 기다리는 시간 (초)
+RAGAS_LOCAL_TIMEOUT_AFTER = float(os.getenv("RAGAS_LOCAL_TIMEOUT_AFTER", "5"))
+# 지연 시간과 오류 주입에 쓰는 난수 시드 (응답 내용은 시드와 관계없이 프롬프트로 결정)
+RAGAS_LOCAL_SEED = int(os.getenv("RAGAS_LOCAL_SEED", "0"))
+
+# 임베딩 벡터 차원
+EMBEDDING_DIMENSIONS = 256
+
+_FAKE_URL = "http://local-backend/v1"
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """지연 시간 분포 문자열을 (난수 생성기 → 초) 함수로 변환"""
+    kind, _, params = spec.partition(":")
+    try:
+        values = [float(v) for v in params.split(",")]
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}")
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal" and len(values) == 2 and values[0] > 0:
+        # 중앙값이 median 이고 꼬리 길이가 sigma 로 정해지는 분포 (실제 API 지연과 비슷한 모양)
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) / 1000
+    raise ValueError(f"Invalid latency spec: {spec} (use fixed:ms, uniform:min,max or lognormal:median,sigma)")
+
+
+class FaultInjector:
+    """호출마다 지연 시간을 뽑고 설정된 비율로 429 / 시간 초과 오류를 일으킵니다."""
+
+    def __init__(self, name: str, latency: str, seed: int = RAGAS_LOCAL_SEED):
+        self.name = name
+        self.latency = parse_latency(latency)
+        self._rng = random.Random(f"{seed}:{name}")
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.rate_limited = 0
+        self.timeouts = 0
+
+    def _plan(self) -> Tuple[float, Optional[str]]:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency(self._rng)
+            roll = self._rng.random()
+            if roll < RAGAS_LOCAL_429_RATE:
+                self.rate_limited += 1
+                return delay, "rate_limit"
+            if roll < RAGAS_LOCAL_429_RATE + RAGAS_LOCAL_TIMEOUT_RATE:
+                self.timeouts += 1
+                return RAGAS_LOCAL_TIMEOUT_AFTER, "timeout"
+            return delay, None
+
+    def _error(self, fault: str) -> Exception:
+        request = httpx.Request("POST", f"{_FAKE_URL}/{self.name}")
+        if fault == "rate_limit":
+            response = httpx.Response(429, request=request)
+            return openai.RateLimitError(f"Injected rate limit for {self.name}", response=response, body=None)
+        return openai.APITimeoutError(request=request)
+
+    def call(self) -> None:
+        delay, fault = self._plan()
+        # 429 는 한도 초과 응답이 곧바로 오는 것처럼 지연 없이 실패
+        if fault != "rate_limit":
+            time.sleep(delay)
+        if fault:
+            raise self._error(fault)
+
+    async def acall(self) -> None:
+        delay, fault = self._plan()
+        if fault != "rate_limit":
+            await asyncio.sleep(delay)
+        if fault:
+            raise self._error(fault)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "injected_rate_limits": self.rate_limited,
+            "injected_timeouts": self.timeouts,
+        }
+
+
+llm_faults = FaultInjector("chat", RAGAS_LOCAL_LLM_LATENCY)
+embedding_faults = FaultInjector("embeddings", RAGAS_LOCAL_EMBEDDING_LATENCY)
+
+
+def stats() -> dict:
+    return {"llm": llm_faults.stats(), "embeddings": embedding_faults.stats()}
+
+
+def _extract_schema(prompt: str) -> Optional[dict]:
+    """ragas 프롬프트의 'JSON Schema' 뒤에 오는 출력 스키마 (json 또는 파이썬 dict 표기)"""
+    marker = prompt.find("JSON Schema")
+    start = prompt.find("{", marker) if marker != -1 else -1
+    if start == -1:
+        return None
+    depth = 0
+    in_string: Optional[str] = None
+    escaped = False
+    for i in range(start, len(prompt)):
+        ch = prompt[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == in_string:
+                in_string = None
+        elif ch in "\"'":
+            in_string = ch
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                text = prompt[start:i + 1]
+                for parse in (json.loads, ast.literal_eval):
+                    try:
+                        schema = parse(text)
+                    except (ValueError, SyntaxError):
+                        continue
+                    if isinstance(schema, dict):
+                        return schema
+                return None
+    return None
+
+
+def _prompt_words(prompt: str) -> List[str]:
+    # 예시가 아닌 실제 입력 부분의 단어를 사용 (없으면 프롬프트 전체)
+    _, _, tail = prompt.rpartition("Now perform the same with the following input")
+    tail, _, _ = tail.rpartition("Output")
+    words = re.findall(r"\w+", tail or prompt)
+    return words or ["response"]
+
+
+class _InstanceBuilder:
+    """JSON 스키마에 맞는 값을 프롬프트 해시로 정한 난수로 생성"""
+
+    def __init__(self, schema: dict, prompt: str):
+        self.defs = {**schema.get("definitions", {}), **schema.get("$defs", {})}
+        self.words = _prompt_words(prompt)
+        self.rng = random.Random(hashlib.sha256(prompt.encode()).hexdigest())
+
+    def build(self, schema: dict, name: str = "") -> Any:
+        if "$ref" in schema:
+            return self.build(self.defs.get(schema["$ref"].rsplit("/", 1)[-1], {}), name)
+        for key in ("anyOf", "oneOf", "allOf"):
+            if key in schema:
+                options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+                return self.build(options[0], name)
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+        if "const" in schema:
+            return schema["const"]
+
+        kind = schema.get("type")
+        if kind == "object" or "properties" in schema:
+            return {key: self.build(sub, key) for key, sub in schema.get("properties", {}).items()}
+        if kind == "array":
+            return [self.build(schema.get("items", {}), name) for _ in range(self.rng.randint(1, 3))]
+        if kind == "integer":
+            # 판정 필드는 대부분 1, 답변 회피 여부(noncommittal)는 대부분 0
+            positive = self.rng.random() < 0.75
+            return int(not positive) if name == "noncommittal" else int(positive)
+        if kind == "number":
+            return round(self.rng.random(), 3)
+        if kind == "boolean":
+            return self.rng.random() < 0.75
+        return self.sentence()
+
+    def sentence(self) -> str:
+        count = self.rng.randint(4, 12)
+        start = self.rng.randrange(len(self.words))
+        return " ".join(self.words[(start + i) % len(self.words)] for i in range(count))
+
+
+def fake_completion(prompt: str) -> str:
+    """프롬프트에 출력 스키마가 있으면 그에 맞는 JSON, 없으면 입력 단어로 만든 문장"""
+    schema = _extract_schema(prompt)
+    if schema is None:
+        return _InstanceBuilder({}, prompt).sentence()
+    return json.dumps(_InstanceBuilder(schema, prompt).build(schema), ensure_ascii=False)
+
+
+def _messages_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(m.content if isinstance(m.content, str) else json.dumps(m.content) for m in messages)
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 2 + 1
+
+
+class LocalChatModel(BaseChatModel):
+    """ChatOpenAI 대신 쓰는 결정적 채팅 모델 (응답 토큰 사용량도 추정값으로 보고)"""
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_name: str = LOCAL_LLM_MODEL
+
+    @property
+    def _llm_type(self) -> str:
+        return "local"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def get_num_tokens_from_messages(self, messages: List[BaseMessage], *args, **kwargs) -> int:
+        return _estimate_tokens(_messages_text(messages))
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        prompt = _messages_text(messages)
+        content = fake_completion(prompt)
+        usage = {
+            "prompt_tokens": _estimate_tokens(prompt),
+            "completion_tokens": _estimate_tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        generation = ChatGeneration(message=AIMessage(content=content), generation_info={"finish_reason": "stop"})
+        return ChatResult(generations=[generation], llm_output={"token_usage": usage, "model_name": self.model_name})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        llm_faults.call()
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await llm_faults.acall()
+        return self._result(messages)
+
+
+class ScheduledLocalChatModel(ScheduledChatMixin, LocalChatModel):
+    """모델별 스케줄러를 거쳐 호출하는 로컬 채팅 모델 (주입된 429 도 실제와 같이 재시도)"""
+
+
+def fake_embedding(text: str) -> List[float]:
+    """공백을 뺀 소문자 문자 bigram 을 해시해 더한 정규화 벡터 (겹치는 글자가 많을수록 유사)"""
+    compact = "".join(text.split()).lower()
+    grams = [compact[i:i + 2] for i in range(len(compact) - 1)] or [compact]
+    vector = [0.0] * EMBEDDING_DIMENSIONS
+    for gram in grams:
+        digest = hashlib.blake2b(gram.encode(), digest_size=4).digest()
+        index = int.from_bytes(digest[:3], "little") % EMBEDDING_DIMENSIONS
+        vector[index] += 1.0 if digest[3] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class LocalEmbeddings(Embeddings):
+    """OpenAIEmbeddings 대신 쓰는 결정적 임베딩 (요청당 한 번 지연/오류 주입)"""
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        embedding_faults.call()
+        return [fake_embedding(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        embedding_faults.call()
+        return fake_embedding(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await embedding_faults.acall()
+        return [fake_embedding(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await embedding_faults.acall()
+        return fake_embedding(text)
@@ -27,9 +27,17 @@ source venv/bin/activate
 echo "Installing required packages..."
 pip install -r requirements.txt
 
+# 워커 수 (RAGAS_WORKERS 가 2 이상이면 멀티 워커로 실행, 이 경우 --reload 는 사용할 수 없음)
+export RAGAS_WORKERS=${RAGAS_WORKERS:-1}
+if [ "$RAGAS_WORKERS" -gt 1 ]; then
+    SERVER_OPTS="--workers $RAGAS_WORKERS"
+else
+    SERVER_OPTS="--reload"
+fi
+
 # 서버 실행 (port 8001로 설정)
-echo "Starting RAGAS API server on port 8001 in background..."
-nohup uvicorn server:app --host 0.0.0.0 --port 8001 --reload --timeout-keep-alive 65 --log-level info > ragas_server.log 2>&1 &
+echo "Starting RAGAS API server on port 8001 in background ($RAGAS_WORKERS worker(s))..."
+nohup uvicorn server:app --host 0.0.0.0 --port 8001 $SERVER_OPTS --timeout-keep-alive 65 --log-level info > ragas_server.log 2>&1 &
 
 # 프로세스 ID 저장 및 출력
 PID=$!
@@ -0,0 +1,457 @@
+# src/python/ragas_api_py/scheduler.py
+import asyncio
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import openai
+from langchain_core.embeddings import Embeddings
+from langchain_core.outputs import LLMResult
+from langchain_openai import ChatOpenAI
+from ragas.embeddings import LangchainEmbeddingsWrapper
+from ragas.llms import LangchainLLMWrapper
+from ragas.metrics import ResponseRelevancy
+
+logger = logging.getLogger(__name__)
+
+# 서버 워커 프로세스 수 (분당 한도는 서버 전체 기준이므로 워커마다 똑같이 나눠 가짐)
+RAGAS_WORKERS = max(1, int(os.getenv("RAGAS_WORKERS", "1")))
+
+# 모델별 분당 요청/토큰 한도 (환경 변수로 조정 가능, 기본값은 OpenAI Tier 1 기준)
+RAGAS_LLM_RPM = float(os.getenv("RAGAS_LLM_RPM", "500")) / RAGAS_WORKERS
+RAGAS_LLM_TPM = float(os.getenv("RAGAS_LLM_TPM", "200000")) / RAGAS_WORKERS
+RAGAS_EMBEDDING_RPM = float(os.getenv("RAGAS_EMBEDDING_RPM", "3000")) / RAGAS_WORKERS
+RAGAS_EMBEDDING_TPM = float(os.getenv("RAGAS_EMBEDDING_TPM", "1000000")) / RAGAS_WORKERS
+
+# 429/일시적 오류 재시도와 서킷 브레이커 설정
+RAGAS_MAX_RETRIES = int(os.getenv("RAGAS_MAX_RETRIES", "6"))
+RAGAS_BACKOFF_BASE = float(os.getenv("RAGAS_BACKOFF_BASE", "1"))
+RAGAS_BACKOFF_MAX = float(os.getenv("RAGAS_BACKOFF_MAX", "30"))
+RAGAS_BREAKER_THRESHOLD = int(os.getenv("RAGAS_BREAKER_THRESHOLD", "5"))
+RAGAS_BREAKER_COOLDOWN = float(os.getenv("RAGAS_BREAKER_COOLDOWN", "30"))
+
+# API 호출 한 번(시도 하나)의 제한 시간 (초, 0 이면 제한 없음). 대기열/백오프 대기 시간은 포함하지 않으며,
+# 시간을 넘긴 시도는 일시적 오류처럼 재시도
+RAGAS_CALL_TIMEOUT = float(os.getenv("RAGAS_CALL_TIMEOUT", "60"))
+
+# 메트릭 하나의 평가 제한 시간 (초, 0 이면 제한 없음). 스케줄러 대기(한도, 백오프, 서킷 브레이커)는 빼고 재므로
+# 한도에 걸린 평가는 잘리지 않고, 기본값은 API 호출 하나가 모든 시도에 쓸 수 있는 시간
+RAGAS_METRIC_TIMEOUT = float(os.getenv("RAGAS_METRIC_TIMEOUT", str(RAGAS_CALL_TIMEOUT * (RAGAS_MAX_RETRIES + 1))))
+
+# 응답 토큰 수를 알 수 없을 때 요청 전에 예약하는 출력 토큰 수
+DEFAULT_COMPLETION_TOKENS = 512
+
+# 재시도하는 오류 (한도 초과, 시간 초과, 연결 오류, 서버 오류)
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class TokenBucket:
+    """분당 한도를 초당 비율로 채우는 토큰 버킷 (부족하면 먼저 기다린 요청부터 순서대로 대기)"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float) -> None:
+        # 한도보다 큰 요청도 언젠가는 통과하도록 한도만큼만 기다림
+        amount = min(amount, self.capacity)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """예약한 양과 실제 사용량의 차이 반영 (양수면 추가 차감, 음수면 반환)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 threshold 번 쌓이면 cooldown 동안 호출을 멈추고(실패시키지 않고 대기),
+    이후 한 요청만 시험 삼아 보내 성공하면 다시 엽니다.
+    """
+
+    def __init__(self, threshold: int = RAGAS_BREAKER_THRESHOLD, cooldown: float = RAGAS_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "open" if time.monotonic() < self.opened_at + self.cooldown else "half_open"
+
+    async def wait(self) -> bool:
+        """호출해도 될 때까지 대기. 이 호출이 시험 요청이면 True (결과를 알릴 때 probe 로 넘김)"""
+        while self.opened_at is not None:
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            elif not self.probing:
+                self.probing = True
+                return True
+            else:
+                await asyncio.sleep(0.5)
+        return False
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def failure(self, probe: bool = False) -> None:
+        self.failures += 1
+        if probe:
+            self.probing = False
+        if self.failures >= self.threshold:
+            if self.opened_at is None:
+                self.trips += 1
+                logger.warning(f"Circuit breaker opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+    def release(self, probe: bool) -> None:
+        # 시험 요청이 재시도 대상이 아닌 오류나 취소로 끝나면 다른 요청이 시험하도록 넘김
+        # (시험 요청이 아닌 호출의 오류로 풀면 반쯤 열린 상태에서 시험 요청이 여러 개 나감)
+        if probe:
+            self.probing = False
+
+
+class MetricBudget:
+    """
+    메트릭 평가 하나의 제한 시간. 그 평가의 API 호출이 하나라도 스케줄러에서 기다리는 동안은
+    시간이 흐르지 않습니다 (ragas 가 만드는 하위 태스크도 컨텍스트로 같은 예산을 공유).
+    """
+
+    def __init__(self, seconds: float):
+        self.remaining = seconds
+        self.started = time.monotonic()
+        self.waiting = 0
+
+    def left(self) -> float:
+        if self.waiting:
+            return self.remaining
+        return self.remaining - (time.monotonic() - self.started)
+
+    def pause(self) -> None:
+        if self.waiting == 0:
+            self.remaining = self.left()
+        self.waiting += 1
+
+    def resume(self) -> None:
+        self.waiting -= 1
+        if self.waiting == 0:
+            self.started = time.monotonic()
+
+
+# 현재 평가 중인 메트릭의 제한 시간 (run_metric 이 설정)
+metric_budget: ContextVar[Optional[MetricBudget]] = ContextVar("metric_budget", default=None)
+
+
+@contextmanager
+def scheduler_wait():
+    """스케줄러 대기 구간 (메트릭 제한 시간에서 제외)"""
+    budget = metric_budget.get()
+    if budget is not None:
+        budget.pause()
+    try:
+        yield
+    finally:
+        if budget is not None:
+            budget.resume()
+
+
+async def run_metric(score: Callable[[], Awaitable[Any]], seconds: float = RAGAS_METRIC_TIMEOUT) -> Any:
+    """
+    score() 를 제한 시간 안에서 실행 (스케줄러 대기 시간 제외, seconds 가 0 이하면 제한 없음).
+    시간을 넘기면 평가를 취소하고 asyncio.TimeoutError 를 발생시킵니다.
+    """
+    if seconds <= 0:
+        return await score()
+    budget = MetricBudget(seconds)
+    token = metric_budget.set(budget)
+    try:
+        # 태스크는 만들 때의 컨텍스트를 복사하므로 평가 중의 모든 API 호출이 이 예산을 봄
+        task = asyncio.ensure_future(score())
+    finally:
+        metric_budget.reset(token)
+    try:
+        while not task.done():
+            left = budget.left()
+            if left <= 0:
+                raise asyncio.TimeoutError(f"timed out after {seconds:g}s (excluding rate-limit waits)")
+            await asyncio.wait({task}, timeout=left)
+        return task.result()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """Retry-After 헤더가 있으면 그 값, 없으면 지수 백오프 상한 안에서 무작위 (full jitter)"""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        if retry_after is not None:
+            return float(retry_after) + random.uniform(0, RAGAS_BACKOFF_BASE)
+    except ValueError:
+        pass
+    return random.uniform(0, min(RAGAS_BACKOFF_MAX, RAGAS_BACKOFF_BASE * 2 ** attempt))
+
+
+class ModelScheduler:
+    """
+    모델 하나에 대한 모든 API 호출이 거치는 스케줄러.
+
+    요청/토큰 버킷으로 분당 한도 안에서 호출을 대기열에 세우고, 429 와 일시적 오류는
+    지터를 준 백오프로 재시도하며, 연속 실패 시 서킷 브레이커로 잠시 호출을 멈춥니다.
+    제한 시간(RAGAS_CALL_TIMEOUT)은 시도마다 API 호출에만 적용되고, 대기 시간은 메트릭 제한 시간
+    (RAGAS_METRIC_TIMEOUT)에서도 빠집니다.
+    """
+
+    def __init__(self, model: str, rpm: float, tpm: float):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.breaker = CircuitBreaker()
+        self.waiting = 0
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.timed_out = 0
+        self.failed = 0
+
+    async def run(self, call: Callable[[], Awaitable[Any]], tokens: float) -> Any:
+        attempt = 0
+        while True:
+            self.waiting += 1
+            probe = False
+            try:
+                with scheduler_wait():
+                    probe = await self.breaker.wait()
+                    await self.requests.acquire(1)
+                    await self.tokens.acquire(tokens)
+            except BaseException:
+                self.breaker.release(probe)
+                raise
+            finally:
+                self.waiting -= 1
+
+            self.calls += 1
+            try:
+                if RAGAS_CALL_TIMEOUT > 0:
+                    return_value = await asyncio.wait_for(call(), RAGAS_CALL_TIMEOUT)
+                else:
+                    return_value = await call()
+            except (asyncio.TimeoutError, *RETRYABLE_ERRORS) as e:
+                self.breaker.failure(probe)
+                if isinstance(e, openai.RateLimitError):
+                    self.rate_limited += 1
+                elif isinstance(e, asyncio.TimeoutError):
+                    self.timed_out += 1
+                if attempt >= RAGAS_MAX_RETRIES:
+                    self.failed += 1
+                    raise
+                delay = retry_delay(e, attempt)
+                attempt += 1
+                self.retries += 1
+                logger.warning(f"{self.model} call failed ({type(e).__name__}), retry {attempt} in {delay:.1f}s")
+                with scheduler_wait():
+                    await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self.breaker.release(probe)
+                raise
+            self.breaker.success()
+            return return_value
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "breaker": self.breaker.state,
+            "breaker_trips": self.breaker.trips,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+            "rpm": self.requests.capacity,
+            "tpm": self.tokens.capacity,
+        }
+
+
+# 모델 이름 → 스케줄러 (프로세스 전체에서 공유)
+schedulers: Dict[str, ModelScheduler] = {}
+
+
+def get_scheduler(model: str, rpm: float, tpm: float) -> ModelScheduler:
+    scheduler = schedulers.get(model)
+    if scheduler is None:
+        scheduler = schedulers[model] = ModelScheduler(model, rpm, tpm)
+    return scheduler
+
+
+class ScheduledChatMixin:
+    """
+    채팅 모델의 API 호출(_agenerate)을 모델별 스케줄러에 통과시키는 mixin.
+    캐시 적중 시에는 _agenerate 가 호출되지 않으므로 한도를 소모하지 않습니다.
+    """
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        scheduler = get_scheduler(self.model_name, RAGAS_LLM_RPM, RAGAS_LLM_TPM)
+        max_tokens = getattr(self, "max_tokens", None) or DEFAULT_COMPLETION_TOKENS
+        estimate = self.get_num_tokens_from_messages(messages) + max_tokens * (kwargs.get("n") or getattr(self, "n", None) or 1)
+        result = await scheduler.run(
+            lambda: super(ScheduledChatMixin, self)._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            estimate
+        )
+        usage = (result.llm_output or {}).get("token_usage") or {}
+        if usage.get("total_tokens"):
+            scheduler.tokens.adjust(usage["total_tokens"] - estimate)
+        return result
+
+
+class ScheduledChatOpenAI(ScheduledChatMixin, ChatOpenAI):
+    """모델별 스케줄러를 거쳐 호출하는 ChatOpenAI"""
+
+
+class PerCallLLMWrapper(LangchainLLMWrapper):
+    """
+    temperature/n 을 호출 인자로 전달하는 LangchainLLMWrapper.
+    ragas 의 기본 구현은 공유 채팅 모델의 속성을 바꿨다가 되돌리므로 동시 평가가 서로의 설정으로
+    호출될 수 있어, 모델 속성은 건드리지 않고 호출마다 설정을 넘깁니다 (LLM 캐시 키에도 반영).
+    """
+
+    def _call_args(self, prompt, n: int, temperature: Optional[float]) -> Tuple[list, dict]:
+        kwargs = {}
+        if hasattr(self.langchain_llm, "temperature"):
+            kwargs["temperature"] = self.get_temperature(n=n) if temperature is None else temperature
+        if hasattr(self.langchain_llm, "n"):
+            kwargs["n"] = n
+            return [prompt], kwargs
+        return [prompt] * n, kwargs
+
+    @staticmethod
+    def _merge(result: LLMResult, prompts: list) -> LLMResult:
+        # n 을 지원하지 않는 모델은 같은 프롬프트를 n 번 보냈으므로 결과 하나에 n 개가 있는 것처럼 합침
+        if len(prompts) > 1:
+            result.generations = [[generation[0] for generation in result.generations]]
+        return result
+
+    def generate_text(self, prompt, n: int = 1, temperature: Optional[float] = None,
+                      stop: Optional[List[str]] = None, callbacks=None) -> LLMResult:
+        prompts, kwargs = self._call_args(prompt, n, temperature)
+        result = self.langchain_llm.generate_prompt(prompts=prompts, stop=stop, callbacks=callbacks, **kwargs)
+        return self._merge(result, prompts)
+
+    async def agenerate_text(self, prompt, n: int = 1, temperature: Optional[float] = None,
+                             stop: Optional[List[str]] = None, callbacks=None) -> LLMResult:
+        prompts, kwargs = self._call_args(prompt, n, temperature)
+        result = await self.langchain_llm.agenerate_prompt(prompts=prompts, stop=stop, callbacks=callbacks, **kwargs)
+        return self._merge(result, prompts)
+
+
+class ScheduledEmbeddings(Embeddings):
+    """
+    임베딩 모델의 비동기 호출을 스케줄러에 통과 (토큰 수는 글자 수로 보수적으로 추정).
+    동기 호출은 스케줄러를 거치지 않으므로 평가 중에는 비동기 호출만 사용합니다 (ScheduledResponseRelevancy).
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str):
+        self.embeddings = embeddings
+        self.scheduler = get_scheduler(model, RAGAS_EMBEDDING_RPM, RAGAS_EMBEDDING_TPM)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.scheduler.run(
+            lambda: self.embeddings.aembed_documents(texts), sum(len(text) for text in texts)
+        )
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.scheduler.run(lambda: self.embeddings.aembed_query(text), len(text))
+
+
+# ScheduledResponseRelevancy 가 평가마다 비동기로 미리 받아 둔 임베딩 (평가 태스크의 컨텍스트에만 보임)
+prefetched_embeddings: ContextVar[Optional[Dict[str, Dict[str, List[float]]]]] = ContextVar(
+    "prefetched_embeddings", default=None
+)
+
+
+class PrefetchedEmbeddingsWrapper(LangchainEmbeddingsWrapper):
+    """동기 임베딩 호출에 현재 평가가 미리 받아 둔 벡터를 반환 (없으면 원래 경로로 요청)"""
+
+    def embed_query(self, text: str) -> List[float]:
+        prefetched = prefetched_embeddings.get()
+        if prefetched is not None and text in prefetched["query"]:
+            return prefetched["query"][text]
+        return super().embed_query(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        prefetched = prefetched_embeddings.get()
+        if prefetched is not None and all(text in prefetched["documents"] for text in texts):
+            return [prefetched["documents"][text] for text in texts]
+        return super().embed_documents(texts)
+
+
+class ScheduledResponseRelevancy(ResponseRelevancy):
+    """
+    질문 임베딩을 비동기로 요청하는 ResponseRelevancy.
+    ragas 는 유사도 계산에서 임베딩을 동기로 호출해 이벤트 루프를 막고 스케줄러의 한도/재시도를 거치지 않으므로,
+    생성된 질문의 임베딩을 스케줄러를 거쳐 미리 받아 둔 뒤 ragas 의 점수 계산(_calculate_score)을 그대로 호출합니다.
+    임베딩은 PrefetchedEmbeddingsWrapper 로 감싸야 미리 받은 벡터를 사용합니다.
+    """
+
+    async def _ascore(self, row: dict, callbacks) -> float:
+        prompt_input = self.question_generation.input_model(response=row["response"])
+        answers = await asyncio.gather(*(
+            self.question_generation.generate(data=prompt_input, llm=self.llm, callbacks=callbacks)
+            for _ in range(self.strictness)
+        ))
+        generated_questions = [answer.question for answer in answers]
+        if all(question == "" for question in generated_questions):
+            return self._calculate_score(answers, row)
+
+        query_vector, document_vectors = await asyncio.gather(
+            self.embeddings.aembed_query(row["user_input"]),
+            self.embeddings.aembed_documents(generated_questions),
+        )
+        token = prefetched_embeddings.set({
+            "query": {row["user_input"]: query_vector},
+            "documents": dict(zip(generated_questions, document_vectors)),
+        })
+        try:
+            return self._calculate_score(answers, row)
+        finally:
+            prefetched_embeddings.reset(token)
@@ -1,23 +1,23 @@
 # src/python/ragas_api_py/server.py
 import os
+import sys
+import json
+import time
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 import uvicorn
 from dotenv import load_dotenv
 
-# RAGAS 관련 임포트
-from ragas.metrics import (
-    Faithfulness,
-    ResponseRelevancy,
-    ContextRecall,
-    ContextPrecision
-)
-from ragas.llms import LangchainLLMWrapper
-from ragas.embeddings import LangchainEmbeddingsWrapper
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+# ragas, langchain, openai 와 이를 가져오는 모듈(llm_cache, scheduler, local_backend)은 임포트에 수 초가 걸리므로
+# 모듈 로드 시가 아니라 사용하는 함수 안에서 임포트 (서버 시작과 --reload 재시작을 빠르게 하고, 로딩은 워밍업에서 수행)
+import batch_jobs
+from evaluation_cache import SingleFlight, result_key
 
 # 환경 변수 로드
 load_dotenv()
@@ -29,13 +29,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 평가 모델 백엔드: openai (실제 API) 또는 local (부하 테스트용 결정적 대역, local_backend.py)
+RAGAS_BACKEND = os.getenv("RAGAS_BACKEND", "openai")
+if RAGAS_BACKEND not in ("openai", "local"):
+    raise ValueError(f"Unknown RAGAS_BACKEND: {RAGAS_BACKEND} (use openai or local)")
+
 # OpenAI API 키 확인
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
+if not OPENAI_API_KEY and RAGAS_BACKEND == "openai":
     logger.warning("OPENAI_API_KEY not found in environment variables. Please set it.")
 
+# 서버 워커 프로세스 수 (각 워커가 모델/메트릭을 따로 준비하고, 캐시와 배치 작업 기록은 SQLite 파일로 공유)
+RAGAS_WORKERS = max(1, int(os.getenv("RAGAS_WORKERS", "1")))
+
+# 서버 시작 시 모델/메트릭을 백그라운드에서 미리 준비 (RAGAS_WARMUP=0 이면 첫 평가 요청 때 준비)
+RAGAS_WARMUP = os.getenv("RAGAS_WARMUP", "1") != "0"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if RAGAS_WARMUP:
+        start_warm_up()
+    yield
+    # 이 워커에서 실행 중인 배치 작업을 멈추고(취소 상태가 공유 기록에 남을 때까지 대기) 캐시 연결 정리
+    running = [job for job in batch_jobs.jobs.values() if not job.finished]
+    for job in running:
+        job.cancel()
+    if running:
+        await asyncio.wait([job.task for job in running])
+    if response_cache is not None:
+        response_cache.close()
+
 # FastAPI 앱 생성
-app = FastAPI(title="RAGAS Evaluation API")
+app = FastAPI(title="RAGAS Evaluation API", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -46,25 +71,76 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 서버 전체에서 동시에 실행하는 메트릭 평가(LLM 호출) 수 제한
+RAGAS_MAX_CONCURRENCY = int(os.getenv("RAGAS_MAX_CONCURRENCY", "16"))
+# 배치 요청 하나에 담을 수 있는 최대 샘플 수
+RAGAS_MAX_BATCH_SIZE = int(os.getenv("RAGAS_MAX_BATCH_SIZE", "5000"))
+_evaluation_slots: Optional[asyncio.Semaphore] = None
+
+def evaluation_slots() -> asyncio.Semaphore:
+    # Python 3.9 이하에서는 생성 시점의 이벤트 루프에 묶이므로 요청 처리 중에 생성
+    global _evaluation_slots
+    if _evaluation_slots is None:
+        _evaluation_slots = asyncio.Semaphore(RAGAS_MAX_CONCURRENCY)
+    return _evaluation_slots
+
+# 평가에 사용하는 모델 (평가 결과 캐시 키에도 포함)
+if RAGAS_BACKEND == "local":
+    EVALUATOR_MODEL = "local-llm"
+    EMBEDDING_MODEL = "local-embedding"
+else:
+    EVALUATOR_MODEL = "gpt-4o-mini"
+    EMBEDDING_MODEL = "text-embedding-3-small"
+
+# LLM 응답/임베딩 영속 캐시 (RAGAS_CACHE_ENABLED=0 이면 사용 안 함)
+RAGAS_CACHE_ENABLED = os.getenv("RAGAS_CACHE_ENABLED", "1") != "0"
+response_cache = None
+# 같은 (샘플, 메트릭) 평가가 동시에 들어오면 한 번만 실행
+score_flights = SingleFlight()
+
 # 모델 및 임베딩 초기화 (지연 로딩)
 evaluator_llm = None
 evaluator_embeddings = None
-# 메트릭 인스턴스 초기화
-response_relevancy_metric = None
-faithfulness_metric = None
-context_recall_metric = None
-context_precision_metric = None
+# 이 워커 프로세스의 메트릭 인스턴스 (워커마다 워밍업 때 한 번 생성). 메트릭과 LLM 래퍼(PerCallLLMWrapper)는
+# 호출마다 설정을 인자로 넘기고 공유 속성을 바꾸지 않으므로 인스턴스 하나를 동시 평가에 함께 사용
+metric_pool: Dict[str, Any] = {}
+
+def get_response_cache():
+    global response_cache
+    if response_cache is None and RAGAS_CACHE_ENABLED:
+        from llm_cache import ResponseCache
+
+        response_cache = ResponseCache()
+        logger.info(f"Response cache opened: {response_cache.path}")
+    return response_cache
 
 def get_llm():
     global evaluator_llm
-    if evaluator_llm is None and OPENAI_API_KEY:
+    if evaluator_llm is None and (OPENAI_API_KEY or RAGAS_BACKEND == "local"):
+        from llm_cache import SQLiteLLMCache
+        from scheduler import PerCallLLMWrapper
+
         try:
-            openai_llm = ChatOpenAI(
-                model="gpt-4o-mini",
-                temperature=0,
-                openai_api_key=OPENAI_API_KEY
-            )
-            evaluator_llm = LangchainLLMWrapper(openai_llm)
+            cache = get_response_cache()
+            # 같은 모델/파라미터/프롬프트의 응답은 캐시에서 반환 (재평가 시 API 호출 없음)
+            llm_cache_adapter = SQLiteLLMCache(cache) if cache is not None else None
+            if RAGAS_BACKEND == "local":
+                from local_backend import ScheduledLocalChatModel
+
+                chat_llm = ScheduledLocalChatModel(model_name=EVALUATOR_MODEL, cache=llm_cache_adapter)
+            else:
+                from scheduler import ScheduledChatOpenAI
+
+                # API 호출은 모델별 스케줄러가 한도 관리와 재시도를 맡으므로 클라이언트 자체 재시도는 끔
+                chat_llm = ScheduledChatOpenAI(
+                    model=EVALUATOR_MODEL,
+                    temperature=0,
+                    openai_api_key=OPENAI_API_KEY,
+                    max_retries=0,
+                    cache=llm_cache_adapter
+                )
+            # temperature/n 은 공유 모델 속성을 바꾸지 않고 호출마다 전달 (동시 평가 간 설정 섞임 방지)
+            evaluator_llm = PerCallLLMWrapper(chat_llm)
             logger.info("LLM initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing LLM: {e}")
@@ -74,13 +150,29 @@ def get_llm():
 def get_embeddings():
     global evaluator_embeddings
     if evaluator_embeddings is None:
+        from llm_cache import CachedEmbeddings
+        from scheduler import PrefetchedEmbeddingsWrapper, ScheduledEmbeddings
+
         try:
-            # OpenAI 임베딩을 LangchainEmbeddingsWrapper로 감싸기
-            openai_embeddings = OpenAIEmbeddings(
-                openai_api_key=OPENAI_API_KEY,
-                model="text-embedding-3-small"
-            )
-            evaluator_embeddings = LangchainEmbeddingsWrapper(openai_embeddings)
+            # 임베딩 모델을 LangchainEmbeddingsWrapper로 감싸기
+            if RAGAS_BACKEND == "local":
+                from local_backend import LocalEmbeddings
+
+                base_embeddings = LocalEmbeddings()
+            else:
+                from langchain_openai import OpenAIEmbeddings
+
+                base_embeddings = OpenAIEmbeddings(
+                    openai_api_key=OPENAI_API_KEY,
+                    model=EMBEDDING_MODEL,
+                    max_retries=0
+                )
+            embeddings = ScheduledEmbeddings(base_embeddings, EMBEDDING_MODEL)
+            cache = get_response_cache()
+            if cache is not None:
+                embeddings = CachedEmbeddings(embeddings, EMBEDDING_MODEL, cache)
+            # ScheduledResponseRelevancy 가 미리 받아 둔 벡터를 ragas 의 동기 임베딩 호출에 반환
+            evaluator_embeddings = PrefetchedEmbeddingsWrapper(embeddings)
             logger.info("Embeddings model initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing embeddings model: {e}")
@@ -88,21 +180,22 @@ def get_embeddings():
     return evaluator_embeddings
 
 def initialize_metrics(llm, embeddings):
-    global response_relevancy_metric, faithfulness_metric, context_recall_metric, context_precision_metric
-    
-    if response_relevancy_metric is None:
-        response_relevancy_metric = ResponseRelevancy(llm=llm, embeddings=embeddings)
-        
-    if faithfulness_metric is None:
-        faithfulness_metric = Faithfulness(llm=llm)
-        
-    if context_recall_metric is None:
-        context_recall_metric = ContextRecall(llm=llm)
-        
-    if context_precision_metric is None:
-        context_precision_metric = ContextPrecision(llm=llm)
-    
-    logger.info("All metrics initialized successfully")
+    if metric_pool:
+        return
+    from ragas.metrics import (
+        Faithfulness,
+        ContextRecall,
+        ContextPrecision
+    )
+    from scheduler import ScheduledResponseRelevancy
+
+    metric_pool.update({
+        "response_relevancy": ScheduledResponseRelevancy(llm=llm, embeddings=embeddings),
+        "faithfulness": Faithfulness(llm=llm),
+        "context_recall": ContextRecall(llm=llm),
+        "context_precision": ContextPrecision(llm=llm),
+    })
+    logger.info(f"All metrics initialized successfully (worker {os.getpid()})")
 
 # 입력 모델 정의
 class EvaluationRequest(BaseModel):
@@ -111,12 +204,181 @@ class EvaluationRequest(BaseModel):
     retrieved_contexts: Optional[List[str]] = Field(default=None, description="Retrieved contexts used for generation")
     metrics: List[str] = Field(default=["answer_relevancy", "faithfulness"], 
                               description="Metrics to evaluate (answer_relevancy, faithfulness, context_relevancy, context_recall, context_precision)")
+    no_cache: bool = Field(default=False, description="Ignore cached results and score again")
 
 # 평가 결과 모델
 class EvaluationResponse(BaseModel):
     scores: Dict[str, float]
     details: Optional[Dict[str, Any]] = None
 
+# 배치 평가 입력 모델
+class BatchSample(BaseModel):
+    id: Optional[str] = Field(default=None, description="Client-side identifier echoed back in results")
+    user_input: str = Field(..., description="User's question")
+    response: str = Field(..., description="Generated response to evaluate")
+    retrieved_contexts: Optional[List[str]] = Field(default=None, description="Retrieved contexts used for generation")
+
+class BatchEvaluationRequest(BaseModel):
+    samples: List[BatchSample] = Field(..., description="Samples to evaluate")
+    metrics: List[str] = Field(default=["answer_relevancy", "faithfulness"],
+                              description="Metrics to evaluate for every sample")
+    concurrency: Optional[int] = Field(default=None, description="Per-batch concurrency limit (capped by RAGAS_MAX_CONCURRENCY)")
+    no_cache: bool = Field(default=False, description="Ignore cached results and score again")
+
+def prepare_metrics():
+    """LLM/임베딩과 메트릭 인스턴스 준비 (최초 호출 시 한 번 초기화)"""
+    llm = get_llm()
+    embeddings = get_embeddings()
+
+    if not llm:
+        raise HTTPException(status_code=500, detail="LLM not initialized. Check your OpenAI API key.")
+
+    initialize_metrics(llm, embeddings)
+
+# 워밍업 상태: cold → warming → warm (실패하면 failed 로 남고 다음 평가 요청 때 다시 시도)
+warmup_status: Dict[str, Any] = {"state": "cold", "error": None, "seconds": None}
+_warmup_task: Optional[asyncio.Future] = None
+
+def warm_up() -> None:
+    """무거운 모듈 임포트와 클라이언트/메트릭 생성 (API 호출은 하지 않음, 스레드에서 실행)"""
+    prepare_metrics()
+    build_sample("warm up", "warm up", None)
+    try:
+        from langchain_core.messages import HumanMessage
+
+        # 첫 호출의 토큰 수 추정 때 읽는 토크나이저(tiktoken) 미리 로딩
+        get_llm().langchain_llm.get_num_tokens_from_messages([HumanMessage(content="warm up")])
+    except Exception as e:
+        logger.warning(f"Tokenizer warm-up failed: {e}")
+
+async def _run_warm_up() -> None:
+    start = time.perf_counter()
+    try:
+        await asyncio.get_event_loop().run_in_executor(None, warm_up)
+    except Exception as e:
+        warmup_status.update(state="failed", error=getattr(e, "detail", None) or str(e))
+        logger.error(f"Warm-up failed: {warmup_status['error']}")
+        raise
+    warmup_status.update(state="warm", seconds=round(time.perf_counter() - start, 3))
+    logger.info(f"Warm-up finished in {warmup_status['seconds']}s")
+
+def _consume_warm_up_error(task: asyncio.Future) -> None:
+    # 기다리는 요청 없이 실패한 경우 "never retrieved" 경고가 남지 않도록 소비
+    if not task.cancelled():
+        task.exception()
+
+def start_warm_up() -> asyncio.Future:
+    """워밍업을 시작하거나 진행 중인 워밍업을 반환 (실패한 뒤에는 새로 시작)"""
+    global _warmup_task
+    if _warmup_task is None or (_warmup_task.done() and warmup_status["state"] != "warm"):
+        warmup_status.update(state="warming", error=None)
+        _warmup_task = asyncio.ensure_future(_run_warm_up())
+        _warmup_task.add_done_callback(_consume_warm_up_error)
+    return _warmup_task
+
+async def ensure_ready() -> None:
+    """평가 전에 모델/메트릭 준비 (워밍업 중이면 이벤트 루프를 막지 않고 완료를 기다림)"""
+    if warmup_status["state"] != "warm":
+        await asyncio.shield(start_warm_up())
+
+def build_sample(user_input: str, response: str, retrieved_contexts: Optional[List[str]]):
+    from ragas import SingleTurnSample
+
+    # 컨텍스트가 없는 경우 빈 리스트로 설정
+    return SingleTurnSample(
+        user_input=user_input,
+        response=response,
+        retrieved_contexts=retrieved_contexts if retrieved_contexts else []
+    )
+
+async def score_metric(metric_name: str, sample) -> Optional[float]:
+    """
+    메트릭 하나 평가 (evaluation_slots 로 서버 전체 동시 실행 수 제한).
+    컨텍스트가 필요한 메트릭에 컨텍스트가 없거나 알 수 없는 메트릭이면 None 을 반환합니다.
+    """
+    contexts = sample.retrieved_contexts
+    if metric_name == "answer_relevancy":
+        # answer_relevancy 요청 시 response_relevancy 사용
+        metric = metric_pool["response_relevancy"]
+    elif metric_name == "faithfulness":
+        metric = metric_pool["faithfulness"]
+    elif metric_name == "context_relevancy" and contexts:
+        # context_relevancy 대신 response_relevancy 사용 (임시 대체)
+        logger.warning("context_relevancy metric is not available in this version, using response_relevancy instead")
+        metric = metric_pool["response_relevancy"]
+    elif metric_name == "context_recall" and contexts:
+        metric = metric_pool["context_recall"]
+    elif metric_name == "context_precision" and contexts:
+        metric = metric_pool["context_precision"]
+    else:
+        if metric_name in ["context_relevancy", "context_recall", "context_precision"] and not contexts:
+            logger.warning(f"Skipping {metric_name} because no contexts were provided")
+        else:
+            logger.warning(f"Unknown metric: {metric_name}")
+        return None
+
+    from scheduler import run_metric
+
+    # 제한 시간(RAGAS_METRIC_TIMEOUT, scheduler.py)은 동시 실행 자리 대기와 스케줄러 대기를 빼고 잼
+    async with evaluation_slots():
+        try:
+            score = await run_metric(lambda: metric.single_turn_ascore(sample))
+        except asyncio.TimeoutError as e:
+            raise asyncio.TimeoutError(f"{metric_name} {e}")
+    return float(score)
+
+async def cached_score(metric_name: str, sample, fresh: bool = False) -> Optional[float]:
+    """
+    평가 결과 캐시를 거쳐 메트릭 평가. 같은 평가가 이미 진행 중이면 그 결과를 함께 기다립니다.
+    fresh 이면 결과 캐시와 LLM/임베딩 캐시를 조회하지 않고 새로 채점한 결과로 캐시를 갱신합니다.
+    """
+    key = result_key(metric_name, sample.user_input, sample.response, sample.retrieved_contexts, EVALUATOR_MODEL)
+    cache = get_response_cache()
+    if not fresh and cache is not None:
+        # SQLite 잠금 대기가 이벤트 루프를 막지 않도록 스레드에서 조회/저장
+        value = await asyncio.to_thread(cache.get, "result", key)
+        if value is not None:
+            return json.loads(value)
+
+    async def compute() -> Optional[float]:
+        from llm_cache import bypass_cache
+
+        # 별도 태스크에서 실행되므로 이 설정은 이 평가의 LLM/임베딩 호출에만 적용
+        bypass_cache.set(fresh)
+        score = await score_metric(metric_name, sample)
+        if score is not None and cache is not None:
+            await asyncio.to_thread(cache.put, "result", key, json.dumps(score).encode())
+        return score
+
+    return await score_flights.run((key, fresh), compute)
+
+def wants_fresh(no_cache: bool, cache_control: Optional[str]) -> bool:
+    """요청 본문의 no_cache 또는 Cache-Control: no-cache 헤더로 새로 채점 요청"""
+    return no_cache or "no-cache" in (cache_control or "").lower()
+
+async def evaluate_metrics(metric_names: List[str], sample, fresh: bool = False) -> Tuple[Dict[str, float], Dict[str, Any]]:
+    """
+    요청된 메트릭을 동시에 평가 (응답 시간이 메트릭 시간의 합이 아닌 최대값).
+    실패하거나 제한 시간을 넘긴 메트릭은 -1 과 오류 내용으로 기록하고 나머지 결과는 유지합니다.
+    """
+    results = await asyncio.gather(
+        *(cached_score(metric_name, sample, fresh) for metric_name in metric_names),
+        return_exceptions=True
+    )
+
+    scores = {}
+    details = {}
+    for metric_name, result in zip(metric_names, results):
+        if isinstance(result, asyncio.CancelledError):
+            raise result
+        if isinstance(result, BaseException):
+            logger.error(f"Error evaluating {metric_name}: {result}")
+            scores[metric_name] = -1  # 오류 표시
+            details[f"{metric_name}_error"] = str(result)
+        elif result is not None:
+            scores[metric_name] = result
+    return scores, details
+
 # 상태 확인 엔드포인트
 @app.get("/")
 async def root():
@@ -124,72 +386,18 @@ async def root():
 
 # 평가 엔드포인트
 @app.post("/evaluate", response_model=EvaluationResponse)
-async def evaluate(request: EvaluationRequest):
+async def evaluate(request: EvaluationRequest, cache_control: Optional[str] = Header(default=None)):
     try:
         logger.info(f"Received evaluation request for metrics: {request.metrics}")
         
-        # LLM 및 임베딩 모델 가져오기
-        llm = get_llm()
-        embeddings = get_embeddings()
-        
-        if not llm:
-            raise HTTPException(status_code=500, detail="LLM not initialized. Check your OpenAI API key.")
-        
-        # 메트릭 초기화
-        initialize_metrics(llm, embeddings)
-        
-        # 평가 결과 저장 딕셔너리
-        scores = {}
-        details = {}
+        # LLM 및 임베딩 모델, 메트릭 준비
+        await ensure_ready()
         
         # RAGAS 샘플 생성
-        from ragas import SingleTurnSample
-        
-        # 컨텍스트가 없는 경우 빈 리스트로 설정
-        contexts = request.retrieved_contexts if request.retrieved_contexts else []
-        
-        sample = SingleTurnSample(
-            user_input=request.user_input,
-            response=request.response,
-            retrieved_contexts=contexts
-        )
+        sample = build_sample(request.user_input, request.response, request.retrieved_contexts)
         
-        # 요청된 메트릭에 따라 평가 수행
-        for metric_name in request.metrics:
-            try:
-                if metric_name == "answer_relevancy":
-                    # answer_relevancy 요청 시 response_relevancy 사용
-                    score = await response_relevancy_metric.single_turn_ascore(sample)
-                    scores["answer_relevancy"] = float(score)
-                    
-                elif metric_name == "faithfulness":
-                    score = await faithfulness_metric.single_turn_ascore(sample)
-                    scores["faithfulness"] = float(score)
-                    
-                elif metric_name == "context_relevancy" and contexts:
-                    # context_relevancy 대신 response_relevancy 사용 (임시 대체)
-                    logger.warning("context_relevancy metric is not available in this version, using response_relevancy instead")
-                    score = await response_relevancy_metric.single_turn_ascore(sample)
-                    scores["context_relevancy"] = float(score)
-                    
-                elif metric_name == "context_recall" and contexts:
-                    score = await context_recall_metric.single_turn_ascore(sample)
-                    scores["context_recall"] = float(score)
-                    
-                elif metric_name == "context_precision" and contexts:
-                    score = await context_precision_metric.single_turn_ascore(sample)
-                    scores["context_precision"] = float(score)
-                    
-                else:
-                    if metric_name in ["context_relevancy", "context_recall", "context_precision"] and not contexts:
-                        logger.warning(f"Skipping {metric_name} because no contexts were provided")
-                    else:
-                        logger.warning(f"Unknown metric: {metric_name}")
-                        
-            except Exception as e:
-                logger.error(f"Error evaluating {metric_name}: {e}")
-                scores[metric_name] = -1  # 오류 표시
-                details[f"{metric_name}_error"] = str(e)
+        # 요청된 메트릭을 동시에 평가
+        scores, details = await evaluate_metrics(request.metrics, sample, wants_fresh(request.no_cache, cache_control))
         
         # 결과 반환
         return EvaluationResponse(
@@ -201,6 +409,154 @@ async def evaluate(request: EvaluationRequest):
         logger.error(f"Evaluation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def validate_batch(request: BatchEvaluationRequest) -> None:
+    if not request.samples or not request.metrics:
+        raise HTTPException(status_code=400, detail="samples and metrics must not be empty")
+    if len(request.samples) > RAGAS_MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Too many samples (max {RAGAS_MAX_BATCH_SIZE})")
+
+async def batch_events(request: BatchEvaluationRequest, fresh: bool) -> AsyncIterator[dict]:
+    """
+    모든 샘플×메트릭을 한 번에 스케줄링하고 샘플이 끝나는 순서대로 이벤트를 생성
+    (start → 샘플별 result → done). 생성기가 닫히거나 취소되면 남은 평가도 취소합니다.
+    """
+    samples = [build_sample(s.user_input, s.response, s.retrieved_contexts) for s in request.samples]
+    # 배치별 제한은 서버 전체 제한(evaluation_slots) 안에서 추가로 적용
+    batch_slots = asyncio.Semaphore(max(1, min(request.concurrency or RAGAS_MAX_CONCURRENCY, RAGAS_MAX_CONCURRENCY)))
+
+    async def run(index: int, metric_name: str) -> Tuple[int, str, Optional[float], Optional[str]]:
+        async with batch_slots:
+            try:
+                return index, metric_name, await cached_score(metric_name, samples[index], fresh), None
+            except Exception as e:
+                logger.error(f"Error evaluating {metric_name} for sample {index}: {e}")
+                return index, metric_name, None, str(e)
+
+    tasks = [
+        asyncio.create_task(run(index, metric_name))
+        for index in range(len(samples))
+        for metric_name in request.metrics
+    ]
+    remaining = [len(request.metrics)] * len(samples)
+    scores: List[Dict[str, float]] = [{} for _ in samples]
+    details: List[Dict[str, Any]] = [{} for _ in samples]
+    failed = 0
+    try:
+        yield {"type": "start", "samples": len(samples), "metrics": request.metrics}
+        for next_done in asyncio.as_completed(tasks):
+            index, metric_name, score, error = await next_done
+            if error is not None:
+                scores[index][metric_name] = -1  # 오류 표시
+                details[index][f"{metric_name}_error"] = error
+            elif score is not None:
+                scores[index][metric_name] = score
+            remaining[index] -= 1
+            if remaining[index] == 0:
+                failed += bool(details[index])
+                yield {
+                    "type": "result",
+                    "index": index,
+                    "id": request.samples[index].id,
+                    "scores": scores[index],
+                    "details": details[index] or None
+                }
+        yield {"type": "done", "samples": len(samples), "failed": failed}
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# 배치 평가 엔드포인트: 샘플이 끝나는 순서대로 NDJSON 으로 전송 (연결이 끊기면 남은 평가 취소)
+@app.post("/evaluate/batch")
+async def evaluate_batch(request: BatchEvaluationRequest, cache_control: Optional[str] = Header(default=None)):
+    validate_batch(request)
+    logger.info(f"Received batch evaluation request: {len(request.samples)} samples, metrics: {request.metrics}")
+    await ensure_ready()
+
+    async def lines():
+        async for event in batch_events(request, wants_fresh(request.no_cache, cache_control)):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
+# 배치 평가 작업: 연결과 독립적으로 실행하고 진행 상황은 SSE 로 구독 (재연결 가능, DELETE 로 취소)
+@app.post("/evaluate/jobs")
+async def create_evaluation_job(request: BatchEvaluationRequest, cache_control: Optional[str] = Header(default=None)):
+    validate_batch(request)
+    logger.info(f"Received evaluation job: {len(request.samples)} samples, metrics: {request.metrics}")
+    await ensure_ready()
+
+    job = await batch_jobs.start_job(len(request.samples), batch_events(request, wants_fresh(request.no_cache, cache_control)))
+    return {**job.status(), "events": f"/evaluate/jobs/{job.id}/events"}
+
+async def get_job_status(job_id: str) -> dict:
+    # 다른 워커가 실행 중인 작업도 공유 기록으로 조회
+    status = await batch_jobs.job_status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Evaluation job not found: {job_id}")
+    return status
+
+@app.get("/evaluate/jobs/{job_id}")
+async def evaluation_job_status(job_id: str):
+    return await get_job_status(job_id)
+
+@app.get("/evaluate/jobs/{job_id}/events")
+async def evaluation_job_events(job_id: str, last_event_id: Optional[str] = Header(default=None)):
+    await get_job_status(job_id)
+    # EventSource 가 재연결하면 마지막으로 받은 이벤트 다음부터 전송
+    try:
+        start = int(last_event_id) + 1 if last_event_id else 0
+    except ValueError:
+        start = 0
+
+    async def stream():
+        yield "retry: 3000\n\n"
+        async for item in batch_jobs.follow_job(job_id, start):
+            if item is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield batch_jobs.sse_message(*item)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.delete("/evaluate/jobs/{job_id}")
+async def cancel_evaluation_job(job_id: str):
+    await get_job_status(job_id)
+    # 남은 평가가 취소되고 취소 이벤트가 기록된 뒤의 상태를 반환
+    return await batch_jobs.cancel_job(job_id)
+
+# LLM 응답/임베딩 캐시 통계 (namespace 별 적중률)
+@app.get("/cache/stats")
+async def cache_stats():
+    # 워밍업이나 첫 평가 전에는 캐시를 열지 않음 (열려면 llm_cache 임포트가 필요)
+    if response_cache is None:
+        return {"enabled": RAGAS_CACHE_ENABLED, "opened": False, "flights": score_flights.stats()}
+    return {"enabled": True, "opened": True, **await asyncio.to_thread(response_cache.stats), "flights": score_flights.stats()}
+
+# 모델별 API 호출 스케줄러 상태 (대기 수, 재시도, 429 횟수, 서킷 브레이커)
+@app.get("/scheduler/stats")
+async def scheduler_stats():
+    # 모듈이 아직 임포트되지 않았으면 호출도 없었던 것이므로 임포트하지 않고 빈 상태 반환
+    scheduler_module = sys.modules.get("scheduler")
+    models = list(scheduler_module.schedulers.values()) if scheduler_module else []
+    stats = {"backend": RAGAS_BACKEND, "models": [scheduler.stats() for scheduler in models]}
+    local_backend = sys.modules.get("local_backend")
+    if RAGAS_BACKEND == "local" and local_backend:
+        # 로컬 대역이 주입한 오류 수 (스케줄러의 재시도/429 집계와 비교용)
+        stats["local"] = local_backend.stats()
+    return stats
+
+# 준비 상태 확인 (로드 밸런서/오케스트레이터용): 워밍업이 끝나야 200, 그 전에는 503
+# RAGAS_WARMUP=0 이면 첫 평가 요청이 준비를 맡으므로 항상 200 (503 이면 평가 요청이 오지 않아 준비되지 않음)
+@app.get("/ready")
+async def ready():
+    content = {**warmup_status, "warmup": RAGAS_WARMUP, "backend": RAGAS_BACKEND, "worker": os.getpid()}
+    accepting = warmup_status["state"] == "warm" or not RAGAS_WARMUP
+    return JSONResponse(status_code=200 if accepting else 503, content=content)
+
 # 메트릭 설명 엔드포인트
 @app.get("/metrics/info")
 async def metrics_info():
@@ -234,4 +590,5 @@ async def metrics_info():
 
 # 직접 실행 시 서버 시작
 if __name__ == "__main__":
-    uvicorn.run("server:app", host="0.0.0.0", port=8001, reload=True) 
\ No newline at end of file
+    # 워커가 여럿이면 코드 변경 시 자동 재시작(reload)은 사용할 수 없음
+    uvicorn.run("server:app", host="0.0.0.0", port=8001, workers=RAGAS_WORKERS, reload=RAGAS_WORKERS == 1) 
\ No newline at end of file
@@ -0,0 +1,53 @@
+# src/python/ragas_api_py/test/relevancy_parity_test.py
+"""
+ScheduledResponseRelevancy 가 ragas 의 ResponseRelevancy 와 같은 점수를 내는지 확인.
+
+로컬 대역(local_backend.py)의 결정적 LLM/임베딩으로 두 메트릭을 같은 샘플에 평가해 비교하므로
+OpenAI 키 없이 실행할 수 있습니다. ragas 버전을 올릴 때 함께 실행하세요.
+
+사용 예:
+    RAGAS_LOCAL_LLM_LATENCY=fixed:0 RAGAS_LOCAL_EMBEDDING_LATENCY=fixed:0 python test/relevancy_parity_test.py
+"""
+import asyncio
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ragas import SingleTurnSample
+from ragas.embeddings import LangchainEmbeddingsWrapper
+from ragas.metrics import ResponseRelevancy
+
+from local_backend import LocalChatModel, LocalEmbeddings
+from scheduler import PerCallLLMWrapper, PrefetchedEmbeddingsWrapper, ScheduledEmbeddings, ScheduledResponseRelevancy
+
+SAMPLES = [
+    ("When was the first Super Bowl?", "The first Super Bowl was held on January 15, 1967, in Los Angeles."),
+    ("What is the capital of France?", "France is a country in Western Europe. Its capital is Paris."),
+    ("강의료 기준을 알려줘", "일반 강사는 기본 160, 초과 90의 수당을 받습니다."),
+    ("출장비 정산 절차는 어떻게 되나요?", "출장 후 5일 이내에 영수증을 첨부해 여비 정산서를 제출합니다."),
+]
+
+
+async def compare() -> int:
+    llm = PerCallLLMWrapper(LocalChatModel(model_name="local-llm"))
+    stock = ResponseRelevancy(llm=llm, embeddings=LangchainEmbeddingsWrapper(LocalEmbeddings()))
+    scheduled = ScheduledResponseRelevancy(
+        llm=llm,
+        embeddings=PrefetchedEmbeddingsWrapper(ScheduledEmbeddings(LocalEmbeddings(), "local-embedding"))
+    )
+
+    mismatches = 0
+    for user_input, response in SAMPLES:
+        sample = SingleTurnSample(user_input=user_input, response=response, retrieved_contexts=[])
+        expected = await stock.single_turn_ascore(sample)
+        actual = await scheduled.single_turn_ascore(sample)
+        same = (math.isnan(expected) and math.isnan(actual)) or math.isclose(expected, actual, rel_tol=1e-9)
+        mismatches += not same
+        print(f"{'OK ' if same else 'ERR'} {expected:.6f} {actual:.6f}  {user_input}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(compare()) else 0)
@@ -2,13 +2,14 @@
 """
 RAGAS API 테스트 스크립트
 """
+import os
 import requests
 import json
 import sys
 
 def test_api():
     """RAGAS API 서버 테스트"""
-    base_url = "http://localhost:8001"
+    base_url = os.getenv("RAGAS_API_URL", "http://localhost:8001")
     
     # 1. 서버 상태 확인
     try:
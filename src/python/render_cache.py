@@ -0,0 +1,165 @@
+# src/python/render_cache.py
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# 렌더링 캐시 설정 (환경 변수로 조정 가능)
+RENDER_MEMORY_MAX_BYTES = int(os.getenv("PDF_RENDER_MEMORY_MAX_BYTES", str(128 * 1024 * 1024)))
+RENDER_DISK_MAX_BYTES = int(os.getenv("PDF_RENDER_DISK_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+
+def render_key(
+    doc_hash: str,
+    page_number: int,
+    dpi: int,
+    max_size: Optional[int],
+    image_format: str,
+    clip: Optional[List[float]] = None
+) -> str:
+    """렌더링 결과는 문서 내용과 옵션으로 결정되므로 키를 그대로 ETag 로 사용"""
+    raw = f"{doc_hash}:{page_number}:{dpi}:{max_size or 0}:{image_format}"
+    if clip is not None:
+        raw += ":" + ",".join(f"{value:.2f}" for value in clip)
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+class RenderCache:
+    """
+    페이지 렌더링 이미지를 메모리 LRU 와 디스크에 나눠 보관하는 2단계 캐시.
+
+    메모리는 max_memory_bytes, 디스크는 max_disk_bytes 를 넘으면 가장 오래 사용되지 않은
+    항목부터 제거합니다. 디스크 사용량은 기록할 때마다 더해 두고, 한도를 넘었을 때만 디렉토리를
+    다시 읽어 정리합니다. 같은 키를 동시에 요청하면 렌더링을 한 번만 수행하며, 처음 요청한 쪽이
+    취소되어도 다른 요청은 결과를 받습니다.
+    """
+
+    def __init__(self, root: Path, max_memory_bytes: int = RENDER_MEMORY_MAX_BYTES, max_disk_bytes: int = RENDER_DISK_MAX_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._inflight: Dict[str, list] = {}
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        with self._disk_lock:
+            self._evict_disk()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def contains(self, key: str) -> bool:
+        return key in self._memory or key in self._inflight or (self.root / key).exists()
+
+    async def get_or_render(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return data
+
+        flight = self._inflight.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(self._load(key, render))
+            # [태스크, 기다리는 요청 수]
+            flight = self._inflight[key] = [task, 0]
+            task.add_done_callback(lambda done: self._on_done(key, done))
+
+        task = flight[0]
+        flight[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            flight[1] -= 1
+            if flight[1] == 0 and not task.done():
+                task.cancel()
+
+    async def _load(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        data = await asyncio.to_thread(self._read_disk, key)
+        if data is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            data = await render()
+            await asyncio.to_thread(self._write_disk, key, data)
+        self._remember(key, data)
+        return data
+
+    def _on_done(self, key: str, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # 기다리던 요청이 모두 취소된 뒤 실패한 경우 "never retrieved" 경고가 남지 않도록 소비
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "max_memory_bytes": self.max_memory_bytes,
+            "disk_bytes": self._disk_bytes,
+            "max_disk_bytes": self.max_disk_bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self.root / key
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return data
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        path = self.root / key
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        with self._disk_lock:
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, path)
+            self._disk_bytes += len(data) - replaced
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        # 디스크 용량 초과 시 접근 시각(mtime)이 오래된 파일부터 삭제하고 사용량을 실제 값으로 맞춤
+        entries = []
+        for f in self.root.iterdir():
+            if f.suffix == ".tmp":
+                continue
+            try:
+                st = f.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, f))
+        total = sum(size for _, size, _ in entries)
+        # 한도의 90% 까지 비워 다음 몇 번의 기록은 디렉토리를 다시 읽지 않도록 함
+        target = self.max_disk_bytes * 9 // 10 if total > self.max_disk_bytes else total
+        for _, size, f in sorted(entries):
+            if total <= target:
+                break
+            f.unlink(missing_ok=True)
+            total -= size
+        self._disk_bytes = total
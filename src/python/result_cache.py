@@ -0,0 +1,83 @@
+# src/python/result_cache.py
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class AsyncLruCache:
+    """
+    비동기로 계산되는 결과를 보관하는 LRU 캐시.
+
+    같은 키를 동시에 요청하면 계산을 한 번만 수행하고 결과를 함께 기다립니다
+    (single-flight). 계산은 별도 태스크에서 실행되므로 처음 요청한 쪽이 취소되어도(클라이언트 연결
+    끊김) 다른 요청은 결과를 받고, 기다리는 요청이 모두 취소되면 계산도 취소합니다.
+    계산이 실패하면 캐시에 남기지 않습니다.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._inflight: Dict[Hashable, list] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Any:
+        return self._entries.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        if key in self._entries:
+            return self.get(key)
+        flight = self._inflight.get(key)
+        if flight is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._compute(key, compute))
+            # [태스크, 기다리는 요청 수]
+            flight = self._inflight[key] = [task, 0]
+            task.add_done_callback(lambda done: self._on_done(key, done))
+        else:
+            self.hits += 1
+
+        task = flight[0]
+        flight[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            flight[1] -= 1
+            if flight[1] == 0 and not task.done():
+                task.cancel()
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = await compute()
+        self.put(key, value)
+        return value
+
+    def _on_done(self, key: Hashable, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # 기다리던 요청이 모두 취소된 뒤 실패한 경우 "never retrieved" 경고가 남지 않도록 소비
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,217 @@
+# src/python/search_index.py
+import gzip
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 검색 인덱스 저장소 설정 (환경 변수로 조정 가능)
+SEARCH_STORE_MAX_BYTES = int(os.getenv("PDF_SEARCH_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_DOC_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# 문자 n-gram 길이 (한국어는 띄어쓰기가 일정하지 않아 형태소 대신 문자 bigram 사용)
+NGRAM = 2
+
+
+def normalize(text: str) -> str:
+    """공백을 모두 제거하고 소문자로 변환 (띄어쓰기와 대소문자에 관계없이 검색)"""
+    return "".join(text.split()).lower()
+
+
+def ngrams(text: str, n: int = NGRAM) -> List[str]:
+    if len(text) < n:
+        return [text] if text else []
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+def compact_positions(text: str) -> Tuple[str, List[int]]:
+    """normalize 결과와, 그 각 문자가 원문에서 위치한 인덱스"""
+    chars, positions = [], []
+    for i, ch in enumerate(text):
+        if not ch.isspace():
+            lowered = ch.lower()
+            # 소문자 변환으로 길이가 바뀌는 문자(예: 'İ')도 원문 위치를 유지
+            chars.append(lowered)
+            positions.extend([i] * len(lowered))
+    return "".join(chars), positions
+
+
+class SearchIndex:
+    """
+    문서 전체 텍스트 줄에 대한 문자 n-gram 역색인.
+
+    검색어의 n-gram 을 모두 포함하는 줄만 후보로 골라 실제 문자열 비교로 확인하고,
+    일치 구간에 걸친 span 의 bbox 를 반환합니다. 한 줄 안의 span 경계는 넘어서 찾지만
+    여러 줄에 걸친 구절은 찾지 않습니다.
+    """
+
+    def __init__(self, pages: Dict[int, List[dict]]):
+        # 줄 목록: (페이지 번호, {"text", "bbox", "spans": [[offset, x0, y0, x1, y1], ...]})
+        self.lines: List[Tuple[int, dict]] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.page_count = len(pages)
+        for page_number in sorted(pages):
+            for line in pages[page_number]:
+                line_id = len(self.lines)
+                self.lines.append((page_number, line))
+                for gram in set(ngrams(normalize(line["text"]))):
+                    self.postings.setdefault(gram, []).append(line_id)
+
+    def _candidates(self, query: str) -> Iterable[int]:
+        grams = set(ngrams(query))
+        if len(query) < NGRAM:
+            # n-gram 보다 짧은 검색어는 그 문자를 포함하는 n-gram 들의 합집합
+            found: Set[int] = set()
+            for gram, line_ids in self.postings.items():
+                if query in gram:
+                    found.update(line_ids)
+            return sorted(found)
+        lists = sorted((self.postings.get(gram, []) for gram in grams), key=len)
+        if not lists or not lists[0]:
+            return []
+        found = set(lists[0])
+        for line_ids in lists[1:]:
+            found.intersection_update(line_ids)
+            if not found:
+                return []
+        return sorted(found)
+
+    def search(self, query: str, limit: int = 100) -> dict:
+        query = normalize(query)
+        if not query:
+            raise ValueError("Search query is empty")
+
+        hits = []
+        pages = set()
+        total = 0
+        for line_id in self._candidates(query):
+            page_number, line = self.lines[line_id]
+            text, positions = compact_positions(line["text"])
+            start = text.find(query)
+            while start != -1:
+                total += 1
+                pages.add(page_number)
+                if len(hits) < limit:
+                    first, last = positions[start], positions[start + len(query) - 1] + 1
+                    hits.append({
+                        "page": page_number,
+                        "text": line["text"],
+                        "bboxes": self._hit_bboxes(line, first, last)
+                    })
+                start = text.find(query, start + 1)
+        return {
+            "query": query,
+            "total": total,
+            "pages": sorted(pages),
+            "hits": hits
+        }
+
+    @staticmethod
+    def _hit_bboxes(line: dict, first: int, last: int) -> List[List[float]]:
+        """원문 [first, last) 구간과 겹치는 span 들의 bbox (span 정보가 없으면 줄 bbox)"""
+        spans = line.get("spans") or []
+        bboxes = []
+        for i, (offset, *bbox) in enumerate(spans):
+            end = spans[i + 1][0] if i + 1 < len(spans) else len(line["text"])
+            if offset < last and end > first:
+                bboxes.append(bbox)
+        return bboxes or [line["bbox"]]
+
+    def pages(self) -> Dict[int, List[dict]]:
+        """생성자에 넘긴 형식의 페이지별 줄 목록 (저장용)"""
+        pages: Dict[int, List[dict]] = {}
+        for page_number, line in self.lines:
+            pages.setdefault(page_number, []).append(line)
+        return pages
+
+    def stats(self) -> dict:
+        return {
+            "pages": self.page_count,
+            "lines": len(self.lines),
+            "terms": len(self.postings),
+        }
+
+
+class SearchIndexStore:
+    """
+    검색 인덱스를 문서 ID(SHA-256)로 디스크에 보관하는 저장소.
+
+    페이지별 줄 목록만 gzip JSON 으로 저장하고 역색인은 읽을 때 다시 만듭니다.
+    내용 해시가 키이므로 같은 문서를 다시 올리거나 서버를 다시 시작해도, 다른 워커 프로세스에서도
+    그대로 재사용됩니다. 전체 크기가 max_bytes 를 넘으면 가장 오래 접근하지 않은 파일부터 삭제합니다.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = SEARCH_STORE_MAX_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes = 0
+        with self._lock:
+            self._evict()
+
+    def path(self, doc_id: str) -> Path:
+        if not _DOC_ID_RE.match(doc_id):
+            raise ValueError(f"Invalid document id: {doc_id}")
+        return self.root / f"{doc_id}.json.gz"
+
+    def get(self, doc_id: str) -> Optional[SearchIndex]:
+        """저장된 인덱스를 읽어 반환 (없으면 None)"""
+        path = self.path(doc_id)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                pages = json.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return SearchIndex({int(page_number): lines for page_number, lines in pages.items()})
+
+    def put(self, doc_id: str, index: SearchIndex) -> None:
+        path = self.path(doc_id)
+        data = gzip.compress(json.dumps(index.pages(), ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._bytes += len(data)
+            if self._bytes > self.max_bytes:
+                self._evict(keep=path)
+
+    def delete(self, doc_id: str) -> bool:
+        try:
+            self.path(doc_id).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def stats(self) -> dict:
+        with self._lock:
+            files = [f for f in self.root.iterdir() if f.suffix != ".tmp"]
+            return {
+                "indexes": len(files),
+                "bytes": sum(f.stat().st_size for f in files),
+                "max_bytes": self.max_bytes,
+            }
+
+    def _evict(self, keep: Optional[Path] = None) -> None:
+        # 용량 초과 시 오래된 파일부터 삭제 (한도의 90% 까지 비워 매번 디렉토리를 읽지 않도록 함)
+        entries = []
+        for f in self.root.iterdir():
+            if f.suffix == ".tmp" or f == keep:
+                continue
+            try:
+                st = f.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, f))
+        total = sum(size for _, size, _ in entries) + (keep.stat().st_size if keep else 0)
+        target = self.max_bytes * 9 // 10 if total > self.max_bytes else total
+        for _, size, f in sorted(entries):
+            if total <= target:
+                break
+            f.unlink(missing_ok=True)
+            total -= size
+        self._bytes = total
@@ -1,16 +1,67 @@
 # src/python/server.py
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Request, Response
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 import uvicorn
+import asyncio
 import json
+import logging
+import math
+import mimetypes
 import os
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-import shutil
-import pymupdf4llm
-import fitz
-from typing import List
 
-app = FastAPI()
+import metrics
+import pdf_ops
+from doc_cache import hash_bytes
+from doc_store import DocumentStore
+from image_store import ImageStore
+from job_queue import JobQueue, CANCELLED, FAILED
+from layout_index import LayoutIndex
+from pdf_ops import DocumentNotCachedError, DocumentSource
+from render_cache import RenderCache, render_key
+from result_cache import AsyncLruCache
+from search_index import SearchIndex, SearchIndexStore
+from worker_pool import pdf_pool, QueueFullError, JobTimeoutError, WorkerCrashedError
+
+# 로깅 설정 (요청마다 남는 상세 로그는 DEBUG, PDF_LOG_LEVEL 로 조정)
+logging.basicConfig(
+    level=os.getenv("PDF_LOG_LEVEL", "INFO").upper(),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("pdf_server")
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSON 직렬화 시간을 encode 단계로 기록하는 응답"""
+
+    def render(self, content) -> bytes:
+        with metrics.timed("encode"):
+            return super().render(content)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # PyMuPDF 작업용 워커 프로세스 시작/종료
+    pdf_pool.start()
+
+    # 재시작 전에 실행 중이던 작업은 체크포인트 이후부터 재개
+    requeued = job_queue.requeue_running()
+    logger.info("Job queue ready: %d resumed", requeued)
+    runners = [asyncio.create_task(job_runner()) for _ in range(PDF_JOB_RUNNERS)]
+
+    yield
+
+    for runner in runners:
+        runner.cancel()
+    await asyncio.gather(*runners, return_exceptions=True)
+    job_queue.close()
+    pdf_pool.shutdown()
+
+app = FastAPI(lifespan=lifespan, default_response_class=TimedJSONResponse)
 
 # CORS 설정
 app.add_middleware(
@@ -19,159 +70,241 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    """요청별 단계 시간을 모아 Server-Timing 헤더와 /metrics 히스토그램에 반영"""
+    timings: Dict[str, float] = {}
+    token = metrics.request_timings.set(timings)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        metrics.request_timings.reset(token)
+    # 문서 ID 등으로 레이블이 늘어나지 않도록 경로 대신 라우트 템플릿 사용
+    route = request.scope.get("route")
+    endpoint = route.path if route is not None else "unmatched"
+    response.headers["Server-Timing"] = metrics.finish_request(
+        endpoint, response.status_code, time.perf_counter() - start, timings
+    )
+    return response
+
 # 임시 파일 저장 디렉토리
 TEMP_DIR = Path("temp")
 TEMP_DIR.mkdir(exist_ok=True)
 
+# 한 번 업로드한 문서를 보관하는 저장소 (문서 ID 기반 요청용)
+document_store = DocumentStore(TEMP_DIR / "documents")
+
+# 이 크기 이하의 업로드는 메모리에서 바로 열고, 큰 업로드는 해시하면서 저장소에 바로 기록
+PDF_INLINE_MAX_BYTES = int(os.getenv("PDF_INLINE_MAX_BYTES", str(8 * 1024 * 1024)))
+# 바이트를 워커에 보낸 적이 있는 업로드의 문서 해시 (이후 작업은 해시만 보내 워커 캐시의 핸들 사용)
+inline_documents = AsyncLruCache(int(os.getenv("PDF_INLINE_DOCUMENT_ENTRIES", "256")))
+
+# 여러 페이지 추출 시 워커 하나에 넘기는 최대 페이지 수
+PDF_BATCH_CHUNK = int(os.getenv("PDF_BATCH_CHUNK", "8"))
+
+# 문서별 레이아웃 인덱스 (문서 해시 기준, 메모리에 보관)
+layout_cache = AsyncLruCache(int(os.getenv("PDF_LAYOUT_CACHE_ENTRIES", "8")))
+
+# 문서별 페이지 수 (문서 해시 기준)
+page_count_cache = AsyncLruCache(256)
+
+# 페이지 렌더링 이미지 캐시 (메모리 + 디스크)와 앞뒤 페이지 미리 렌더링 범위
+render_cache = RenderCache(TEMP_DIR / "renders")
+PDF_RENDER_PREFETCH = int(os.getenv("PDF_RENDER_PREFETCH", "1"))
+_background_tasks = set()
+
+# 추출한 이미지 저장소 (내용 해시 기준 중복 제거)와 (문서 해시, xref) → 파일 경로 매핑
+image_store = ImageStore(TEMP_DIR / "images")
+image_paths = AsyncLruCache(int(os.getenv("PDF_IMAGE_INDEX_ENTRIES", "4096")))
+
+# 대용량 변환 작업 대기열 (SQLite) 과 작업용 문서 저장소 (작업 결과 보관 기간 동안 유지)
+PDF_JOB_RUNNERS = int(os.getenv("PDF_JOB_RUNNERS", "1"))
+PDF_JOB_RETENTION_SECONDS = int(os.getenv("PDF_JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+PDF_JOB_PURGE_INTERVAL = int(os.getenv("PDF_JOB_PURGE_INTERVAL", "3600"))
+job_queue = JobQueue(TEMP_DIR / "jobs.sqlite3")
+job_document_store = DocumentStore(TEMP_DIR / "job_documents", ttl_seconds=PDF_JOB_RETENTION_SECONDS)
+job_wakeup = asyncio.Event()
+_next_purge = 0.0
+
+# (문서 해시, 페이지) 별 지문과 지문 기준 페이지 결과 (개정판 문서에서 바뀌지 않은 페이지의 변환/분석 결과 재사용)
+fingerprint_cache = AsyncLruCache(int(os.getenv("PDF_FINGERPRINT_ENTRIES", "16384")))
+page_result_cache = AsyncLruCache(int(os.getenv("PDF_PAGE_RESULT_ENTRIES", "2048")))
+doc_info_cache = AsyncLruCache(256)
+
+# 문서별 전문 검색 인덱스 (문서 해시 기준, 요청한 문서만 생성해 디스크에 보관하고 최근 인덱스는 메모리에도 유지)
+search_store = SearchIndexStore(TEMP_DIR / "search")
+search_indexes = AsyncLruCache(int(os.getenv("PDF_SEARCH_INDEX_ENTRIES", "16")))
+
+# 표 감지 결과 ((페이지 지문, clip) 기준)와 문서별 전체 표 목록
+table_cache = AsyncLruCache(int(os.getenv("PDF_TABLE_CACHE_ENTRIES", "512")))
+table_catalog_cache = AsyncLruCache(int(os.getenv("PDF_TABLE_CATALOG_ENTRIES", "16")))
+
+
+def upload_size(file: UploadFile) -> int:
+    size = getattr(file, "size", None)
+    if size is not None:
+        return size
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
+async def read_upload(file: UploadFile) -> DocumentSource:
+    """
+    업로드를 워커로 보낼 문서 참조로 변환 (작은 업로드는 임시 파일 왕복 없이 처리).
+
+    PDF_INLINE_MAX_BYTES 이하는 메모리로 읽어 해시하고 바이트를 그대로 워커에 넘겨
+    fitz.open(stream=...) 으로 엽니다. 바이트는 문서를 연 적이 없는 워커에만 보내므로
+    한 요청이 여러 작업(지문, 분석, 표 감지 등)으로 나뉘어도 작업마다 복사하지 않습니다 (run_pdf_job).
+    그보다 큰 파일은 해시하면서 저장소에 고유한 이름으로 기록한 뒤 경로만 넘겨
+    MuPDF 가 필요한 부분만 파일에서 읽게 합니다.
+    """
+    try:
+        with metrics.timed("upload"):
+            if upload_size(file) > PDF_INLINE_MAX_BYTES:
+                doc_id, _ = await asyncio.to_thread(document_store.put_stream, file.file)
+                return stored_source(doc_id)
+            data = await file.read()
+    finally:
+        file.file.close()
+    with metrics.timed("hash"):
+        doc_hash = await asyncio.to_thread(hash_bytes, data)
+    return DocumentSource(doc_hash, data=data)
+
+
+async def keep_upload(source: DocumentSource) -> DocumentSource:
+    """메모리로 받은 업로드를 저장소에 보관 (images 모드 결과의 링크가 문서 ID 로 다시 조회하므로)"""
+    if source.data is None:
+        return source
+    with metrics.timed("upload"):
+        await asyncio.to_thread(document_store.put, source.data, source.doc_hash)
+    return source
+
+
+def stored_source(document_id: str) -> DocumentSource:
+    """문서 ID 로 저장소의 PDF 경로를 조회 (워커는 캐시에 열린 핸들이 있으면 재사용)"""
+    path = document_store.get(document_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Document not found or expired")
+    return DocumentSource(document_id, path=str(path))
+
+
+def linked_source(document_id: str) -> DocumentSource:
+    """
+    images 모드 결과의 이미지/그림 링크가 가리키는 문서 조회.
+    작업으로 변환한 문서는 작업용 저장소에만 있으므로 문서 저장소에 없으면 그쪽에서 찾습니다.
+    """
+    path = document_store.get(document_id) or job_document_store.get(document_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Document not found or expired")
+    return DocumentSource(document_id, path=str(path))
+
+
+async def run_pdf_job(source: DocumentSource, op: str, *args):
+    """
+    PDF 작업을 워커 풀에서 실행 (대기열 초과 시 503, 시간 초과 시 504).
+    워커가 측정한 단계 시간과, 나머지(대기열 대기 + 프로세스 간 전달)를 worker_wait 로 기록합니다.
+    같은 문서의 작업은 그 문서를 캐시에 연 워커로 보냅니다 (워커가 다시 시작된 경우도 503).
+    메모리로 받은 업로드는 바이트를 보낸 적이 있으면 해시만 보내고, 그 워커에 문서가 없을 때만
+    (다른 워커로 배정, 캐시에서 제거) 바이트와 함께 다시 보냅니다.
+    """
+    start = time.perf_counter()
+    try:
+        if source.data is not None and source.doc_hash in inline_documents:
+            try:
+                result, timings = await pdf_pool.run(
+                    pdf_ops.run, source._replace(data=None), op, *args, key=source.doc_hash
+                )
+            except DocumentNotCachedError:
+                result, timings = await pdf_pool.run(pdf_ops.run, source, op, *args, key=source.doc_hash)
+        else:
+            result, timings = await pdf_pool.run(pdf_ops.run, source, op, *args, key=source.doc_hash)
+        if source.data is not None:
+            inline_documents.put(source.doc_hash, True)
+    except (QueueFullError, WorkerCrashedError) as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except JobTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    metrics.record_all(timings)
+    metrics.record("worker_wait", max(0.0, time.perf_counter() - start - sum(timings.values())))
+    return result
+
+
 @app.post("/api/pdf")
 async def extract_pdf(
     file: UploadFile = File(...),
     extract_type: str = Form("text"),
-    page_number: int = Form(1)
+    page_number: int = Form(1),
+    pages: Optional[str] = Form(None),
+    stream: Optional[str] = Form(None)
 ):
     try:
-        print(f"Received file: {file.filename}, type: {extract_type}, page: {page_number}")
-        
-        # 임시 파일 저장
-        temp_pdf = TEMP_DIR / f"input_{file.filename}"
-        temp_output = TEMP_DIR / f"output_{file.filename}.md"
-        
-        try:
-            with temp_pdf.open("wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            print(f"File saved: {temp_pdf}")
-        finally:
-            file.file.close()
-            
-        # PDF 처리
-        try:
-            if extract_type == 'text':
-                md_text = pymupdf4llm.to_markdown(
-                    str(temp_pdf),
-                    pages=[page_number - 1]
-                )
-            elif extract_type == 'tables':
-                md_text = pymupdf4llm.to_markdown(
-                    doc=str(temp_pdf),
-                    pages=[page_number - 1],
-                    page_chunks=True
-                )
-            elif extract_type == 'images':
-                md_text = pymupdf4llm.to_markdown(
-                    doc=str(temp_pdf),
-                    pages=[page_number - 1],
-                    page_chunks=True,
-                    write_images=True,
-                    image_path=str(TEMP_DIR / "images"),
-                    image_format="png",
-                    dpi=300
-                )
-            
-            print(f"Extraction successful for page {page_number}")
+        logger.debug("Received file: %s, type: %s, page: %d, pages: %s", file.filename, extract_type, page_number, pages)
+
+        # 여러 페이지 모드: "1-5,8" 또는 "all" (stream 지정 시 페이지별로 바로 전송)
+        if pages is not None:
+            source = await read_upload(file)
+            if extract_type == 'images':
+                source = await keep_upload(source)
+            page_numbers = await resolve_pages(source, pages)
+            if stream:
+                return stream_response(page_events(source, extract_type, page_numbers), stream)
+            results = await extract_many(source, extract_type, page_numbers)
+            logger.debug("Extraction finished for %d pages", len(results))
             return {
                 "success": True,
-                "content": md_text,
-                "page": page_number
+                "pages": results
             }
-            
-        except Exception as e:
-            print(f"Extraction error: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
-            
-    finally:
-        # 임시 파일 정리
-        if temp_pdf.exists():
-            temp_pdf.unlink()
-        if temp_output.exists():
-            temp_output.unlink()
+
+        # 업로드 바이트를 읽어 워커에 전달 (워커는 해시로 캐시된 문서 핸들 재사용)
+        # images 모드는 이미지 링크가 문서 ID 를 가리키므로 저장소에 보관
+        source = await read_upload(file)
+        if extract_type == 'images':
+            source = await keep_upload(source)
+        logger.debug("Document ready: %s", source.doc_hash[:12])
+
+        # PDF 처리
+        md_text = await extract_source(source, extract_type, page_number)
+
+        logger.debug("Extraction successful for page %d", page_number)
+        return {
+            "success": True,
+            "content": md_text,
+            "page": page_number
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Extraction error: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
 
 @app.post("/api/pdf/analyze")
 async def analyze_pdf_page(
     file: UploadFile = File(...),
-    page_number: int = Form(1)
+    page_number: int = Form(1),
+    format: str = Form("json"),
+    merge_lines: bool = Form(True)
 ):
     try:
-        print(f"Analyzing PDF page: {file.filename}, page: {page_number}")
-        temp_pdf = TEMP_DIR / f"input_{file.filename}"
-        
-        try:
-            with temp_pdf.open("wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            doc = fitz.open(str(temp_pdf))
-            page = doc[page_number - 1]
-            
-            # 페이지 렌더링 (이미지 데이터 준비)
-            pix = page.get_pixmap()
-            
-            # 페이지의 객체들을 타입별로 수집
-            elements = []
-            
-            # 텍스트 블록 추출
-            text_blocks = page.get_text("dict")["blocks"]
-            for block in text_blocks:
-                if block.get("type") == 0:  # 텍스트 블록
-                    for line in block.get("lines", []):
-                        for span in line.get("spans", []):
-                            elements.append({
-                                "type": "text",
-                                "bbox": span["bbox"],
-                                "text": span["text"],
-                                "font": span["font"],
-                                "size": span["size"]
-                            })
-            
-            # 이미지 추출 (페이지 렌더링 후)
-            images = page.get_images(full=True)  # full=True로 변경
-            for img_index, img in enumerate(images):
-                xref = img[0]
-                bbox = page.get_image_bbox(img)
-                if bbox:
-                    # 이미지 메타데이터 추가
-                    image_info = {
-                        "type": "image",
-                        "bbox": list(bbox),
-                        "xref": xref,
-                        "width": img[2],  # 이미지 너비
-                        "height": img[3],  # 이미지 높이
-                        "colorspace": img[4],  # 컬러스페이스
-                    }
-                    elements.append(image_info)
-            
-            # 표 감지
-            tables = page.find_tables()
-            for table in tables:
-                elements.append({
-                    "type": "table",
-                    "bbox": list(table.bbox),
-                    "rows": len(table.cells),
-                    "cols": len(table.cells[0]) if table.cells else 0
-                })
-            
-            print(f"Analysis successful: found {len(elements)} elements")
-            return {
-                "success": True,
-                "elements": elements,
-                "page_dims": {
-                    "width": page.rect.width,
-                    "height": page.rect.height
-                }
-            }
-            
-        finally:
-            if 'doc' in locals():
-                doc.close()
-            file.file.close()
-            if temp_pdf.exists():
-                temp_pdf.unlink()
-                
+        logger.debug("Analyzing PDF page: %s, page: %d", file.filename, page_number)
+
+        source = await read_upload(file)
+        return await analyze_source(source, page_number, format, merge_lines)
+
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Analysis error: {str(e)}")
+        logger.error("Analysis error: %s", e)
         return {
             "success": False,
             "error": str(e)
@@ -184,92 +317,1010 @@ async def extract_table(
     bbox: str = Form(...)
 ):
     try:
-        print(f"Extracting specific table from: {file.filename}, page: {page_number}")
-        temp_pdf = TEMP_DIR / f"input_{file.filename}"
-        
+        logger.debug("Extracting specific table from: %s, page: %d", file.filename, page_number)
+
+        source = await read_upload(file)
+
+        # bbox JSON 파싱
+        table_bbox = json.loads(bbox)
+        logger.debug("Received bbox: %s", table_bbox)
+
+        table = await find_table(source, page_number, table_bbox)
+        return table_response(table, page_number)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Table extraction error: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def get_page_count(source: DocumentSource) -> int:
+    return await page_count_cache.get_or_compute(
+        source.doc_hash, lambda: run_pdf_job(source, "page_count")
+    )
+
+
+async def render_source(
+    source: DocumentSource,
+    page_number: int,
+    dpi: int,
+    max_size: Optional[int],
+    image_format: str,
+    clip: Optional[List[float]] = None
+) -> bytes:
+    key = render_key(source.doc_hash, page_number, dpi, max_size, image_format, clip)
+    return await render_cache.get_or_render(
+        key, lambda: run_pdf_job(source, "render", page_number, dpi, max_size, image_format, clip)
+    )
+
+
+def prefetch_renders(source: DocumentSource, page_number: int, page_count: int, dpi: int, max_size: Optional[int], image_format: str) -> None:
+    """앞뒤 페이지를 백그라운드에서 미리 렌더링 (워커에 여유가 있을 때만)"""
+    neighbors = []
+    for offset in range(1, PDF_RENDER_PREFETCH + 1):
+        neighbors += [page_number + offset, page_number - offset]
+
+    async def prefetch():
+        # 미리 렌더링 시간은 요청이 아닌 백그라운드 작업으로 기록
+        metrics.request_timings.set(None)
+        for neighbor in neighbors:
+            if not 1 <= neighbor <= page_count:
+                continue
+            if render_cache.contains(render_key(source.doc_hash, neighbor, dpi, max_size, image_format)):
+                continue
+            if not pdf_pool.idle(source.doc_hash):
+                return
+            try:
+                await render_source(source, neighbor, dpi, max_size, image_format)
+            except Exception as e:
+                logger.warning("Prefetch render error (page %d): %s", neighbor, e)
+                return
+
+    task = asyncio.create_task(prefetch())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def fingerprint_job(source: DocumentSource, page_number: int) -> Optional[str]:
+    return (await run_pdf_job(source, "fingerprints", [page_number])).get(page_number)
+
+
+async def get_fingerprints(source: DocumentSource, page_numbers: List[int]) -> Dict[int, Optional[str]]:
+    """
+    요청한 페이지의 지문만 계산해 (문서 해시, 페이지) 단위로 보관 (첫 페이지 응답 전에 문서 전체를 읽지 않음).
+    범위를 벗어난 페이지는 None 이며, 지문 없이 워커로 보내 기존과 같은 오류를 반환합니다.
+    """
+    fingerprints = {}
+    missing = []
+    for page_number in page_numbers:
+        key = (source.doc_hash, page_number)
+        if key in fingerprint_cache:
+            fingerprints[page_number] = fingerprint_cache.get(key)
+        else:
+            missing.append(page_number)
+
+    if len(missing) == 1:
+        page_number = missing[0]
+        fingerprints[page_number] = await fingerprint_cache.get_or_compute(
+            (source.doc_hash, page_number), lambda: fingerprint_job(source, page_number)
+        )
+    elif missing:
+        if len(missing) <= PDF_BATCH_CHUNK:
+            computed = await run_pdf_job(source, "fingerprints", missing)
+        else:
+            computed = {}
+            for chunk in await map_pages(source, "fingerprints", missing):
+                computed.update(chunk)
+        for page_number in missing:
+            fingerprints[page_number] = computed.get(page_number)
+            fingerprint_cache.put((source.doc_hash, page_number), fingerprints[page_number])
+    return fingerprints
+
+
+async def page_fingerprint(source: DocumentSource, page_number: int) -> Optional[str]:
+    return (await get_fingerprints(source, [page_number]))[page_number]
+
+
+async def get_doc_info(source: DocumentSource) -> dict:
+    return await doc_info_cache.get_or_compute(
+        source.doc_hash, lambda: run_pdf_job(source, "doc_info")
+    )
+
+
+def extract_key(fingerprint: Optional[str], extract_type: str) -> Optional[tuple]:
+    """페이지 변환 결과 캐시 키 (images 모드는 링크에 문서 ID 가 들어가므로 캐시하지 않음)"""
+    if extract_type == "images" or fingerprint is None:
+        return None
+    return (fingerprint, "extract", extract_type)
+
+
+async def rebase_content(source: DocumentSource, page_number: int, cached: tuple):
+    """
+    캐시된 변환 결과 ((문서 해시, 페이지), 내용) 를 현재 페이지 기준으로 반환.
+    다른 페이지(개정 전 판 등)의 tables 모드 결과는 pymupdf4llm 이 넣은 문서 메타데이터(title, modDate 등),
+    파일 경로, 페이지 번호, 페이지 목차(toc_items)를 현재 문서 값으로 바꿉니다.
+    """
+    origin, content = cached
+    if origin == (source.doc_hash, page_number) or not isinstance(content, list):
+        return content
+    info, page_count = await asyncio.gather(get_doc_info(source), get_page_count(source))
+    toc_items = [item for item in info["toc"] if item[-1] == page_number]
+    rebased = []
+    for chunk in content:
+        metadata = {
+            **chunk.get("metadata", {}),
+            **info["metadata"],
+            "file_path": source.path or "",
+            "page_count": page_count
+        }
+        # 페이지 번호 키 이름은 pymupdf4llm 버전마다 다름 (page, page_number)
+        for key in ("page", "page_number"):
+            if key in metadata:
+                metadata[key] = page_number
+        chunk = {**chunk, "metadata": metadata}
+        if "toc_items" in chunk:
+            chunk["toc_items"] = toc_items
+        rebased.append(chunk)
+    return rebased
+
+
+async def extract_source(source: DocumentSource, extract_type: str, page_number: int):
+    """한 페이지 변환 (지문이 같은 페이지를 이미 변환했으면 그 결과 재사용)"""
+    job = lambda: run_pdf_job(source, "extract", extract_type, page_number, document_url(source.doc_hash))
+    if extract_type == "images":
+        return await job()
+    key = extract_key(await page_fingerprint(source, page_number), extract_type)
+    if key is None:
+        return await job()
+
+    async def convert() -> tuple:
+        return (source.doc_hash, page_number), await job()
+
+    return await rebase_content(source, page_number, await page_result_cache.get_or_compute(key, convert))
+
+
+async def split_cached_pages(
+    source: DocumentSource,
+    extract_type: str,
+    page_numbers: List[int]
+) -> Tuple[List[dict], List[int], Dict[int, Optional[str]]]:
+    """이전 결과를 재사용할 수 있는 페이지 결과와 새로 변환할 페이지 번호로 분리"""
+    if extract_type == "images":
+        return [], page_numbers, {}
+    fingerprints = await get_fingerprints(source, page_numbers)
+    hits, misses = [], []
+    for page_number in page_numbers:
+        key = extract_key(fingerprints[page_number], extract_type)
+        cached = page_result_cache.get(key) if key is not None else None
+        if cached is None:
+            misses.append(page_number)
+        else:
+            content = await rebase_content(source, page_number, cached)
+            hits.append({"page": page_number, "success": True, "content": content})
+    return hits, misses, fingerprints
+
+
+def document_url(doc_hash: str) -> str:
+    """images 모드 markdown 에 넣을 이미지/그림 링크의 기준 경로 (워커에서 xref, 영역을 붙임)"""
+    return f"/api/pdf/documents/{doc_hash}"
+
+
+def chunk_pages(page_numbers: List[int], size: Optional[int] = None) -> List[List[int]]:
+    """페이지 목록을 워커 수에 맞춰 고르게 나누기 (청크당 최대 PDF_BATCH_CHUNK 페이지)"""
+    if size is None:
+        size = math.ceil(len(page_numbers) / max(pdf_pool.workers, 1))
+        size = max(1, min(PDF_BATCH_CHUNK, size))
+    return [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
+
+
+async def resolve_pages(source: DocumentSource, pages: str) -> List[int]:
+    page_count = await get_page_count(source)
+    return pdf_ops.parse_page_spec(pages, page_count)
+
+
+async def analyze_source(source: DocumentSource, page_number: int, format: str, merge_lines: bool):
+    """
+    페이지 분석 (표는 캐시된 감지 결과 사용).
+    format=compact 이면 열 단위 압축 형식으로 분석해 응답 인코딩 비용을 줄입니다.
+    """
+    if format not in ("json", "compact"):
+        raise ValueError(f"Unknown analyze format: {format} (use 'json' or 'compact')")
+
+    if format == "compact":
+        job = lambda: run_pdf_job(source, "analyze_compact", page_number, merge_lines, False)
+    else:
+        job = lambda: run_pdf_job(source, "analyze", page_number, False)
+    # 분석 결과도 페이지 지문 기준으로 재사용 (캐시된 결과는 복사해서 표 요소 추가)
+    fingerprint = await page_fingerprint(source, page_number)
+    if fingerprint is not None:
+        key = (fingerprint, "analyze", format, merge_lines if format == "compact" else None)
+        analysis = page_result_cache.get_or_compute(key, job)
+    else:
+        analysis = job()
+    result, tables = await asyncio.gather(analysis, page_tables(source, page_number))
+    table_elements = [pdf_ops.table_element(table) for table in tables]
+
+    if format == "compact":
+        # 기본 타입만 담긴 결과이므로 jsonable_encoder 순회 없이 바로 직렬화
+        return TimedJSONResponse({**result, "tables": table_elements})
+    return {**result, "elements": result["elements"] + table_elements}
+
+
+def clip_key(clip: Optional[List[float]]):
+    return tuple(round(float(v), 2) for v in clip) if clip is not None else None
+
+
+def cached_page_tables(doc_hash: str, page_number: int) -> Optional[List[dict]]:
+    """이미 감지된 페이지 전체 표 목록 (문서 표 목록 또는 페이지 캐시), 없으면 None"""
+    catalog = table_catalog_cache.get(doc_hash)
+    if catalog is not None:
+        return catalog.get(page_number, [])
+    fingerprint = fingerprint_cache.get((doc_hash, page_number))
+    return table_cache.get((fingerprint, None)) if fingerprint is not None else None
+
+
+async def page_tables(source: DocumentSource, page_number: int, clip: Optional[List[float]] = None) -> List[dict]:
+    """표 감지 결과를 (페이지 지문, clip) 단위로 메모이즈 (개정판의 바뀌지 않은 페이지도 재사용)"""
+    if clip is None:
+        cached = cached_page_tables(source.doc_hash, page_number)
+        if cached is not None:
+            return cached
+    fingerprint = await page_fingerprint(source, page_number)
+    if fingerprint is not None:
+        key = (fingerprint, clip_key(clip))
+    else:
+        key = (source.doc_hash, page_number, clip_key(clip))
+    return await table_cache.get_or_compute(
+        key, lambda: run_pdf_job(source, "detect_tables", page_number, clip)
+    )
+
+
+def match_table(tables: List[dict], bbox: List[float], tolerance: float = 2.0) -> Optional[dict]:
+    for table in tables:
+        if all(abs(a - b) <= tolerance for a, b in zip(table["bbox"], bbox)):
+            return table
+    return None
+
+
+async def find_table(source: DocumentSource, page_number: int, bbox: List[float]) -> Optional[dict]:
+    """선택 영역의 표 찾기: 분석 때 감지한 표와 bbox 가 같으면 캐시에서 바로 사용"""
+    cached = cached_page_tables(source.doc_hash, page_number)
+    if cached is not None:
+        table = match_table(cached, bbox)
+        if table is not None:
+            return table
+
+    # 특정 bbox 영역의 표만 감지 (첫 번째 표만 처리)
+    tables = await page_tables(source, page_number, bbox)
+    return tables[0] if tables else None
+
+
+def table_response(table: Optional[dict], page_number: int) -> dict:
+    if table is None:
+        return {
+            "success": False,
+            "error": "No table found in selected area"
+        }
+    if not table["data"]:
+        return {
+            "success": False,
+            "error": "Table in selected area is empty"
+        }
+
+    logger.debug("Table found: %d rows x %d cols", table["rows"], table["cols"])
+    return {
+        "success": True,
+        "content": pdf_ops.table_to_markdown(table["data"]),
+        "page": page_number,
+        "table_data": table["data"]
+    }
+
+
+async def get_table_catalog(source: DocumentSource) -> Dict[int, List[dict]]:
+    """문서 전체 표 목록을 페이지 청크 단위로 병렬 감지해 한 번만 생성"""
+    async def build() -> Dict[int, List[dict]]:
+        page_count = await get_page_count(source)
+        fingerprints = await get_fingerprints(source, list(range(1, page_count + 1)))
+        catalog = {}
+        pending = []
+        for page_number, fingerprint in fingerprints.items():
+            tables = table_cache.get((fingerprint, None))
+            if tables is None:
+                pending.append(page_number)
+            else:
+                catalog[page_number] = tables
+        if pending:
+            for chunk in await map_pages(source, "detect_tables_pages", pending):
+                catalog.update(chunk)
+                for page_number, tables in chunk.items():
+                    table_cache.put((fingerprints[page_number], None), tables)
+        return dict(sorted(catalog.items()))
+
+    return await table_catalog_cache.get_or_compute(source.doc_hash, build)
+
+
+async def map_pages(source: DocumentSource, op: str, page_numbers: List[int], *args) -> list:
+    """페이지 청크마다 op 를 워커들에 나눠 실행하고 청크별 결과 목록 반환"""
+    semaphore = asyncio.Semaphore(max(pdf_pool.workers, 1))
+
+    async def run_chunk(chunk: List[int]):
+        async with semaphore:
+            return await run_pdf_job(source, op, chunk, *args)
+
+    return await asyncio.gather(*(run_chunk(chunk) for chunk in chunk_pages(page_numbers)))
+
+
+async def get_layout_index(source: DocumentSource) -> LayoutIndex:
+    """문서 전체 레이아웃 인덱스를 한 번만 만들고 재사용 (동시 요청은 생성 작업을 공유)"""
+    async def build() -> LayoutIndex:
+        page_count = await get_page_count(source)
+        chunks, catalog = await asyncio.gather(
+            map_pages(source, "layout_pages", list(range(1, page_count + 1)), False),
+            get_table_catalog(source)
+        )
+        pages = {}
+        for chunk in chunks:
+            pages.update(chunk)
+        # 표는 문서 표 목록의 감지 결과를 재사용
+        for page_number, tables in catalog.items():
+            pages[page_number]["elements"].extend(pdf_ops.table_element(table) for table in tables)
+        return await asyncio.to_thread(LayoutIndex, pages)
+
+    return await layout_cache.get_or_compute(source.doc_hash, build)
+
+
+async def load_search_index(source: DocumentSource) -> Optional[SearchIndex]:
+    """이미 만든 검색 인덱스를 메모리 또는 디스크에서 찾음 (없으면 None, 새로 만들지 않음)"""
+    index = search_indexes.get(source.doc_hash)
+    if index is None:
+        index = await asyncio.to_thread(search_store.get, source.doc_hash)
+        if index is not None:
+            search_indexes.put(source.doc_hash, index)
+    return index
+
+
+async def get_search_index(source: DocumentSource, lines: Optional[Dict[int, List[dict]]] = None) -> SearchIndex:
+    """
+    검색 인덱스를 한 번만 만들어 디스크에 저장 (이미 있으면 그대로 사용, 동시 요청은 생성 작업을 공유).
+    lines 는 같은 요청의 추출 작업에서 함께 모은 페이지별 줄입니다. 나머지 페이지는 text 추출 작업으로
+    변환하면서 줄을 모으고, 그 변환 결과는 페이지 결과 캐시에 남아 이후 추출 요청이 재사용합니다.
+    """
+    async def build() -> SearchIndex:
+        index = await asyncio.to_thread(search_store.get, source.doc_hash)
+        if index is not None:
+            return index
+        pages = dict(lines or {})
+        page_count = await get_page_count(source)
+        missing = [page_number for page_number in range(1, page_count + 1) if page_number not in pages]
+        async for _ in iter_extract(source, "text", missing, lines=pages):
+            pass
+        # 페이지 결과 캐시를 재사용해 변환하지 않은 페이지는 줄만 수집
+        rest = [page_number for page_number in missing if page_number not in pages]
+        if rest:
+            for chunk in await map_pages(source, "text_lines", rest):
+                pages.update(chunk)
+        index = await asyncio.to_thread(SearchIndex, pages)
+        await asyncio.to_thread(search_store.put, source.doc_hash, index)
+        return index
+
+    return await search_indexes.get_or_compute(source.doc_hash, build)
+
+
+async def index_lines(source: DocumentSource, index: bool) -> Optional[Dict[int, List[dict]]]:
+    """index=true 이고 아직 검색 인덱스가 없으면 추출 작업에서 줄을 모을 dict, 아니면 None"""
+    if not index or await load_search_index(source) is not None:
+        return None
+    return {}
+
+
+def index_in_background(source: DocumentSource, lines: Optional[Dict[int, List[dict]]] = None) -> None:
+    """추출/업로드와 함께 요청된 검색 인덱스를 백그라운드에서 생성"""
+    async def build():
+        metrics.request_timings.set(None)
         try:
-            with temp_pdf.open("wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            # bbox JSON 파싱
-            table_bbox = json.loads(bbox)
-            print("Received bbox:", table_bbox)
-            
-            doc = fitz.open(str(temp_pdf))
-            page = doc[page_number - 1]
-            
-            # 특정 bbox 영역의 표만 추출
-            tables = page.find_tables(
-                clip=fitz.Rect(table_bbox[0], table_bbox[1], table_bbox[2], table_bbox[3])
-            )
-            
-            if not tables:
-                return {
-                    "success": False,
-                    "error": "No table found in selected area"
-                }
-            
-            # 첫 번째 표만 처리
-            table = tables[0]
-            
-            # 디버깅을 위한 상세 정보 출력
-            print("\nTable Debug Info:")
-            print("=================")
-            print(f"Row count: {table.row_count}")
-            print(f"Column count: {table.col_count}")
-            
-            # 표 데이터를 추출
-            extracted_data = table.extract()
-            print("Extracted table data:", extracted_data)
-            
-            # Markdown 형식으로 변환
-            markdown = ""
-            if extracted_data:
-                # 헤더 행 추가 (첫 번째와 마지막 파이프 문자 보장)
-                first_row = [str(cell) if cell is not None else "" for cell in extracted_data[0]]
-                markdown += "|" + "|".join(first_row) + "|\n"
-                markdown += "|" + "|".join(["---"] * len(first_row)) + "|\n"
-                
-                # 데이터 행 추가
-                for row in extracted_data[1:]:
-                    formatted_row = [str(cell) if cell is not None else "" for cell in row]
-                    markdown += "|" + "|".join(formatted_row) + "|\n"
-                
-                print("\nGenerated Markdown Table:")
-                print(markdown)
-                
-                return {
-                    "success": True,
-                    "content": markdown,
-                    "page": page_number,
-                    "table_data": extracted_data
-                }
-            
+            index = await get_search_index(source, lines)
+            logger.info("Search index ready: %s (%d lines)", source.doc_hash[:12], len(index.lines))
+        except Exception as e:
+            logger.warning("Search index error (%s): %s", source.doc_hash[:12], e)
+
+    task = asyncio.create_task(build())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def iter_extract(
+    source: DocumentSource,
+    extract_type: str,
+    page_numbers: List[int],
+    chunk_size: Optional[int] = None,
+    lines: Optional[Dict[int, List[dict]]] = None
+) -> AsyncIterator[dict]:
+    """
+    페이지 청크를 워커들에 나눠 변환하고 완료되는 순서대로 페이지 결과를 내보냄.
+    청크마다 그 페이지들의 지문만 계산해 이전 결과가 있는 페이지는 재사용하고 나머지 페이지만 변환합니다.
+    lines 를 넘기면 변환한 페이지의 텍스트 줄을 같은 작업에서 받아 페이지 번호별로 채웁니다 (검색 인덱스용).
+    """
+    chunks = iter(chunk_pages(page_numbers, chunk_size))
+    running = set()
+
+    async def run_chunk(chunk: List[int]) -> List[dict]:
+        hits, pending, fingerprints = await split_cached_pages(source, extract_type, chunk)
+        if not pending:
+            return hits
+        results = await run_pdf_job(
+            source, "extract_pages", extract_type, pending, document_url(source.doc_hash), lines is not None
+        )
+        for result in results:
+            if "lines" in result:
+                lines[result["page"]] = result.pop("lines")
+            key = extract_key(fingerprints.get(result["page"]), extract_type)
+            if result["success"] and key is not None:
+                page_result_cache.put(key, ((source.doc_hash, result["page"]), result["content"]))
+        return hits + results
+
+    def submit_next():
+        chunk = next(chunks, None)
+        if chunk is not None:
+            running.add(asyncio.ensure_future(run_chunk(chunk)))
+
+    # 동시에 넣는 청크 수를 워커 수로 제한해 다른 요청의 대기열 자리를 남겨둠
+    for _ in range(max(pdf_pool.workers, 1)):
+        submit_next()
+    try:
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            running.difference_update(done)
+            for task in done:
+                for result in task.result():
+                    yield result
+                submit_next()
+    finally:
+        # 클라이언트 연결이 끊겨 중단되면 아직 시작하지 않은 청크는 버림
+        for task in running:
+            task.cancel()
+
+
+async def extract_many(
+    source: DocumentSource,
+    extract_type: str,
+    page_numbers: List[int],
+    lines: Optional[Dict[int, List[dict]]] = None
+) -> List[dict]:
+    """여러 페이지를 변환하고 요청한 페이지 순서대로 결과 반환"""
+    order = {page_number: i for i, page_number in enumerate(page_numbers)}
+    results = [result async for result in iter_extract(source, extract_type, page_numbers, lines=lines)]
+    return sorted(results, key=lambda result: order[result["page"]])
+
+
+async def page_events(
+    source: DocumentSource,
+    extract_type: str,
+    page_numbers: List[int],
+    lines: Optional[Dict[int, List[dict]]] = None
+) -> AsyncIterator[dict]:
+    """
+    스트리밍 모드: 페이지 하나씩 작업을 보내 첫 페이지부터 바로 내보냄.
+    lines 를 넘기면 스트림이 끝난 뒤 (중간에 끊겨도) 모은 줄로 검색 인덱스를 만듭니다.
+    """
+    yield {"type": "start", "pages": len(page_numbers)}
+    try:
+        async for result in iter_extract(source, extract_type, page_numbers, chunk_size=1, lines=lines):
+            yield {"type": "page", **result}
+    except HTTPException as e:
+        yield {"type": "error", "error": e.detail}
+        return
+    finally:
+        if lines is not None:
+            index_in_background(source, lines)
+    yield {"type": "done"}
+
+
+def stream_response(events: AsyncIterator[dict], stream: str) -> StreamingResponse:
+    """이벤트를 NDJSON 또는 Server-Sent Events 형식으로 스트리밍"""
+    if stream not in ("ndjson", "sse"):
+        raise ValueError(f"Unknown stream format: {stream} (use 'ndjson' or 'sse')")
+
+    async def encode():
+        async for event in events:
+            data = json.dumps(event, ensure_ascii=False, default=str)
+            if stream == "sse":
+                yield f"event: {event['type']}\ndata: {data}\n\n"
+            else:
+                yield data + "\n"
+
+    media_type = "text/event-stream" if stream == "sse" else "application/x-ndjson"
+    return StreamingResponse(encode(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+async def run_job(job: dict) -> None:
+    """남은 페이지를 변환하면서 페이지마다 결과를 체크포인트 (취소되면 중단)"""
+    job_id = job["job_id"]
+    path = job_document_store.get(job["document_id"])
+    if path is None:
+        await asyncio.to_thread(job_queue.finish, job_id, FAILED, "Document expired")
+        return
+    source = DocumentSource(job["document_id"], path=str(path))
+
+    done = await asyncio.to_thread(job_queue.completed_pages, job_id)
+    remaining = [page_number for page_number in job["pages"] if page_number not in done]
+    logger.info("Job %s running: %d/%d pages left", job_id[:12], len(remaining), len(job["pages"]))
+
+    async for result in iter_extract(source, job["extract_type"], remaining):
+        await asyncio.to_thread(job_queue.checkpoint, job_id, result["page"], result)
+        current = await asyncio.to_thread(job_queue.get, job_id)
+        if current is None or current["status"] == CANCELLED:
+            logger.info("Job %s cancelled", job_id[:12])
+            return
+    await asyncio.to_thread(job_queue.finish, job_id)
+    logger.info("Job %s finished", job_id[:12])
+
+
+async def purge_jobs() -> None:
+    """보관 기간이 지난 작업과 페이지별 결과를 PDF_JOB_PURGE_INTERVAL 마다 삭제 (실행기가 여럿이어도 한 번)"""
+    global _next_purge
+    now = time.monotonic()
+    if now < _next_purge:
+        return
+    _next_purge = now + PDF_JOB_PURGE_INTERVAL
+    purged = await asyncio.to_thread(job_queue.purge, PDF_JOB_RETENTION_SECONDS)
+    if purged:
+        logger.info("Purged %d finished jobs", purged)
+
+
+async def job_runner() -> None:
+    """대기열에서 작업을 하나씩 가져와 실행하는 백그라운드 루프"""
+    while True:
+        await purge_jobs()
+        job = await asyncio.to_thread(job_queue.claim_next)
+        if job is None:
+            job_wakeup.clear()
+            try:
+                await asyncio.wait_for(job_wakeup.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        try:
+            await run_job(job)
+        except HTTPException as e:
+            if e.status_code == 503:
+                # 워커 풀이 가득 찬 경우: 대기열로 되돌리고 잠시 후 재시도 (완료된 페이지는 유지)
+                await asyncio.to_thread(job_queue.requeue, job["job_id"])
+                await asyncio.sleep(1)
+            else:
+                await asyncio.to_thread(job_queue.finish, job["job_id"], FAILED, str(e.detail))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Job %s failed: %s", job["job_id"][:12], e)
+            await asyncio.to_thread(job_queue.finish, job["job_id"], FAILED, str(e))
+
+
+# 문서를 한 번만 업로드하고 이후에는 문서 ID 로 페이지별 요청
+@app.post("/api/pdf/documents")
+async def upload_document(file: UploadFile = File(...), index: bool = Form(False)):
+    try:
+        try:
+            document_id, size = await asyncio.to_thread(document_store.put_stream, file.file)
         finally:
-            if 'doc' in locals():
-                doc.close()
             file.file.close()
-            if temp_pdf.exists():
-                temp_pdf.unlink()
-                
+
+        source = stored_source(document_id)
+        page_count = await get_page_count(source)
+        if index:
+            index_in_background(source)
+        logger.info("Document stored: %s -> %s (%d pages)", file.filename, document_id[:12], page_count)
+        return {
+            "success": True,
+            "document_id": document_id,
+            "page_count": page_count,
+            "size": size,
+            "expires_in": document_store.ttl_seconds,
+            "indexing": index
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Upload error: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+@app.delete("/api/pdf/documents/{document_id}")
+async def delete_document(document_id: str):
+    if not document_store.delete(document_id):
+        raise HTTPException(status_code=404, detail="Document not found or expired")
+    # 검색 인덱스에도 문서 본문이 들어 있으므로 함께 삭제
+    search_indexes.pop(document_id)
+    search_store.delete(document_id)
+    return {"success": True}
+
+@app.post("/api/pdf/documents/{document_id}/extract")
+async def extract_stored_pdf(
+    document_id: str,
+    extract_type: str = Form("text"),
+    page_number: int = Form(1),
+    pages: Optional[str] = Form(None),
+    stream: Optional[str] = Form(None),
+    index: bool = Form(False)
+):
+    source = stored_source(document_id)
+    try:
+        # 검색 인덱스를 요청하면 이번 추출 작업에서 줄을 함께 모으고 나머지 페이지만 따로 변환
+        lines = await index_lines(source, index)
+        if pages is not None:
+            page_numbers = await resolve_pages(source, pages)
+            if stream:
+                return stream_response(page_events(source, extract_type, page_numbers, lines), stream)
+            results = await extract_many(source, extract_type, page_numbers, lines)
+            if lines is not None:
+                index_in_background(source, lines)
+            return {
+                "success": True,
+                "pages": results
+            }
+        if lines is not None:
+            index_in_background(source)
+        md_text = await extract_source(source, extract_type, page_number)
+        return {
+            "success": True,
+            "content": md_text,
+            "page": page_number
+        }
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"\nError occurred:")
-        print("=================")
-        print(f"Error type: {type(e)}")
-        print(f"Error message: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        print("=================\n")
+        logger.error("Extraction error: %s", e)
         return {
             "success": False,
             "error": str(e)
         }
 
+@app.post("/api/pdf/documents/{document_id}/analyze")
+async def analyze_stored_pdf_page(
+    document_id: str,
+    page_number: int = Form(1),
+    format: str = Form("json"),
+    merge_lines: bool = Form(True)
+):
+    source = stored_source(document_id)
+    try:
+        return await analyze_source(source, page_number, format, merge_lines)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Analysis error: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+@app.post("/api/pdf/documents/{document_id}/extract-table")
+async def extract_stored_table(
+    document_id: str,
+    page_number: int = Form(1),
+    bbox: str = Form(...)
+):
+    source = stored_source(document_id)
+    try:
+        table = await find_table(source, page_number, json.loads(bbox))
+        return table_response(table, page_number)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Table extraction error: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+@app.get("/api/pdf/documents/{document_id}/layout")
+async def query_layout(
+    document_id: str,
+    page_number: int = 1,
+    bbox: Optional[str] = None,
+    types: Optional[str] = None
+):
+    """bbox([x0, y0, x1, y1] JSON)와 겹치는 요소 조회, types 는 'text,image,table' 중 선택"""
+    source = stored_source(document_id)
+    try:
+        index = await get_layout_index(source)
+        rect = json.loads(bbox) if bbox else None
+        type_filter = {t.strip() for t in types.split(",") if t.strip()} if types else None
+        return {
+            "success": True,
+            **index.query(page_number, rect, type_filter)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Layout query error: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+@app.get("/api/pdf/documents/{document_id}/tables")
+async def table_catalog(document_id: str):
+    source = stored_source(document_id)
+    try:
+        catalog = await get_table_catalog(source)
+        tables = [
+            {"page": page_number, "index": i, **pdf_ops.table_element(table)}
+            for page_number, tables_on_page in catalog.items()
+            for i, table in enumerate(tables_on_page)
+        ]
+        return {
+            "success": True,
+            "count": len(tables),
+            "tables": tables
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Table catalog error: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+@app.post("/api/pdf/documents/{document_id}/index")
+async def build_search_index(document_id: str):
+    """검색 인덱스 생성 (이미 있으면 그대로 사용). 아직 변환하지 않은 페이지는 text 추출 결과도 캐시에 남음"""
+    source = stored_source(document_id)
+    try:
+        index = await get_search_index(source)
+        return {
+            "success": True,
+            **index.stats()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Search index error: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+@app.get("/api/pdf/documents/{document_id}/search")
+async def search_document(document_id: str, q: str, limit: int = 100):
+    """검색어가 나오는 페이지와 일치 구간의 span bbox 조회 (인덱스는 업로드/추출의 index=true 또는 POST .../index 로 먼저 생성)"""
+    source = stored_source(document_id)
+    index = await load_search_index(source)
+    if index is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Search index not built: POST /api/pdf/documents/{document_id}/index or pass index=true"
+        )
+    try:
+        return {
+            "success": True,
+            **index.search(q, max(1, min(limit, 1000)))
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Search error: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+@app.get("/api/pdf/documents/{document_id}/pages/{page_number}/render")
+async def render_page(
+    document_id: str,
+    page_number: int,
+    request: Request,
+    dpi: int = 96,
+    max_size: Optional[int] = Query(None, ge=1),
+    format: str = "png",
+    clip: Optional[str] = None
+):
+    """페이지 렌더링 (clip="x0,y0,x1,y1" 을 주면 그 영역만, images 모드의 벡터 그림 링크가 사용)"""
+    source = linked_source(document_id)
+    if format not in pdf_ops.RENDER_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown image format: {format}")
+    dpi = min(max(dpi, 18), 600)
+    clip_box = None
+    if clip is not None:
+        try:
+            clip_box = [float(value) for value in clip.split(",")]
+        except ValueError:
+            clip_box = []
+        if len(clip_box) != 4 or clip_box[0] >= clip_box[2] or clip_box[1] >= clip_box[3]:
+            raise HTTPException(status_code=400, detail=f"Invalid clip: {clip}")
+
+    page_count = await get_page_count(source)
+    if not 1 <= page_number <= page_count:
+        raise HTTPException(status_code=404, detail=f"Page {page_number} is out of range (1-{page_count})")
+
+    # 렌더링 결과는 문서 해시와 옵션으로 결정되므로 렌더링 전에 ETag 비교 가능
+    etag = f'"{render_key(document_id, page_number, dpi, max_size, format, clip_box)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+    if clip_box is None:
+        prefetch_renders(source, page_number, page_count, dpi, max_size, format)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        data = await render_source(source, page_number, dpi, max_size, format, clip_box)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=data, media_type=pdf_ops.RENDER_FORMATS[format], headers=headers)
+
+@app.get("/api/pdf/documents/{document_id}/images/{xref}")
+async def get_image(document_id: str, xref: int, request: Request):
+    """이미지를 처음 요청할 때 추출해 저장소에 보관하고, 이후에는 저장된 파일 제공"""
+    key = (document_id, xref)
+    path = image_paths.get(key)
+    if path is not None and not image_store.touch(path):
+        # 용량 초과로 삭제된 파일이면 다시 추출
+        image_paths.pop(key)
+        path = None
+
+    if path is None:
+        source = linked_source(document_id)
+
+        async def extract() -> Path:
+            try:
+                image = await run_pdf_job(source, "extract_image", xref)
+            except ValueError as e:
+                raise HTTPException(status_code=404, detail=str(e))
+            return await asyncio.to_thread(image_store.put, image["data"], image["ext"])
+
+        path = await image_paths.get_or_compute(key, extract)
+
+    # 파일 이름이 내용 해시이므로 그대로 ETag 로 사용
+    etag = f'"{path.stem}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400, immutable"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+# 오래 걸리는 변환은 작업으로 제출하고 진행률을 조회
+@app.post("/api/pdf/jobs")
+async def submit_job(
+    file: Optional[UploadFile] = File(None),
+    document_id: Optional[str] = Form(None),
+    extract_type: str = Form("text"),
+    pages: str = Form("all")
+):
+    try:
+        if extract_type not in pdf_ops.EXTRACT_TYPES:
+            raise HTTPException(status_code=400, detail=f"Unknown extract_type: {extract_type}")
+        if file is not None:
+            try:
+                doc_id, _ = await asyncio.to_thread(job_document_store.put_stream, file.file)
+            finally:
+                file.file.close()
+        elif document_id is not None:
+            # 업로드해 둔 문서를 작업용 저장소로 복사 (작업 도중 만료되지 않도록)
+            path = stored_source(document_id).path
+            with open(path, "rb") as f:
+                doc_id, _ = await asyncio.to_thread(job_document_store.put_stream, f)
+        else:
+            raise HTTPException(status_code=400, detail="Either file or document_id is required")
+
+        source = DocumentSource(doc_id, path=str(job_document_store.path(doc_id)))
+        page_numbers = await resolve_pages(source, pages)
+        job = await asyncio.to_thread(job_queue.submit, doc_id, extract_type, page_numbers)
+        if not job["deduplicated"]:
+            job_wakeup.set()
+        logger.info("Job %s submitted (%d pages, deduplicated=%s)", job["job_id"][:12], len(page_numbers), job["deduplicated"])
+        return {
+            "success": True,
+            **job
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Job submit error: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+@app.get("/api/pdf/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "success": True,
+        **job
+    }
+
+@app.get("/api/pdf/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """체크포인트된 페이지 결과 반환 (작업이 끝나지 않았으면 지금까지의 결과)"""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "success": True,
+        **job,
+        "pages": await asyncio.to_thread(job_queue.results, job_id)
+    }
+
+@app.delete("/api/pdf/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    if not await asyncio.to_thread(job_queue.cancel, job_id):
+        raise HTTPException(status_code=404, detail="Job not found or already finished")
+    return {"success": True}
+
+@app.get("/api/pdf/cache")
+async def cache_stats():
+    try:
+        documents = await pdf_pool.run_all(pdf_ops.cache_stats)
+    except (QueueFullError, WorkerCrashedError) as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except JobTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    # 저장소 통계는 디렉토리 전체를 읽으므로 이벤트 루프 밖에서 함께 수집
+    store, images, searches = await asyncio.gather(
+        asyncio.to_thread(document_store.stats),
+        asyncio.to_thread(image_store.stats),
+        asyncio.to_thread(search_store.stats)
+    )
+    return {
+        "success": True,
+        "documents": documents,
+        "store": store,
+        "fingerprints": fingerprint_cache.stats(),
+        "doc_info": doc_info_cache.stats(),
+        "page_results": page_result_cache.stats(),
+        "layouts": layout_cache.stats(),
+        "search_indexes": search_indexes.stats(),
+        "search_store": searches,
+        "tables": table_cache.stats(),
+        "table_catalogs": table_catalog_cache.stats(),
+        "renders": render_cache.stats(),
+        "images": images,
+        "pool": pdf_pool.stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """단계별 처리 시간 히스토그램과 워커 풀 상태 (Prometheus 텍스트 형식)"""
+    pool = pdf_pool.stats()
+    gauges = [
+        "# TYPE pdf_pool_pending gauge",
+        f"pdf_pool_pending {pool['pending']}",
+        "# TYPE pdf_pool_rejected_total counter",
+        f"pdf_pool_rejected_total {pool['rejected']}",
+        "# TYPE pdf_pool_timed_out_total counter",
+        f"pdf_pool_timed_out_total {pool['timed_out']}",
+        "# TYPE pdf_pool_crashed_total counter",
+        f"pdf_pool_crashed_total {pool['crashed']}",
+        "# TYPE pdf_pool_restarted_total counter",
+        f"pdf_pool_restarted_total {pool['restarted']}",
+    ]
+    return PlainTextResponse(
+        metrics.render_all(["\n".join(gauges)]),
+        media_type="text/plain; version=0.0.4"
+    )
+
 if __name__ == "__main__":
     uvicorn.run(
-        app, 
-        host="0.0.0.0", 
+        app,
+        host="0.0.0.0",
         port=8000,
         timeout_keep_alive=65,
         log_level="info"
-    ) 
\ No newline at end of file
+    )
@@ -0,0 +1,184 @@
+# src/python/worker_pool.py
+import asyncio
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, List, Optional
+
+# 워커 풀 설정 (환경 변수로 조정 가능, PDF_WORKERS=0 이면 이벤트 루프에서 직접 실행)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_MAX_PENDING = int(os.getenv("PDF_MAX_PENDING", str(max(PDF_WORKERS, 1) * 4)))
+PDF_JOB_TIMEOUT = float(os.getenv("PDF_JOB_TIMEOUT", "120"))
+
+
+class QueueFullError(Exception):
+    """대기 중인 작업 수가 한도를 넘었을 때 발생"""
+
+
+class JobTimeoutError(Exception):
+    """작업이 제한 시간 안에 끝나지 않았을 때 발생"""
+
+
+class WorkerCrashedError(Exception):
+    """워커 프로세스가 비정상 종료되었을 때 발생 (풀은 새 프로세스로 다시 시작)"""
+
+
+class PdfWorkerPool:
+    """
+    PyMuPDF 작업(CPU 바운드, GIL 점유)을 별도 프로세스에서 실행하는 워커 풀.
+
+    워커마다 프로세스 하나짜리 실행기를 두고, 문서 해시로 담당 워커를 정해 같은 문서의 작업이
+    문서 캐시에 열린 핸들이 있는 프로세스로 가도록 합니다. 담당 워커가 바쁘고 쉬는 워커가 있으면
+    쉬는 워커로 보내 여러 페이지 작업이 한 프로세스에 몰리지 않게 합니다.
+
+    실행 중이거나 대기 중인 작업이 max_pending 개를 넘으면 QueueFullError 를 발생시켜
+    호출 측이 503 으로 응답하도록 합니다. 실행기에는 워커마다 한 번에 한 작업만 보내고 나머지는
+    이 프로세스에서 기다리게 하므로, 제한 시간은 작업이 워커에서 실행을 시작한 때부터 잽니다.
+    제한 시간을 넘긴 작업은 JobTimeoutError 로 응답하고 그 작업을 실행하던 프로세스만 종료한 뒤
+    새로 시작합니다. 워커가 비정상 종료(MuPDF 오류, 메모리 부족)되면 실행기를 다시 만들고
+    실행 중이던 작업은 WorkerCrashedError 로 응답합니다 (대기 중인 작업은 새 프로세스에서 실행).
+    """
+
+    def __init__(self, workers: int = PDF_WORKERS, max_pending: int = PDF_MAX_PENDING, timeout: float = PDF_JOB_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executors: List[Optional[ProcessPoolExecutor]] = []
+        self._pending: List[int] = [0] * max(workers, 1)
+        # 워커별 실행 자리 (실행기 대기열 깊이를 1로 유지)
+        self._slots: List[asyncio.Lock] = []
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.crashed = 0
+        self.restarted = 0
+
+    def start(self) -> None:
+        if self.workers > 0 and not self._executors:
+            self._executors = [self._new_executor() for _ in range(self.workers)]
+            self._slots = [asyncio.Lock() for _ in range(self.workers)]
+
+    def shutdown(self) -> None:
+        for executor in self._executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors = []
+
+    async def run(self, fn: Callable, *args: Any, key: Optional[str] = None, timeout: Optional[float] = None) -> Any:
+        """fn(*args) 를 워커 프로세스에서 실행하고 결과를 반환 (key 는 담당 워커를 정하는 문서 해시)"""
+        if sum(self._pending) >= self.max_pending:
+            self.rejected += 1
+            raise QueueFullError(f"PDF worker queue is full ({sum(self._pending)} pending)")
+
+        if not self._executors:
+            # 인라인 모드 (PDF_WORKERS=0): 디버깅용으로 현재 프로세스에서 실행
+            self.completed += 1
+            return fn(*args)
+
+        return await self._submit(self._route(key), fn, args, timeout or self.timeout)
+
+    async def run_all(self, fn: Callable, *args: Any) -> list:
+        """fn(*args) 를 모든 워커에서 한 번씩 실행 (워커별 캐시 상태 조회용)"""
+        if not self._executors:
+            return [await self.run(fn, *args)]
+        if sum(self._pending) + len(self._executors) > self.max_pending:
+            self.rejected += 1
+            raise QueueFullError(f"PDF worker queue is full ({sum(self._pending)} pending)")
+        return list(await asyncio.gather(*(
+            self._submit(index, fn, args, self.timeout) for index in range(len(self._executors))
+        )))
+
+    def idle(self, key: Optional[str] = None) -> bool:
+        """
+        워커가 바쁘지 않은지 (백그라운드 작업을 넣어도 되는지).
+        key 를 주면 그 문서의 작업이 배정될 워커 기준으로 판단합니다.
+        """
+        if key is not None and self._executors:
+            return self._pending[self._route(key)] == 0
+        return sum(self._pending) < max(self.workers, 1)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": sum(self._pending),
+            "pending_per_worker": list(self._pending),
+            "max_pending": self.max_pending,
+            "timeout": self.timeout,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "crashed": self.crashed,
+            "restarted": self.restarted,
+        }
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # fork 는 부모의 스레드/락 상태를 복제하므로 spawn 으로 새 인터프리터 시작
+        return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+    def _route(self, key: Optional[str]) -> int:
+        idle = min(range(len(self._pending)), key=self._pending.__getitem__)
+        if key is None:
+            return idle
+        home = zlib.crc32(key.encode()) % len(self._pending)
+        # 담당 워커가 바쁘고 쉬는 워커가 있으면 쉬는 워커 사용 (그 워커에서도 문서를 열어 캐시)
+        if self._pending[home] > 0 and self._pending[idle] == 0:
+            return idle
+        return home
+
+    async def _submit(self, index: int, fn: Callable, args: tuple, timeout: float) -> Any:
+        slot = self._slots[index]
+        self._pending[index] += 1
+        try:
+            # 앞 작업이 끝날 때까지 이 프로세스에서 대기 (이 시간은 제한 시간에 넣지 않음)
+            await slot.acquire()
+        except BaseException:
+            self._pending[index] -= 1
+            raise
+        executor = self._executors[index]
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool as e:
+            self._pending[index] -= 1
+            slot.release()
+            self._restart(index, executor)
+            raise WorkerCrashedError(f"PDF worker crashed: {e}")
+        # 자리는 호출 측이 취소되어도 작업이 실제로 끝난 뒤에 반환 (다음 작업이 실행기 대기열에 쌓이지 않도록)
+        future.add_done_callback(partial(self._on_done, index))
+        try:
+            # shield: 타임아웃이나 취소가 나도 완료 콜백이 자리와 대기열 카운트를 정리하도록 유지
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            # 멈춘 작업이 워커를 계속 차지하지 않도록 프로세스를 종료하고 새로 시작
+            self._restart(index, executor, kill=True)
+            raise JobTimeoutError(f"PDF job timed out after {timeout}s")
+        except BrokenProcessPool as e:
+            self.crashed += 1
+            self._restart(index, executor)
+            raise WorkerCrashedError(f"PDF worker crashed: {e}")
+
+    def _restart(self, index: int, executor: ProcessPoolExecutor, kill: bool = False) -> None:
+        if not self._executors or self._executors[index] is not executor:
+            return  # 같은 워커에서 실패한 다른 작업이 이미 다시 시작함
+        if kill:
+            # 실행기에는 제한 시간을 넘긴 작업 하나만 있으므로 다른 호출의 작업은 영향을 받지 않음
+            for process in list((executor._processes or {}).values()):
+                process.kill()
+        executor.shutdown(wait=False)
+        self._executors[index] = self._new_executor()
+        self.restarted += 1
+
+    def _on_done(self, index: int, future: "asyncio.Future") -> None:
+        self._pending[index] -= 1
+        self.completed += 1
+        self._slots[index].release()
+        if not future.cancelled():
+            # 타임아웃으로 버려진 결과의 예외가 "never retrieved" 경고로 남지 않도록 소비
+            future.exception()
+
+
+# 서버 전체에서 공유하는 워커 풀
+pdf_pool = PdfWorkerPool()
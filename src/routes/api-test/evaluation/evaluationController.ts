@@ -36,6 +36,11 @@ import {
 import { get } from 'svelte/store';
 import type { ResponseData } from './types';
 
+// RAGAS 평가 서버 주소
+const RAGAS_API_URL = 'http://localhost:8001';
+// 평가 작업 하나에 등록할 최대 샘플 수 (서버의 RAGAS_MAX_BATCH_SIZE 이하로 유지, 넘으면 413)
+const RAGAS_MAX_JOB_SAMPLES = 5000;
+
 // Fetch batch summaries
 export async function fetchBatchSummaries(): Promise<void> {
   try {
@@ -196,9 +201,88 @@ export async function handleCategoryUpdate(oldCategory: string, newCategory: str
 }
 
 /**
- * 병렬로 AI 테스트를 실행하는 함수
+ * 응답 목록을 하나의 평가 작업으로 등록하고, 서버가 평가를 마치는 순서대로 SSE 로 보내는 결과를 onResult 로 전달하는 함수
+ * @param responsesToSubmit 한 작업으로 등록할 응답 목록 (서버의 RAGAS_MAX_BATCH_SIZE 이하)
+ * @param concurrentLimit 서버에서 동시에 평가할 최대 메트릭 수
+ * @param onResult 항목별 평가 결과 처리 함수
+ * @returns 작업 종료 상태 ('done' 또는 'cancelled')
+ */
+async function runEvaluationJob(
+  responsesToSubmit: ResponseData[],
+  concurrentLimit: number,
+  onResult: (response: ResponseData, results: any) => void
+): Promise<string> {
+  const jobResponse = await fetch(`${RAGAS_API_URL}/evaluate/jobs`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({
+      samples: responsesToSubmit.map((response) => ({
+        id: String(response.id),
+        user_input: response.input_text,
+        response: response.response_text
+      })),
+      metrics: ["answer_relevancy", "faithfulness"],
+      concurrency: concurrentLimit
+    })
+  });
+
+  if (!jobResponse.ok) {
+    throw new Error(`API 응답 오류: ${jobResponse.status}`);
+  }
+
+  const job = await jobResponse.json();
+  // 재연결 시 서버가 이어서 보내므로 같은 결과를 두 번 저장하지 않도록 기록
+  const received = new Set<number>();
+  let unsubscribe = () => {};
+
+  return new Promise<string>((resolve, reject) => {
+    const events = new EventSource(`${RAGAS_API_URL}${job.events}`);
+    const finish = (state: string) => {
+      events.close();
+      resolve(state);
+    };
+
+    events.addEventListener('result', (message) => {
+      const event = JSON.parse((message as MessageEvent).data);
+      if (received.has(event.index)) return;
+      received.add(event.index);
+      onResult(responsesToSubmit[event.index], {
+        scores: event.scores,
+        details: event.details
+      });
+    });
+    events.addEventListener('done', () => finish('done'));
+    events.addEventListener('cancelled', () => finish('cancelled'));
+    events.addEventListener('error', (message) => {
+      // 서버가 보낸 작업 오류 이벤트만 처리 (연결 오류는 EventSource 가 자동으로 재연결)
+      const data = (message as MessageEvent).data;
+      if (data) {
+        events.close();
+        reject(new Error(JSON.parse(data).detail));
+      } else if (events.readyState === EventSource.CLOSED) {
+        // 작업이 사라지는 등 재연결할 수 없는 경우
+        reject(new Error('평가 작업 연결이 끊어졌습니다'));
+      }
+    });
+
+    // 취소 요청 시 서버의 작업을 취소 (남은 평가도 함께 취소되고 cancelled 이벤트로 종료)
+    unsubscribe = aiTestCancelRequested.subscribe((cancelled) => {
+      if (cancelled) {
+        fetch(`${RAGAS_API_URL}/evaluate/jobs/${job.job_id}`, { method: 'DELETE' })
+          .catch(() => finish('cancelled'));
+      }
+    });
+  }).finally(() => unsubscribe());
+}
+
+/**
+ * 배치 평가 작업으로 AI 테스트를 실행하는 함수
+ * 응답을 서버의 작업당 최대 샘플 수(RAGAS_MAX_JOB_SAMPLES) 단위로 나눠 차례로 평가 작업으로 등록하고,
+ * 결과가 도착하는 대로 저장합니다.
  * @param responsesToProcess 처리할 응답 목록
- * @param concurrentLimit 동시에 처리할 최대 요청 수
+ * @param concurrentLimit 서버에서 동시에 평가할 최대 메트릭 수
  * @returns 처리 결과 (성공 및 실패 개수)
  */
 async function runParallelAiTests(
@@ -209,67 +293,55 @@ async function runParallelAiTests(
   let processed = 0;
   let succeeded = 0;
   let failed = 0;
-  
-  // 취소 요청 확인을 위한 함수
-  const checkCancellation = () => {
+
+  if (total === 0) {
+    return { succeeded, failed, processed };
+  }
+
+  const updateProgress = () => {
+    processed++;
+    aiTestProgress.set(Math.round((processed / total) * 100));
+    aiTestMessage.set(`${total}개 항목 중 ${processed}개 처리 중... (성공: ${succeeded}, 실패: ${failed})`);
+  };
+
+  const saveResult = async (response: ResponseData, results: any) => {
+    try {
+      await saveRagasResults(response.id, results);
+      succeeded++;
+    } catch (e) {
+      console.error(`항목 ${response.id} 평가 중 오류:`, e);
+      failed++;
+    } finally {
+      updateProgress();
+    }
+  };
+
+  const saves: Promise<void>[] = [];
+  for (let start = 0; start < total; start += RAGAS_MAX_JOB_SAMPLES) {
     if (get(aiTestCancelRequested)) {
+      await Promise.all(saves);
+      throw new Error('사용자에 의해 취소됨');
+    }
+
+    // Run RAGAS test
+    const finalState = await runEvaluationJob(
+      responsesToProcess.slice(start, start + RAGAS_MAX_JOB_SAMPLES),
+      concurrentLimit,
+      (response, results) => saves.push(saveResult(response, results))
+    );
+
+    if (finalState === 'cancelled') {
+      await Promise.all(saves);
       throw new Error('사용자에 의해 취소됨');
     }
-  };
-  
-  // 응답을 배치로 나누어 처리
-  for (let i = 0; i < total; i += concurrentLimit) {
-    checkCancellation();
-    
-    const batch = responsesToProcess.slice(i, i + concurrentLimit);
-    const batchPromises = batch.map(async (response) => {
-      try {
-        // Run RAGAS test
-        const apiResponse = await fetch('http://localhost:8001/evaluate', {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify({
-            user_input: response.input_text,
-            response: response.response_text,
-            metrics: ["answer_relevancy", "faithfulness"]
-          }),
-        });
-        
-        if (!apiResponse.ok) {
-          throw new Error(`API 응답 오류: ${apiResponse.status}`);
-        }
-        
-        const results = await apiResponse.json();
-        
-        // Save results
-        await saveRagasResults(response.id, results);
-        return { success: true, id: response.id };
-      } catch (e) {
-        console.error(`항목 ${response.id} 평가 중 오류:`, e);
-        return { success: false, id: response.id, error: e };
-      }
-    });
-    
-    // 배치 내의 모든 요청을 병렬로 처리
-    const batchResults = await Promise.all(batchPromises);
-    
-    // 결과 집계
-    batchResults.forEach(result => {
-      processed++;
-      if (result.success) {
-        succeeded++;
-      } else {
-        failed++;
-      }
-    });
-    
-    // 진행 상황 업데이트
-    aiTestProgress.set(Math.round((processed / total) * 100));
-    aiTestMessage.set(`${total}개 항목 중 ${processed}개 처리 중... (성공: ${succeeded}, 실패: ${failed})`);
   }
-  
+
+  await Promise.all(saves);
+
+  // 결과를 받지 못한 항목은 실패로 집계
+  failed += total - processed;
+  processed = total;
+
   return { succeeded, failed, processed };
 }
 